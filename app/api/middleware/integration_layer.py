@@ -0,0 +1,300 @@
+"""
+Per-route request metrics, exposed in Prometheus text format at /metrics.
+
+`MetricsMiddleware` is a plain ASGI middleware (no extra task per request)
+that records, for every route template:
+  - request counts by status code and error (5xx / unhandled exception) counts
+  - a latency histogram of total request time
+  - a histogram of time spent waiting on the database within the request
+  - an in-flight gauge
+Connection-pool and lookup-cache counters are exported alongside.
+
+Call analytics (counts per department / event / outcome, from the hourly
+interaction rollups) are served as JSON under /metrics/interactions.
+"""
+import datetime
+import time
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import Response
+
+from app.db import async_db
+from app.db.async_db import request_db_time
+from app.db.cache import cache_stats
+from app.db.database import pool
+from app.db.group_commit import writer
+from app.models.interaction import EventType
+
+# Upper bounds (seconds) for the latency histograms
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+UNMATCHED_ROUTE = "<unmatched>"
+_MAX_CACHED_PATHS = 2048
+
+
+# ---------------------------------------------------------
+# 1️⃣ Metric storage (touched only from the event loop thread)
+# ---------------------------------------------------------
+class Histogram:
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)  # last slot is +Inf
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        index = 0
+        for bound in LATENCY_BUCKETS:
+            if value <= bound:
+                break
+            index += 1
+        self.counts[index] += 1
+        self.total += value
+        self.count += 1
+
+
+class RouteMetrics:
+    __slots__ = ("requests", "errors", "in_flight", "latency", "db_time")
+
+    def __init__(self):
+        self.requests = {}   # status code -> count
+        self.errors = 0
+        self.in_flight = 0
+        self.latency = Histogram()
+        self.db_time = Histogram()
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.routes = {}       # (method, route template) -> RouteMetrics
+        self._labels = {}      # (method, raw path) -> route template
+
+    def route_for(self, method: str, route: str) -> RouteMetrics:
+        key = (method, route)
+        metrics = self.routes.get(key)
+        if metrics is None:
+            metrics = self.routes[key] = RouteMetrics()
+        return metrics
+
+    def known_label(self, scope):
+        """Route template already learned for this raw path, if any."""
+        return self._labels.get((scope["method"], scope["path"]))
+
+    def learn_label(self, scope) -> str:
+        """Read the template the router matched ("/pnr_status/process_pnr") and remember it."""
+        route = scope.get("route")
+        if route is None:
+            # 404s / 405s: raw paths are client-controlled, so never label by them
+            return UNMATCHED_ROUTE
+        label = route.path
+        if len(self._labels) < _MAX_CACHED_PATHS:
+            self._labels[(scope["method"], scope["path"])] = label
+        return label
+
+
+registry = MetricsRegistry()
+
+
+# ---------------------------------------------------------
+# 2️⃣ ASGI middleware
+# ---------------------------------------------------------
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = [500]  # stays 500 if the app raises before responding
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        # The route is only known once the router has matched it, so a path's
+        # very first request is missing from the in-flight gauge.
+        label = registry.known_label(scope)
+        metrics = registry.route_for(method, label) if label else None
+        if metrics:
+            metrics.in_flight += 1
+
+        db_time = [0.0]
+        token = request_db_time.set(db_time)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            request_db_time.reset(token)
+            if metrics:
+                metrics.in_flight -= 1
+            else:
+                metrics = registry.route_for(method, registry.learn_label(scope))
+
+            metrics.requests[status[0]] = metrics.requests.get(status[0], 0) + 1
+            if status[0] >= 500:
+                metrics.errors += 1
+            metrics.latency.observe(elapsed)
+            metrics.db_time.observe(db_time[0])
+
+
+# ---------------------------------------------------------
+# 3️⃣ Prometheus text exposition
+# ---------------------------------------------------------
+def _label_value(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels) -> str:
+    return "{" + ",".join(f'{k}="{_label_value(v)}"' for k, v in labels.items()) + "}"
+
+
+def _histogram_lines(name: str, histogram: Histogram, **labels):
+    cumulative = 0
+    for bound, count in zip(LATENCY_BUCKETS + ("+Inf",), histogram.counts):
+        cumulative += count
+        yield f"{name}_bucket{_labels(**labels, le=bound)} {cumulative}"
+    yield f"{name}_sum{_labels(**labels)} {histogram.total:.6f}"
+    yield f"{name}_count{_labels(**labels)} {histogram.count}"
+
+
+def render_metrics() -> str:
+    lines = []
+    routes = sorted(registry.routes.items())
+
+    lines += ["# HELP ivr_http_requests_total HTTP requests by route and status code.",
+              "# TYPE ivr_http_requests_total counter"]
+    for (method, route), m in routes:
+        for code, count in sorted(m.requests.items()):
+            lines.append(f"ivr_http_requests_total{_labels(method=method, route=route, status=code)} {count}")
+
+    lines += ["# HELP ivr_http_request_errors_total Requests that failed with a 5xx or an unhandled exception.",
+              "# TYPE ivr_http_request_errors_total counter"]
+    for (method, route), m in routes:
+        lines.append(f"ivr_http_request_errors_total{_labels(method=method, route=route)} {m.errors}")
+
+    lines += ["# HELP ivr_http_requests_in_flight Requests currently being handled.",
+              "# TYPE ivr_http_requests_in_flight gauge"]
+    for (method, route), m in routes:
+        lines.append(f"ivr_http_requests_in_flight{_labels(method=method, route=route)} {m.in_flight}")
+
+    lines += ["# HELP ivr_http_request_duration_seconds Total request handling time.",
+              "# TYPE ivr_http_request_duration_seconds histogram"]
+    for (method, route), m in routes:
+        lines += _histogram_lines("ivr_http_request_duration_seconds", m.latency, method=method, route=route)
+
+    lines += ["# HELP ivr_http_request_db_seconds Time each request spent waiting on the database.",
+              "# TYPE ivr_http_request_db_seconds histogram"]
+    for (method, route), m in routes:
+        lines += _histogram_lines("ivr_http_request_db_seconds", m.db_time, method=method, route=route)
+
+    stats = pool.stats()
+    lines += ["# HELP ivr_db_pool_connections Pooled SQLite connections by state.",
+              "# TYPE ivr_db_pool_connections gauge",
+              f'ivr_db_pool_connections{{state="in_use"}} {stats["in_use"]}',
+              f'ivr_db_pool_connections{{state="idle"}} {stats["idle"]}',
+              f'ivr_db_pool_connections{{state="open"}} {stats["open"]}',
+              "# HELP ivr_db_pool_wait_seconds_total Time spent waiting for a free pooled connection.",
+              "# TYPE ivr_db_pool_wait_seconds_total counter",
+              f"ivr_db_pool_wait_seconds_total {stats['wait_time_total_s']}",
+              "# HELP ivr_db_pool_timeouts_total Connection requests that timed out.",
+              "# TYPE ivr_db_pool_timeouts_total counter",
+              f"ivr_db_pool_timeouts_total {stats['timeouts']}"]
+
+    writes = writer.stats()
+    lines += ["# HELP ivr_db_group_commits_total Transactions committed by the group-commit writer.",
+              "# TYPE ivr_db_group_commits_total counter",
+              f"ivr_db_group_commits_total {writes['batches']}",
+              "# HELP ivr_db_group_commit_writes_total Inserts committed through the group-commit writer.",
+              "# TYPE ivr_db_group_commit_writes_total counter",
+              f"ivr_db_group_commit_writes_total {writes['writes']}",
+              "# HELP ivr_db_group_commit_failed_writes_total Group-commit inserts that failed.",
+              "# TYPE ivr_db_group_commit_failed_writes_total counter",
+              f"ivr_db_group_commit_failed_writes_total {writes['failed_writes']}"]
+
+    caches = sorted(cache_stats().items())
+    for metric, key, kind, help_text in (
+        ("ivr_cache_hits_total", "hits", "counter", "Lookup cache hits."),
+        ("ivr_cache_misses_total", "misses", "counter", "Lookup cache misses."),
+        ("ivr_cache_evictions_total", "evictions", "counter", "Entries evicted by the size bound."),
+        ("ivr_cache_entries", "size", "gauge", "Entries currently cached."),
+    ):
+        lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} {kind}"]
+        lines += [f"{metric}{_labels(cache=name)} {s[key]}" for name, s in caches]
+
+    return "\n".join(lines) + "\n"
+
+
+router = APIRouter(tags=["Metrics"])
+
+
+@router.get("/metrics")
+def metrics():
+    """Prometheus scrape endpoint."""
+    return Response(content=render_metrics(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
+# ---------------------------------------------------------
+# 4️⃣ Call analytics (JSON, read from the hourly rollups only)
+# ---------------------------------------------------------
+MAX_ANALYTICS_HOURS = 24 * 90
+
+
+def _iso(ts: float) -> str:
+    return datetime.datetime.fromtimestamp(ts, datetime.timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _analytics_row(row):
+    row = dict(row)
+    row["event"] = EventType(row["event"]).label
+    if "hour" in row:
+        row["hour"] = _iso(row["hour"] * 3600)
+    value_sum, value_count = row.pop("value_sum"), row.pop("value_count")
+    row["avg_value"] = round(value_sum / value_count, 3) if value_count else None
+    return row
+
+
+@router.get("/metrics/interactions")
+async def interaction_analytics(hours: int = 24, department: str = None, hourly: bool = False):
+    """
+    Interaction counts for the last `hours` hours (the current one included):
+    totals per department / event / outcome, or with `hourly=true` one row per hour.
+    avg_value is the event's mean value (confidence, step ms, call seconds).
+    Events still buffered in a worker (a few seconds' worth) are not counted yet.
+    """
+    if not 1 <= hours <= MAX_ANALYTICS_HOURS:
+        raise HTTPException(status_code=400, detail=f"hours must be between 1 and {MAX_ANALYTICS_HOURS}")
+    until_hour = int(time.time() // 3600)
+    since_hour = until_hour - hours + 1
+    if hourly:
+        rows = await async_db.get_interaction_rollups(since_hour, until_hour, department)
+    else:
+        rows = await async_db.get_interaction_summary(since_hour, until_hour)
+        if department is not None:
+            rows = [row for row in rows if row["department"] == department]
+    return {
+        "since": _iso(since_hour * 3600),
+        "until": _iso((until_hour + 1) * 3600),
+        "rows": [_analytics_row(row) for row in rows],
+    }
+
+
+@router.get("/metrics/interactions/calls/{call_sid}")
+async def call_interactions(call_sid: str):
+    """Every recorded event of one call, in order (raw events, kept INTERACTION_RETENTION_DAYS)."""
+    events = await async_db.get_call_events(call_sid)
+    if not events:
+        raise HTTPException(status_code=404, detail=f"No interaction events for call {call_sid}")
+    return {
+        "call_sid": call_sid,
+        "events": [
+            {**event._asdict(), "ts": _iso(event.ts), "event": EventType(event.event).label}
+            for event in events
+        ],
+    }
@@ -0,0 +1,46 @@
+"""
+DEPARTMENT_STEP interaction events for every Twilio webhook a call hits.
+
+Runs inside LogContextMiddleware, which has already read the CallSid; for a
+request that belongs to a call it records the route template the router
+matched (as the metrics middleware labels it), the HTTP status and how long
+the step took (ms). Requests without a CallSid (metrics scrapes, the JSON
+APIs) are not call steps and are skipped, and so are requests that matched
+no route: their raw paths are client-controlled.
+"""
+import time
+
+from app.core.logging_config import call_sid_var
+from app.models.interaction import EventType
+from app.services.interaction_log import interaction_log
+
+# Webhooks that are not a step of the caller's journey
+SKIPPED_PATHS = frozenset({"/voice/status", "/voice/partial_speech"})
+
+
+class InteractionStepMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not call_sid_var.get() or scope["path"] in SKIPPED_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        status = [500]  # stays 500 if the app raises before responding
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")  # set by the router once it has matched
+            if route is not None:
+                interaction_log.record(
+                    EventType.DEPARTMENT_STEP, step=route.path, outcome=str(status[0]),
+                    value=round((time.perf_counter() - start) * 1000, 2),
+                )
@@ -0,0 +1,67 @@
+"""
+Per-request log context: the Twilio CallSid and the route being served.
+
+`LogContextMiddleware` is a plain ASGI middleware that sets the context
+variables the logging setup stamps onto every record, so a handler just logs
+and the line already says which call and which webhook it belongs to.
+
+Twilio sends CallSid in the form-encoded POST body (or the query string for
+GET webhooks). The body is read here once, up to MAX_FORM_BYTES, and handed
+on unchanged, so `await request.form()` in the route still works.
+"""
+from urllib.parse import parse_qs
+
+from app.core.logging_config import call_sid_var, route_var
+
+MAX_FORM_BYTES = 64 * 1024
+FORM_CONTENT_TYPE = b"application/x-www-form-urlencoded"
+
+
+def _call_sid(data: bytes):
+    values = parse_qs(data.decode("latin-1")).get("CallSid")
+    return values[0] if values else None
+
+
+async def _read_body(receive):
+    """Read the whole request body; return it and a `receive` that replays it."""
+    chunks, messages = [], []
+    while True:
+        message = await receive()
+        messages.append(message)
+        if message["type"] != "http.request":
+            break
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            break
+
+    async def replay():
+        return messages.pop(0) if messages else await receive()
+
+    return b"".join(chunks), replay
+
+
+class LogContextMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        call_sid = _call_sid(scope.get("query_string", b""))
+        if call_sid is None and scope["method"] == "POST":
+            headers = dict(scope["headers"])
+            length = headers.get(b"content-length", b"")
+            if (headers.get(b"content-type", b"").startswith(FORM_CONTENT_TYPE)
+                    and length.isdigit() and int(length) <= MAX_FORM_BYTES):
+                body, receive = await _read_body(receive)
+                call_sid = _call_sid(body)
+
+        sid_token = call_sid_var.set(call_sid)
+        route_token = route_var.set(scope["path"])
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            call_sid_var.reset(sid_token)
+            route_var.reset(route_token)
@@ -1,19 +1,27 @@
+import logging
+import re
+
 from fastapi import APIRouter, Request
-from fastapi.responses import Response
 from twilio.twiml.voice_response import VoiceResponse
-from app.db import database, complaints_db
+from app.db import async_db
+from app.services.session_store import sessions
+from app.services.speech_normalizer import spoken_digits
+from app.services.twiml import StaticTwiML, TwiMLTemplate, TwiMLFragment, fragments_response
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/complaints", tags=["Complaints"])
 
+# Complaints read out per response; the caller presses 1 for the next ones
+COMPLAINTS_PER_PAGE = 3
+# Spoken in this order, any other status after them
+STATUS_ORDER = ("Pending", "In Progress", "Resolved")
+
 # -------------------------------------------------------------------------
 # 1️⃣  Ask the user to record their complaint
 # -------------------------------------------------------------------------
-@router.post("/")
-async def complaint_entry(request: Request):
-    """
-    Entry point when Twilio redirects here from the main IVR.
-    Asks the user to state their complaint after the beep.
-    """
+@StaticTwiML
+def complaint_prompt():
     response = VoiceResponse()
     response.say(
         "You are now connected to the Indian Railways Complaints Department.",
@@ -32,13 +40,55 @@ async def complaint_entry(request: Request):
         play_beep=True,
         action="/complaints/record_complete"
     )
+    return response
 
-    return Response(content=str(response), media_type="application/xml")
+
+@router.post("/")
+async def complaint_entry(request: Request):
+    """
+    Entry point when Twilio redirects here from the main IVR.
+    Asks the user to state their complaint after the beep.
+    """
+    return complaint_prompt.response()
 
 
 # -------------------------------------------------------------------------
 # 2️⃣  Twilio sends recorded audio + transcription here
 # -------------------------------------------------------------------------
+@StaticTwiML
+def complaint_not_captured():
+    response = VoiceResponse()
+    response.say(
+        "Sorry, I could not hear your complaint properly. Please try again later.",
+        voice="man"
+    )
+    response.hangup()
+    return response
+
+
+@TwiMLTemplate
+def complaint_registered(name, complaint_id):
+    response = VoiceResponse()
+    response.say(
+        f"Thank you {name}. Your complaint has been registered successfully. "
+        f"Your complaint ID is {complaint_id}. We will review it soon.",
+        voice="man"
+    )
+    response.hangup()
+    return response
+
+
+@StaticTwiML
+def complaint_not_registered():
+    response = VoiceResponse()
+    response.say(
+        "Sorry, there was a problem registering your complaint. Please try again later.",
+        voice="man"
+    )
+    response.hangup()
+    return response
+
+
 @router.post("/record_complete")
 async def record_complete(request: Request):
     """
@@ -48,20 +98,10 @@ async def record_complete(request: Request):
     transcription_text = form.get("TranscriptionText")
     recording_url = form.get("RecordingUrl")
 
-    print("\n--- Complaint Received ---")
-    print(f"Recording: {recording_url}")
-    print(f"Transcript: {transcription_text}")
-    print("---------------------------\n")
-
-    response = VoiceResponse()
+    logger.debug("📝 Complaint transcript", extra={"transcript": transcription_text, "recording_url": recording_url})
 
     if not transcription_text:
-        response.say(
-            "Sorry, I could not hear your complaint properly. Please try again later.",
-            voice="man"
-        )
-        response.hangup()
-        return Response(content=str(response), media_type="application/xml")
+        return complaint_not_captured.response()
 
     # Basic parsing (you can later replace this with NLP extraction)
     # Example input: "My name is Rahul Sharma, P N R 1234567890, train was dirty"
@@ -71,7 +111,6 @@ async def record_complete(request: Request):
     description = transcription_text.strip()
 
     # Extract PNR number (look for a 10-digit sequence)
-    import re
     pnr_match = re.search(r"\b\d{10}\b", words)
     if pnr_match:
         pnr = pnr_match.group()
@@ -81,74 +120,150 @@ async def record_complete(request: Request):
     if name_match:
         name = name_match.group(1).title()
 
-    # Store in database
+    # Store in database (with the caller's number, so their next call can be prefetched)
     try:
-        conn = database.get_connection()
-        complaint_id = complaints_db.register_complaint(
-            conn,
+        complaint_id = await async_db.register_complaint(
             passenger_name=name,
             pnr_number=pnr or "Unknown",
-            contact_number="Not Provided",
+            contact_number=form.get("From") or "Not Provided",
             category="General",
             description=description
         )
-        conn.close()
-
-        response.say(
-            f"Thank you {name}. Your complaint has been registered successfully. "
-            f"Your complaint ID is {complaint_id}. We will review it soon.",
-            voice="man"
-        )
-
-    except Exception as e:
-        print("Database Error:", e)
-        response.say(
-            "Sorry, there was a problem registering your complaint. Please try again later.",
-            voice="man"
-        )
+    except Exception:
+        logger.exception("❌ Database error while registering complaint")
+        return complaint_not_registered.response()
 
-    response.hangup()
-    return Response(content=str(response), media_type="application/xml")
+    if pnr:
+        await sessions.update(form.get("CallSid"), pnr_number=pnr)
+    return complaint_registered.response(name=name, complaint_id=complaint_id)
 
 
 # -------------------------------------------------------------------------
 # 3️⃣  Optional: Fetch complaint details by PNR
 # -------------------------------------------------------------------------
+@StaticTwiML
+def complaint_pnr_invalid():
+    response = VoiceResponse()
+    response.say("Please provide a valid ten digit P N R number.", voice="man")
+    response.hangup()
+    return response
+
+
+@TwiMLTemplate
+def no_complaints_found(pnr_number):
+    response = VoiceResponse()
+    response.say(f"No complaints found for P N R number {pnr_number}.", voice="man")
+    response.hangup()
+    return response
+
+
+@TwiMLFragment
+def complaint_summary_fragment(count, plural, breakdown):
+    response = VoiceResponse()
+    response.say(f"You have {count} complaint record{plural}: {breakdown}.", voice="man")
+    return response
+
+
+@TwiMLFragment
+def complaint_item_fragment(complaint_id, complaint_date, status, remarks):
+    response = VoiceResponse()
+    response.say(
+        f"Complaint ID {complaint_id} on {complaint_date} "
+        f"is currently {status}. {remarks}",
+        voice="man"
+    )
+    return response
+
+
+@TwiMLFragment
+def complaint_more_fragment():
+    response = VoiceResponse()
+    gather = response.gather(input="dtmf", num_digits=1, timeout=5, action="/complaints/more")
+    gather.say("To hear older complaints, press 1.", voice="man")
+    return response
+
+
+@TwiMLFragment
+def complaints_end_fragment():
+    response = VoiceResponse()
+    response.say("That was your last complaint record. Thank you for calling.", voice="man")
+    response.hangup()
+    return response
+
+
+@TwiMLFragment
+def hangup_fragment():
+    response = VoiceResponse()
+    response.hangup()
+    return response
+
+
+def status_breakdown(counts: dict) -> str:
+    """{"Resolved": 7, "Pending": 3} -> "3 pending and 7 resolved"."""
+    statuses = [s for s in STATUS_ORDER if s in counts] + sorted(
+        (s for s in counts if s not in STATUS_ORDER), key=lambda s: s or ""
+    )
+    parts = [f"{counts[s]} {(s or 'unknown').lower()}" for s in statuses]
+    return parts[0] if len(parts) == 1 else ", ".join(parts[:-1]) + " and " + parts[-1]
+
+
+async def complaints_page_response(call_sid: str, pnr_number: str, complaints, next_before, fragments):
+    """Read out one page; offer the next one (cursor kept in the session) or say goodbye."""
+    for c in complaints:
+        fragments.append(complaint_item_fragment.render(
+            complaint_id=c["complaint_id"],
+            complaint_date=c["complaint_date"],
+            status=c["status"],
+            remarks=c["resolution_remarks"] or "Pending review.",
+        ))
+    if next_before:
+        await sessions.update(call_sid, complaint_pnr=pnr_number, complaint_before=next_before)
+        # No key pressed: the call ends after the gather times out
+        fragments += [complaint_more_fragment.render(), hangup_fragment.render()]
+    else:
+        await sessions.update(call_sid, complaint_pnr=None, complaint_before=None)
+        # Decided by this page, not by how many fragments the caller passed in (none from /more)
+        fragments.append(complaints_end_fragment.render() if complaints else hangup_fragment.render())
+    return fragments_response(*fragments)
+
+
 @router.post("/get_status")
 async def get_complaint_status(request: Request):
     """
-    Retrieve complaints for a given PNR number.
+    Status counts for a PNR's complaints, then the newest few, a page at a time.
     """
     form = await request.form()
     transcription_text = form.get("TranscriptionText", "")
-    response = VoiceResponse()
 
-    import re
-    pnr_match = re.search(r"\b\d{10}\b", transcription_text)
-    if not pnr_match:
-        response.say("Please provide a valid ten digit P N R number.", voice="man")
-        response.hangup()
-        return Response(content=str(response), media_type="application/xml")
+    pnr_number = spoken_digits(transcription_text)
+    if len(pnr_number) != 10:
+        return complaint_pnr_invalid.response()
 
-    pnr_number = pnr_match.group()
+    overview = await async_db.get_complaint_overview(pnr_number, COMPLAINTS_PER_PAGE)
+    if not overview:
+        return no_complaints_found.response(pnr_number=pnr_number)
 
-    conn = database.get_connection()
-    complaints = complaints_db.get_complaint_details(conn, pnr_number)
-    conn.close()
+    fragments = [complaint_summary_fragment.render(
+        count=overview["total"],
+        plural="s" if overview["total"] > 1 else "",
+        breakdown=status_breakdown(overview["counts"]),
+    )]
+    return await complaints_page_response(
+        form.get("CallSid"), pnr_number, overview["complaints"], overview["next_before"], fragments,
+    )
 
-    if not complaints:
-        response.say(f"No complaints found for P N R number {pnr_number}.", voice="man")
-    else:
-        response.say(
-            f"You have {len(complaints)} complaint record{'s' if len(complaints) > 1 else ''}.",
-            voice="man"
-        )
-        for c in complaints:
-            response.say(
-                f"Complaint ID {c['complaint_id']} on {c['complaint_date']} "
-                f"is currently {c['status']}. {c['resolution_remarks'] or 'Pending review.'}",
-                voice="man"
-            )
 
-    response.hangup()
-    return Response(content=str(response), media_type="application/xml")
+@router.post("/more")
+async def more_complaints(request: Request):
+    """
+    The caller pressed a key after a page of complaints: 1 reads the next page.
+    """
+    form = await request.form()
+    call_sid = form.get("CallSid")
+    session = await sessions.get(call_sid)
+    pnr_number, before = session.get("complaint_pnr"), session.get("complaint_before")
+    if form.get("Digits") != "1" or not pnr_number or not before:
+        return fragments_response(hangup_fragment.render())
+
+    complaints, next_before = await async_db.get_complaints_page(pnr_number, before, COMPLAINTS_PER_PAGE)
+    return await complaints_page_response(call_sid, pnr_number, complaints, next_before, [])
@@ -1,26 +1,22 @@
+import logging
 from fastapi import APIRouter, Request
-from fastapi.responses import Response
-from twilio.rest import Client
 from twilio.twiml.voice_response import VoiceResponse
-from app.db.database import get_connection
-from app.db import emergency_db
+from app.db import async_db
 from app.core.config import settings
+from app.services.notifications import alert_queue, emergency_alert_body
+from app.services.twiml import StaticTwiML
+from app.services.interaction_log import interaction_log
 import datetime
 
-router = APIRouter(prefix="/emergency", tags=["Emergency"])
+logger = logging.getLogger(__name__)
 
-# Initialize Twilio Client (for optional SMS alert)
-client = Client(settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN)
+router = APIRouter(prefix="/emergency", tags=["Emergency"])
 
 # -------------------------------------------------------------------------
 # 1️⃣ Step 1 — Ask user to describe emergency
 # -------------------------------------------------------------------------
-@router.post("/")
-async def ask_for_emergency(request: Request):
-    """
-    Called when Twilio redirects to /emergency.
-    Asks user to describe their emergency situation.
-    """
+@StaticTwiML
+def emergency_prompt():
     response = VoiceResponse()
     response.say(
         "You have reached the Indian Railways emergency helpline.",
@@ -39,12 +35,58 @@ async def ask_for_emergency(request: Request):
         play_beep=True,
         action="/emergency/process_emergency"  # Next step
     )
+    return response
+
 
-    return Response(content=str(response), media_type="application/xml")
+@router.post("/")
+async def ask_for_emergency(request: Request):
+    """
+    Called when Twilio redirects to /emergency.
+    Asks user to describe their emergency situation.
+    """
+    return emergency_prompt.response()
 
 # -------------------------------------------------------------------------
 # 2️⃣ Step 2 — Process emergency message and store it
 # -------------------------------------------------------------------------
+@StaticTwiML
+def emergency_not_captured():
+    response = VoiceResponse()
+    response.say(
+        "Sorry, I could not understand your message. Please describe your emergency again.",
+        voice="man", language="en-IN"
+    )
+    response.redirect("/emergency")
+    return response
+
+
+@StaticTwiML
+def emergency_reported():
+    response = VoiceResponse()
+    response.say(
+        "Your emergency has been reported. Help is being notified immediately.",
+        voice="man", language="en-IN"
+    )
+    response.pause(length=1)
+    response.say(
+        "Please remain calm. Railway authorities are taking necessary action. Goodbye.",
+        voice="man", language="en-IN"
+    )
+    response.hangup()
+    return response
+
+
+@StaticTwiML
+def emergency_not_saved():
+    response = VoiceResponse()
+    response.say(
+        "Sorry, we encountered an issue while recording your emergency. Please call again immediately.",
+        voice="man", language="en-IN"
+    )
+    response.hangup()
+    return response
+
+
 @router.post("/process_emergency")
 async def process_emergency(request: Request):
     """
@@ -54,62 +96,29 @@ async def process_emergency(request: Request):
     transcription_text = form.get("TranscriptionText")
     recording_url = form.get("RecordingUrl")
 
-    response = VoiceResponse()
-
     # --- Handle missing input ---
     if not transcription_text:
-        response.say(
-            "Sorry, I could not understand your message. Please describe your emergency again.",
-            voice="man", language="en-IN"
-        )
-        response.redirect("/emergency")
-        return Response(content=str(response), media_type="application/xml")
+        return interaction_log.reprompt(emergency_not_captured)
 
     emergency_text = transcription_text.strip()
-    print(f"🚨 Emergency reported: {emergency_text}")
-    print(f"🎧 Recording URL: {recording_url}")
+    logger.warning("🚨 Emergency reported", extra={"transcript": emergency_text, "recording_url": recording_url})
 
-    # --- Store in database ---
+    # --- Store in database + queue the control-room SMS (sent in the background) ---
     try:
-        conn = get_connection()
-        emergency_db.insert_emergency(
-            conn=conn,
+        report_id = await async_db.insert_emergency_with_alert(
             description=emergency_text,
+            reported_at=datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            recipient=settings.ALERT_RECIPIENT,
+            alert_body=emergency_alert_body(emergency_text),
             recording_url=recording_url,
-            reported_at=datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            contact_number=form.get("From") or "Not Provided",
         )
-        conn.close()
-
-        # --- Optional: Send SMS alert to control room ---
-        try:
-            alert_number = "+911234567890"  # Replace with actual emergency contact
-            client.messages.create(
-                to=alert_number,
-                from_=settings.TWILIO_PHONE_NUMBER,
-                body=f"🚨 Emergency Alert: {emergency_text[:150]}..."
-            )
-            print("📩 SMS alert sent successfully.")
-        except Exception as sms_error:
-            print("⚠️ Could not send SMS alert:", sms_error)
+        alert_queue.wake()
+        logger.info("🗂️ Emergency report saved, alert queued", extra={"report_id": report_id})
 
         # --- Acknowledge to caller ---
-        response.say(
-            "Your emergency has been reported. Help is being notified immediately.",
-            voice="man", language="en-IN"
-        )
-        response.pause(length=1)
-        response.say(
-            "Please remain calm. Railway authorities are taking necessary action. Goodbye.",
-            voice="man", language="en-IN"
-        )
-        response.hangup()
-
-    except Exception as db_error:
-        print("❌ Error saving emergency:", db_error)
-        response.say(
-            "Sorry, we encountered an issue while recording your emergency. Please call again immediately.",
-            voice="man", language="en-IN"
-        )
-        response.hangup()
+        return emergency_reported.response()
 
-    return Response(content=str(response), media_type="application/xml")
+    except Exception:
+        logger.exception("❌ Error saving emergency")
+        return emergency_not_saved.response()
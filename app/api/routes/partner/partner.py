@@ -0,0 +1,130 @@
+"""
+Batch PNR / refund status for partner systems (station kiosks, SMS bots).
+
+Every request carries the shared secret PARTNER_API_KEY in an X-Partner-Key
+header; without it (or while no key is configured) the answer is 401.
+
+A partner POSTs up to PARTNER_MAX_PNRS PNR numbers as JSON:
+
+    {"pnr_numbers": ["1234567890", "2345678901", ...]}
+
+and gets one JSON object per line (application/x-ndjson) back, in request
+order, with repeated PNRs answered once:
+
+    {"pnr_number": "1234567890", "found": true, "details": {...}}
+    {"pnr_number": "12345", "error": "invalid_pnr"}
+
+The PNRs are looked up PARTNER_QUERY_CHUNK at a time, each chunk with one
+`IN (...)` query (PNR details that are in the lookup cache are not queried).
+Each chunk's lines are sent before the next chunk is read, so large batches
+start arriving at once and never hold a pooled connection for long.
+"""
+import json
+import logging
+import secrets
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+from app.core.config import settings
+from app.db import async_db
+
+logger = logging.getLogger(__name__)
+
+
+def require_partner_key(x_partner_key: str = Header(None)):
+    """401 unless the X-Partner-Key header matches settings.PARTNER_API_KEY."""
+    expected = settings.PARTNER_API_KEY
+    if not expected or not x_partner_key or not secrets.compare_digest(x_partner_key.encode(), expected.encode()):
+        raise HTTPException(status_code=401, detail="Missing or invalid X-Partner-Key header")
+
+
+router = APIRouter(prefix="/partner", tags=["Partner API"], dependencies=[Depends(require_partner_key)])
+
+NDJSON_CONTENT_TYPE = "application/x-ndjson"
+
+
+# -------------------------------------------------------------------------
+# 1️⃣  Read and validate the batch (size limits before any parsing)
+# -------------------------------------------------------------------------
+async def read_pnr_batch(request: Request):
+    """The request's distinct PNR strings, in order; 400 / 413 on a bad or oversized body."""
+    length = request.headers.get("content-length", "")
+    if length.isdigit() and int(length) > settings.PARTNER_MAX_BODY_BYTES:
+        raise HTTPException(status_code=413, detail=f"Body exceeds {settings.PARTNER_MAX_BODY_BYTES} bytes")
+    body = b""
+    async for chunk in request.stream():  # chunked uploads have no Content-Length
+        body += chunk
+        if len(body) > settings.PARTNER_MAX_BODY_BYTES:
+            raise HTTPException(status_code=413, detail=f"Body exceeds {settings.PARTNER_MAX_BODY_BYTES} bytes")
+
+    try:
+        pnr_numbers = json.loads(body)["pnr_numbers"]
+    except (ValueError, TypeError, KeyError):
+        raise HTTPException(status_code=400, detail='Expected a JSON object: {"pnr_numbers": [...]}')
+    if not isinstance(pnr_numbers, list) or not all(isinstance(p, str) for p in pnr_numbers):
+        raise HTTPException(status_code=400, detail="pnr_numbers must be a list of strings")
+
+    pnr_numbers = list(dict.fromkeys(p.strip() for p in pnr_numbers))
+    if len(pnr_numbers) > settings.PARTNER_MAX_PNRS:
+        raise HTTPException(status_code=413, detail=f"At most {settings.PARTNER_MAX_PNRS} PNR numbers per request")
+    return pnr_numbers
+
+
+def valid_pnr(pnr_number: str) -> bool:
+    return len(pnr_number) == 10 and pnr_number.isdigit()
+
+
+# -------------------------------------------------------------------------
+# 2️⃣  Stream the answers, one chunked lookup at a time
+# -------------------------------------------------------------------------
+def ndjson_line(obj) -> bytes:
+    return json.dumps(obj, ensure_ascii=False).encode() + b"\n"
+
+
+async def stream_batch(pnr_numbers, lookup, answer):
+    """
+    NDJSON for `pnr_numbers`: `lookup(chunk)` returns {pnr_number: result} for
+    the valid PNRs of a chunk, `answer(result)` the fields of a found PNR's line.
+    """
+    chunk_size = settings.PARTNER_QUERY_CHUNK
+    for start in range(0, len(pnr_numbers), chunk_size):
+        chunk = pnr_numbers[start:start + chunk_size]
+        try:
+            results = await lookup([p for p in chunk if valid_pnr(p)])
+        except Exception:
+            # The status line is already sent: say so in-band and stop
+            logger.exception("⚠️ Partner batch lookup failed", extra={"unanswered": len(pnr_numbers) - start})
+            yield ndjson_line({"error": "lookup_failed", "unanswered": pnr_numbers[start:]})
+            return
+        lines = []
+        for pnr_number in chunk:
+            if not valid_pnr(pnr_number):
+                lines.append(ndjson_line({"pnr_number": pnr_number, "error": "invalid_pnr"}))
+            elif pnr_number in results:
+                lines.append(ndjson_line({"pnr_number": pnr_number, "found": True, **answer(results[pnr_number])}))
+            else:
+                lines.append(ndjson_line({"pnr_number": pnr_number, "found": False}))
+        yield b"".join(lines)
+
+
+@router.post("/pnr_status")
+async def batch_pnr_status(request: Request):
+    """PNR details for up to PARTNER_MAX_PNRS PNRs, as NDJSON."""
+    pnr_numbers = await read_pnr_batch(request)
+    logger.info("🤝 Partner PNR batch", extra={"pnrs": len(pnr_numbers)})
+    return StreamingResponse(
+        stream_batch(pnr_numbers, async_db.get_pnr_details_many, lambda details: {"details": details}),
+        media_type=NDJSON_CONTENT_TYPE,
+    )
+
+
+@router.post("/refund_status")
+async def batch_refund_status(request: Request):
+    """Every refund record of up to PARTNER_MAX_PNRS PNRs, as NDJSON."""
+    pnr_numbers = await read_pnr_batch(request)
+    logger.info("🤝 Partner refund batch", extra={"pnrs": len(pnr_numbers)})
+    return StreamingResponse(
+        stream_batch(pnr_numbers, async_db.get_refunds_for_pnrs, lambda refunds: {"refunds": refunds}),
+        media_type=NDJSON_CONTENT_TYPE,
+    )
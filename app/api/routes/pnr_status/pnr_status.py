@@ -1,137 +1,216 @@
+import logging
 from fastapi import APIRouter, Request
-from fastapi.responses import Response
 from twilio.twiml.voice_response import VoiceResponse
-from app.db.database import get_connection
-from app.db import pnr_db
+from app.db import async_db
+from app.services.caller_prefetch import caller_prefetch, find_pnr, spoken_ending
+from app.services.interaction_log import interaction_log
+from app.services.session_store import sessions
+from app.services.speech_input import DIGIT_HINTS, caller_input, speech_gather
+from app.services.speech_normalizer import spoken_digits
+from app.services.twiml import StaticTwiML, TwiMLTemplate
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/pnr_status", tags=["PNR Status"])
 
 # -------------------------------------------------------------------------
 # 1️⃣ Step 1 — Ask for PNR number
 # -------------------------------------------------------------------------
-@router.post("/")
-async def ask_pnr_number(request: Request):
+def ask_pnr_gather(response):
+    # Speech or keypad; interim transcripts start the PNR lookup early
+    gather = speech_gather(response, "/pnr_status/process_pnr", hints=DIGIT_HINTS, digits=10, partial="pnr")
+    gather.say(
+        "Please say your ten digit P N R number, or enter it on your keypad.",
+        voice="man", language="en-IN"
+    )
+
+
+@StaticTwiML
+def ask_pnr_prompt():
     response = VoiceResponse()
     response.say(
         "Welcome to the Indian Railways P N R status department.",
         voice="man", language="en-IN"
     )
     response.pause(length=1)
+    ask_pnr_gather(response)
+    return response
+
+
+@TwiMLTemplate
+def known_pnr_prompt(ending):
+    response = VoiceResponse()
     response.say(
-        "Please say your ten digit P N R number clearly after the beep.",
+        "Welcome to the Indian Railways P N R status department.",
         voice="man", language="en-IN"
     )
-
-    # Record user input
-    response.record(
-        timeout=6,
-        transcribe=True,
-        max_length=15,
-        play_beep=True,
-        action="/pnr_status/process_pnr"
+    gather = response.gather(
+        input="dtmf",
+        num_digits=1,
+        timeout=4,
+        action="/pnr_status/confirm_known_pnr"
+    )
+    gather.say(
+        f"Are you calling about your P N R ending in {ending}? "
+        "Press 1 for yes, or 2 for a different P N R.",
+        voice="man", language="en-IN"
     )
 
-    return Response(content=str(response), media_type="application/xml")
+    # No key pressed: fall through to asking for the number
+    ask_pnr_gather(response)
+    return response
+
+
+@router.post("/")
+async def ask_pnr_number(request: Request):
+    form = await request.form()
+    call_sid = form.get("CallSid")
+    # Caller-ID prefetch found this caller's bookings: offer the latest one
+    known = (await caller_prefetch.records(call_sid)).get("pnrs")
+    if known:
+        await sessions.update(call_sid, offered_pnr=known[0]["pnr_number"])
+        return known_pnr_prompt.response(ending=spoken_ending(known[0]["pnr_number"]))
+    return ask_pnr_prompt.response()
+
+
+@router.post("/confirm_known_pnr")
+async def confirm_known_pnr(request: Request):
+    """
+    Caller's answer to "your P N R ending in ...?": 1 reads it out from the prefetched details.
+    """
+    form = await request.form()
+    call_sid = form.get("CallSid")
+    if form.get("Digits") == "1":
+        session = await sessions.get(call_sid)
+        pnr_details = find_pnr(session.get("caller") or {}, session.get("offered_pnr"))
+        if pnr_details:
+            return await pnr_details_response(call_sid, pnr_details)
+    return ask_pnr_prompt.response()
 
 
 # -------------------------------------------------------------------------
 # 2️⃣ Step 2 — Process PNR number and fetch details
 # -------------------------------------------------------------------------
+@StaticTwiML
+def pnr_not_captured():
+    response = VoiceResponse()
+    response.say(
+        "Sorry, I could not capture your P N R number. Let's try again.",
+        voice="man", language="en-IN"
+    )
+    response.redirect("/pnr_status")
+    return response
+
+
+@TwiMLTemplate
+def pnr_invalid(pnr_number):
+    response = VoiceResponse()
+    response.say(
+        f"The number {pnr_number} you provided does not seem to be a valid ten digit P N R number.",
+        voice="man", language="en-IN"
+    )
+    response.say("Please try again.", voice="man", language="en-IN")
+    response.redirect("/pnr_status")
+    return response
+
+
+@StaticTwiML
+def pnr_lookup_failed():
+    response = VoiceResponse()
+    response.say(
+        "We are facing some technical issues fetching your P N R details. Please try again later.",
+        voice="man", language="en-IN"
+    )
+    response.hangup()
+    return response
+
+
+@TwiMLTemplate
+def pnr_found(pnr_number, name, train, seat, coach, date, status_message):
+    response = VoiceResponse()
+    response.say(
+        f"P N R number {pnr_number} belongs to passenger {name}.",
+        voice="man", language="en-IN"
+    )
+    response.pause(length=1)
+    response.say(
+        f"You are booked on train {train}, seat number {seat} in coach {coach}, on {date}.",
+        voice="man", language="en-IN"
+    )
+    response.pause(length=1)
+    response.say(status_message, voice="man", language="en-IN")
+    response.pause(length=1)
+    response.say("Thank you for using Indian Railways P N R status service.", voice="man", language="en-IN")
+    response.hangup()
+    return response
+
+
+@TwiMLTemplate
+def pnr_not_found(pnr_number):
+    response = VoiceResponse()
+    response.say(
+        f"Sorry, no details found for P N R number {pnr_number}.",
+        voice="man", language="en-IN"
+    )
+    response.pause(length=1)
+    response.say("Please verify your number and try again.", voice="man", language="en-IN")
+    response.redirect("/pnr_status")
+    return response
+
+
+def booking_status_message(status: str):
+    if status.lower() == "confirmed":
+        return "Your booking status is confirmed. Have a pleasant journey."
+    elif "waiting" in status.lower():
+        return "Your booking is currently on the waiting list. Please check again closer to your journey date."
+    elif "rac" in status.lower():
+        return "Your booking is under R A C status. You will be allotted a seat upon chart preparation."
+    else:
+        return f"Your booking status is {status}."
+
+
+async def pnr_details_response(call_sid: str, pnr_details: dict):
+    # Remember it for the rest of the call (refunds, complaints, ...)
+    await sessions.update(call_sid, pnr_number=pnr_details["pnr_number"], train_number=pnr_details["train_number"])
+    return pnr_found.response(
+        pnr_number=pnr_details["pnr_number"],
+        name=pnr_details["passenger_name"],
+        train=pnr_details["train_name"],
+        seat=pnr_details["seat_number"],
+        coach=pnr_details["coach"],
+        date=pnr_details["date_of_journey"],
+        status_message=booking_status_message(pnr_details["status"]),
+    )
+
+
 @router.post("/process_pnr")
 async def process_pnr(request: Request):
     form = await request.form()
-    transcription_text = form.get("TranscriptionText")
-    recording_url = form.get("RecordingUrl")
+    caller_text = caller_input(form)
 
-    response = VoiceResponse()
-
-    # --- If Twilio couldn't transcribe ---
-    if not transcription_text:
-        response.say(
-            "Sorry, I could not capture your P N R number. Let's try again.",
-            voice="man", language="en-IN"
-        )
-        response.redirect("/pnr_status")
-        return Response(content=str(response), media_type="application/xml")
+    # --- Nothing said or keyed in ---
+    if not caller_text:
+        return interaction_log.reprompt(pnr_not_captured)
 
-    # --- Clean up spoken digits ---
-    pnr_number = "".join(ch for ch in transcription_text if ch.isdigit())
+    # --- Clean up spoken digits ("one two three ...", "double four", ...) ---
+    pnr_number = spoken_digits(caller_text)
 
     if len(pnr_number) != 10:
-        response.say(
-            f"The number {pnr_number} you provided does not seem to be a valid ten digit P N R number.",
-            voice="man", language="en-IN"
-        )
-        response.say("Please try again.", voice="man", language="en-IN")
-        response.redirect("/pnr_status")
-        return Response(content=str(response), media_type="application/xml")
-
-    # --- Try fetching data from DB ---
-    try:
-        conn = get_connection()
-        pnr_details = pnr_db.get_pnr_details(conn, pnr_number)
-        conn.close()
-    except Exception as e:
-        print("❌ Database error:", e)
-        response.say(
-            "We are facing some technical issues fetching your P N R details. Please try again later.",
-            voice="man", language="en-IN"
-        )
-        response.hangup()
-        return Response(content=str(response), media_type="application/xml")
+        return pnr_invalid.response(pnr_number=pnr_number)
+
+    # --- Prefetched for this caller, else from DB ---
+    call_sid = form.get("CallSid")
+    pnr_details = find_pnr(await caller_prefetch.records(call_sid), pnr_number)
+    if pnr_details is None:
+        try:
+            pnr_details = await async_db.get_pnr_details(pnr_number)
+        except Exception:
+            logger.exception("❌ Database error while fetching PNR details", extra={"pnr_number": pnr_number})
+            return pnr_lookup_failed.response()
 
     # --- If PNR found ---
     if pnr_details:
-        name = pnr_details["passenger_name"]
-        train = pnr_details["train_name"]
-        date = pnr_details["date_of_journey"]
-        status = pnr_details["status"]
-        seat = pnr_details["seat_number"]
-        coach = pnr_details["coach"]
-
-        response.say(
-            f"P N R number {pnr_number} belongs to passenger {name}.",
-            voice="man", language="en-IN"
-        )
-        response.pause(length=1)
-        response.say(
-            f"You are booked on train {train}, seat number {seat} in coach {coach}, on {date}.",
-            voice="man", language="en-IN"
-        )
-        response.pause(length=1)
-        if status.lower() == "confirmed":
-            response.say(
-                "Your booking status is confirmed. Have a pleasant journey.",
-                voice="man", language="en-IN"
-            )
-        elif "waiting" in status.lower():
-            response.say(
-                "Your booking is currently on the waiting list. Please check again closer to your journey date.",
-                voice="man", language="en-IN"
-            )
-        elif "rac" in status.lower():
-            response.say(
-                "Your booking is under R A C status. You will be allotted a seat upon chart preparation.",
-                voice="man", language="en-IN"
-            )
-        else:
-            response.say(
-                f"Your booking status is {status}.",
-                voice="man", language="en-IN"
-            )
-
-        response.pause(length=1)
-        response.say("Thank you for using Indian Railways P N R status service.", voice="man", language="en-IN")
-        response.hangup()
+        return await pnr_details_response(call_sid, pnr_details)
 
     # --- If no matching record ---
-    else:
-        response.say(
-            f"Sorry, no details found for P N R number {pnr_number}.",
-            voice="man", language="en-IN"
-        )
-        response.pause(length=1)
-        response.say("Please verify your number and try again.", voice="man", language="en-IN")
-        response.redirect("/pnr_status")
-
-    return Response(content=str(response), media_type="application/xml")
+    return pnr_not_found.response(pnr_number=pnr_number)
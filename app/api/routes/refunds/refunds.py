@@ -1,119 +1,216 @@
+import logging
 from fastapi import APIRouter, Request
-from fastapi.responses import Response
 from twilio.twiml.voice_response import VoiceResponse
-from app.db.database import get_connection
-from app.db import refunds_db
+from app.db import async_db
+from app.services.caller_prefetch import caller_prefetch, find_pnr, spoken_ending
+from app.services.interaction_log import interaction_log
+from app.services.session_store import sessions
+from app.services.speech_input import DIGIT_HINTS, caller_input, speech_gather
+from app.services.speech_normalizer import spoken_digits
+from app.services.twiml import StaticTwiML, TwiMLTemplate
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/refunds", tags=["Refunds"])
 
 # -------------------------------------------------------------------------
 # 1️⃣ Step 1 — Ask user for PNR number to check refund status
 # -------------------------------------------------------------------------
+def ask_refund_pnr_gather(response):
+    gather = speech_gather(response, "/refunds/process_refund_status", hints=DIGIT_HINTS, digits=10)
+    gather.say(
+        "Please say your P N R number, or enter it on your keypad, to check your refund status.",
+        voice="man", language="en-IN"
+    )
+
+
+@StaticTwiML
+def ask_refund_prompt():
+    response = VoiceResponse()
+    response.say(
+        "Welcome to the Indian Railways refund and cancellation department.",
+        voice="man", language="en-IN"
+    )
+    response.pause(length=1)
+    ask_refund_pnr_gather(response)
+    return response
+
+
+@TwiMLTemplate
+def known_refund_prompt(ending):
+    response = VoiceResponse()
+    response.say(
+        "Welcome to the Indian Railways refund and cancellation department.",
+        voice="man", language="en-IN"
+    )
+    gather = response.gather(
+        input="dtmf",
+        num_digits=1,
+        timeout=4,
+        action="/refunds/confirm_known_pnr"
+    )
+    gather.say(
+        f"Are you calling about the refund for your P N R ending in {ending}? "
+        "Press 1 for yes, or 2 for a different P N R.",
+        voice="man", language="en-IN"
+    )
+
+    # No key pressed: fall through to asking for the number
+    ask_refund_pnr_gather(response)
+    return response
+
+
 @router.post("/")
 async def ask_for_refund_status(request: Request):
     """
     Entry point when user is redirected to refund department.
-    Prompts the caller to say their PNR number.
+    Offers the caller's own refund if the caller-ID prefetch found one,
+    otherwise asks for the PNR number (speech or keypad).
     """
+    form = await request.form()
+    call_sid = form.get("CallSid")
+    records = await caller_prefetch.records(call_sid)
+    # The most recent of the caller's PNRs that has a refund on record
+    pnr_number = next((p["pnr_number"] for p in records.get("pnrs", ()) if p["pnr_number"] in records["refunds"]), None)
+    if pnr_number:
+        await sessions.update(call_sid, offered_pnr=pnr_number)
+        return known_refund_prompt.response(ending=spoken_ending(pnr_number))
+    return ask_refund_prompt.response()
+
+
+@router.post("/confirm_known_pnr")
+async def confirm_known_pnr(request: Request):
+    """
+    Caller's answer to "the refund for your P N R ending in ...?": 1 reads it out from the prefetched record.
+    """
+    form = await request.form()
+    call_sid = form.get("CallSid")
+    if form.get("Digits") == "1":
+        session = await sessions.get(call_sid)
+        pnr_number = session.get("offered_pnr")
+        refund_info = (session.get("caller") or {}).get("refunds", {}).get(pnr_number)
+        if refund_info:
+            return await refund_response(call_sid, pnr_number, refund_info)
+    return ask_refund_prompt.response()
+
+# -------------------------------------------------------------------------
+# 2️⃣ Step 2 — Process the PNR number and fetch refund info from DB
+# -------------------------------------------------------------------------
+@StaticTwiML
+def refund_not_captured():
     response = VoiceResponse()
     response.say(
-        "Welcome to the Indian Railways refund and cancellation department.",
+        "Sorry, I could not understand your P N R number. Let's try again.",
+        voice="man", language="en-IN"
+    )
+    response.redirect("/refunds")  # retry asking
+    return response
+
+
+@StaticTwiML
+def refund_lookup_failed():
+    response = VoiceResponse()
+    response.say(
+        "We are unable to fetch your refund details at the moment. Please try again later.",
+        voice="man", language="en-IN"
+    )
+    response.hangup()
+    return response
+
+
+def _build_refund_found(pnr_number, passenger, amount, mode, status, date, remarks=None):
+    response = VoiceResponse()
+    response.say(
+        f"Refund details found for P N R number {pnr_number}.",
+        voice="man", language="en-IN"
+    )
+    response.pause(length=1)
+    response.say(
+        f"Passenger name {passenger}. Refund amount of {amount} rupees, "
+        f"paid via {mode}, is currently {status} as of {date}.",
+        voice="man", language="en-IN"
+    )
+    if remarks:
+        response.say(remarks, voice="man", language="en-IN")
+    response.pause(length=1)
+    response.say("Thank you for calling the refund department. Goodbye.", voice="man", language="en-IN")
+    response.hangup()
+    return response
+
+
+@TwiMLTemplate
+def refund_found(pnr_number, passenger, amount, mode, status, date):
+    return _build_refund_found(pnr_number, passenger, amount, mode, status, date)
+
+
+@TwiMLTemplate
+def refund_found_with_remarks(pnr_number, passenger, amount, mode, status, date, remarks):
+    return _build_refund_found(pnr_number, passenger, amount, mode, status, date, remarks)
+
+
+@TwiMLTemplate
+def refund_not_found(pnr_number):
+    response = VoiceResponse()
+    response.say(
+        f"Sorry, no refund record was found for P N R number {pnr_number}.",
         voice="man", language="en-IN"
     )
     response.pause(length=1)
     response.say(
-        "Please say your P N R number clearly after the beep to check your refund status.",
+        "Please check your P N R number and try again.",
         voice="man", language="en-IN"
     )
+    response.redirect("/refunds")  # Retry once more
+    return response
+
 
-    response.record(
-        timeout=6,
-        transcribe=True,
-        max_length=15,
-        play_beep=True,
-        action="/refunds/process_refund_status"  # Next step
+async def refund_response(call_sid: str, pnr_number: str, refund_info: dict):
+    await sessions.update(call_sid, pnr_number=pnr_number)
+    details = dict(
+        pnr_number=pnr_number,
+        passenger=refund_info["passenger_name"],
+        amount=refund_info["amount"],
+        mode=refund_info["payment_mode"],
+        status=refund_info["refund_status"],
+        date=refund_info["refund_date"],
     )
+    # Nullable column; session-held rows may come from an older store that dropped null keys
+    if refund_info.get("remarks"):
+        return refund_found_with_remarks.response(remarks=refund_info["remarks"], **details)
+    return refund_found.response(**details)
 
-    return Response(content=str(response), media_type="application/xml")
 
-# -------------------------------------------------------------------------
-# 2️⃣ Step 2 — Process transcription and fetch refund info from DB
-# -------------------------------------------------------------------------
 @router.post("/process_refund_status")
 async def process_refund_status(request: Request):
     """
-    Process user's spoken PNR number, check database, and return refund info.
+    Process the caller's spoken or keyed PNR number, check database, and return refund info.
     """
     form = await request.form()
-    transcription_text = form.get("TranscriptionText")
-    recording_url = form.get("RecordingUrl")
+    caller_text = caller_input(form)
 
-    response = VoiceResponse()
+    # --- Nothing said or keyed in ---
+    if not caller_text:
+        return interaction_log.reprompt(refund_not_captured)
+
+    # Spoken or keyed digits -> PNR number
+    pnr_number = spoken_digits(caller_text)
+    logger.info("💰 Refund status requested", extra={"pnr_number": pnr_number})
 
-    # --- If Twilio couldn’t capture anything ---
-    if not transcription_text:
-        response.say(
-            "Sorry, I could not understand your P N R number. Let's try again.",
-            voice="man", language="en-IN"
-        )
-        response.redirect("/refunds")  # retry asking
-        return Response(content=str(response), media_type="application/xml")
-
-    # Clean the spoken text (remove spaces, ensure digits only)
-    pnr_number = "".join(ch for ch in transcription_text if ch.isdigit())
-    print(f"💰 Refund status requested for PNR: {pnr_number}")
-    print(f"🎧 Recording URL: {recording_url}")
-
-    # --- Connect to DB and fetch refund details ---
-    try:
-        conn = get_connection()
-        refund_info = refunds_db.get_refund_status(conn, pnr_number)
-        conn.close()
-    except Exception as e:
-        print("❌ Database error while fetching refund info:", e)
-        response.say(
-            "We are unable to fetch your refund details at the moment. Please try again later.",
-            voice="man", language="en-IN"
-        )
-        response.hangup()
-        return Response(content=str(response), media_type="application/xml")
+    # --- Prefetched for this caller (a known PNR without a refund needs no lookup either), else from DB ---
+    call_sid = form.get("CallSid")
+    records = await caller_prefetch.records(call_sid)
+    if find_pnr(records, pnr_number):
+        refund_info = records["refunds"].get(pnr_number)
+    else:
+        try:
+            refund_info = await async_db.get_refund_status(pnr_number)
+        except Exception:
+            logger.exception("❌ Database error while fetching refund info", extra={"pnr_number": pnr_number})
+            return refund_lookup_failed.response()
 
     # --- If refund record found ---
     if refund_info:
-        passenger = refund_info["passenger_name"]
-        amount = refund_info["amount"]
-        mode = refund_info["payment_mode"]
-        status = refund_info["refund_status"]
-        date = refund_info["refund_date"]
-        remarks = refund_info["remarks"]
-
-        response.say(
-            f"Refund details found for P N R number {pnr_number}.",
-            voice="man", language="en-IN"
-        )
-        response.pause(length=1)
-        response.say(
-            f"Passenger name {passenger}. Refund amount of {amount} rupees, "
-            f"paid via {mode}, is currently {status} as of {date}.",
-            voice="man", language="en-IN"
-        )
-        if remarks:
-            response.say(remarks, voice="man", language="en-IN")
-        response.pause(length=1)
-        response.say("Thank you for calling the refund department. Goodbye.", voice="man", language="en-IN")
-        response.hangup()
+        return await refund_response(call_sid, pnr_number, refund_info)
 
-    else:
-        # --- No matching record ---
-        response.say(
-            f"Sorry, no refund record was found for P N R number {pnr_number}.",
-            voice="man", language="en-IN"
-        )
-        response.pause(length=1)
-        response.say(
-            "Please check your P N R number and try again.",
-            voice="man", language="en-IN"
-        )
-        response.redirect("/refunds")  # Retry once more
-
-    return Response(content=str(response), media_type="application/xml")
+    # --- No matching record ---
+    return refund_not_found.response(pnr_number=pnr_number)
@@ -1,192 +1,299 @@
-from fastapi import APIRouter, Request
-from fastapi.responses import Response
+import logging
+import re
+from fastapi import APIRouter, HTTPException, Request
 from twilio.twiml.voice_response import VoiceResponse
-from app.db.database import get_connection
-from app.db import seat_db
+from app.db import async_db
+from app.services.interaction_log import interaction_log
+from app.services.seat_inventory import seat_inventory
+from app.services.session_store import sessions
+from app.services.speech_input import DIGIT_HINTS, caller_input, speech_gather
+from app.services.speech_normalizer import parse_date, spoken_digits
+from app.services.twiml import StaticTwiML, TwiMLTemplate
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/seat_availability", tags=["Seat Availability"])
 
+# Spoken class names the recogniser should expect
+CLASS_HINTS = ("Sleeper", "3A", "2A", "1A", "Third AC", "Second AC", "First AC", "Chair Car", "Executive Chair Car")
+# What speech recognition returns for a class ("three a", "3 AC."), letters and digits only -> class_type
+CLASS_NAMES = {
+    "sleeper": "Sleeper", "sl": "Sleeper",
+    "3a": "3A", "threea": "3A", "3ac": "3A", "thirdac": "3A", "threeac": "3A",
+    "2a": "2A", "twoa": "2A", "2ac": "2A", "secondac": "2A", "twoac": "2A",
+    "1a": "1A", "onea": "1A", "1ac": "1A", "firstac": "1A", "oneac": "1A",
+    "chaircar": "Chair Car", "cc": "Chair Car",
+}
+_NOT_ALNUM = re.compile(r"[^a-z0-9]")
+
+
+def spoken_class(text: str) -> str:
+    return CLASS_NAMES.get(_NOT_ALNUM.sub("", text.lower()), text.rstrip(".").title())
+
 # -------------------------------------------------------------------------
 # 1️⃣ Step 1 — Ask for train number
 # -------------------------------------------------------------------------
-@router.post("/")
-async def ask_train_number(request: Request):
+@StaticTwiML
+def ask_train_number_prompt():
     response = VoiceResponse()
     response.say(
         "Welcome to the Indian Railways seat availability department.",
         voice="man", language="en-IN"
     )
     response.pause(length=1)
-    response.say(
-        "Please say your train number clearly after the beep. "
+    gather = speech_gather(response, "/seat_availability/get_date", hints=DIGIT_HINTS, digits=5)
+    gather.say(
+        "Please say your five digit train number, or enter it on your keypad. "
         "For example, say one two six two seven for Karnataka Express.",
         voice="man", language="en-IN"
     )
+    return response
 
-    response.record(
-        timeout=6,
-        transcribe=True,
-        max_length=10,
-        play_beep=True,
-        action="/seat_availability/get_date"
-    )
 
-    return Response(content=str(response), media_type="application/xml")
+@router.post("/")
+async def ask_train_number(request: Request):
+    return ask_train_number_prompt.response()
 
 
 # -------------------------------------------------------------------------
 # 2️⃣ Step 2 — Ask for date of journey
 # -------------------------------------------------------------------------
-@router.post("/get_date")
-async def get_date_of_journey(request: Request):
-    form = await request.form()
-    transcription_text = form.get("TranscriptionText")
-    recording_url = form.get("RecordingUrl")
-
+@StaticTwiML
+def train_number_not_captured():
     response = VoiceResponse()
+    response.say(
+        "Sorry, I could not understand your train number. Let's try again.",
+        voice="man", language="en-IN"
+    )
+    response.redirect("/seat_availability")
+    return response
 
-    if not transcription_text:
-        response.say(
-            "Sorry, I could not understand your train number. Let's try again.",
-            voice="man", language="en-IN"
-        )
-        response.redirect("/seat_availability")
-        return Response(content=str(response), media_type="application/xml")
 
-    train_number = "".join(ch for ch in transcription_text if ch.isdigit())
+@TwiMLTemplate
+def ask_date_prompt(train_number):
+    response = VoiceResponse()
     response.say(
         f"Got it. Your train number is {train_number}.",
         voice="man", language="en-IN"
     )
     response.pause(length=1)
-    response.say(
-        "Now, please say the date of journey in year month date format, "
-        "for example, say two zero two five dash one one dash zero five.",
+    gather = speech_gather(response, "/seat_availability/get_class", digits=8)
+    gather.say(
+        "Now, please say the date of journey, for example, the fifth of November, or tomorrow. "
+        "You can also enter it on your keypad as year, month and day, for example, two zero two five one one zero five.",
         voice="man", language="en-IN"
     )
+    return response
 
-    response.record(
-        timeout=6,
-        transcribe=True,
-        max_length=10,
-        play_beep=True,
-        action=f"/seat_availability/get_class?train_number={train_number}"
-    )
 
-    return Response(content=str(response), media_type="application/xml")
+@router.post("/get_date")
+async def get_date_of_journey(request: Request):
+    form = await request.form()
+    caller_text = caller_input(form)
+
+    # Nothing said, or no five digit train number in it ("Karnataka", "one two six")
+    train_number = spoken_digits(caller_text)
+    if len(train_number) != 5:
+        return interaction_log.reprompt(train_number_not_captured)
+
+    await sessions.update(form.get("CallSid"), train_number=train_number)
+    return ask_date_prompt.response(train_number=train_number)
 
 
 # -------------------------------------------------------------------------
 # 3️⃣ Step 3 — Ask for class type
 # -------------------------------------------------------------------------
-@router.post("/get_class")
-async def get_class_type(request: Request):
-    form = await request.form()
-    transcription_text = form.get("TranscriptionText")
-    recording_url = form.get("RecordingUrl")
+@StaticTwiML
+def date_not_captured():
+    response = VoiceResponse()
+    response.say(
+        "Sorry, I could not capture your journey date. Let's try again.",
+        voice="man", language="en-IN"
+    )
+    response.redirect("/seat_availability")
+    return response
 
-    request_query = request.query_params
-    train_number = request_query.get("train_number")
 
+@StaticTwiML
+def seat_session_expired():
     response = VoiceResponse()
+    response.say(
+        "Sorry, I lost track of your request. Let's start again.",
+        voice="man", language="en-IN"
+    )
+    response.redirect("/seat_availability")
+    return response
 
-    if not transcription_text:
-        response.say(
-            "Sorry, I could not capture your journey date. Let's try again.",
-            voice="man", language="en-IN"
-        )
-        response.redirect("/seat_availability")
-        return Response(content=str(response), media_type="application/xml")
 
-    date_of_journey = transcription_text.strip().replace(" ", "")
+@TwiMLTemplate
+def ask_class_prompt(date_of_journey):
+    response = VoiceResponse()
     response.say(
         f"Okay. You are checking for date {date_of_journey}.",
         voice="man", language="en-IN"
     )
     response.pause(length=1)
-    response.say(
+    gather = speech_gather(response, "/seat_availability/check_availability", hints=CLASS_HINTS)
+    gather.say(
         "Please say the class type, like Sleeper, 3A, 2A, or Chair Car.",
         voice="man", language="en-IN"
     )
+    return response
 
-    response.record(
-        timeout=6,
-        transcribe=True,
-        max_length=10,
-        play_beep=True,
-        action=f"/seat_availability/check_availability?train_number={train_number}&date_of_journey={date_of_journey}"
-    )
 
-    return Response(content=str(response), media_type="application/xml")
+@router.post("/get_class")
+async def get_class_type(request: Request):
+    form = await request.form()
+    call_sid = form.get("CallSid")
+
+    date_of_journey = parse_date(caller_input(form))
+    if not date_of_journey:
+        return interaction_log.reprompt(date_not_captured)
+    if "train_number" not in await sessions.get(call_sid):
+        return interaction_log.reprompt(seat_session_expired)
+
+    await sessions.update(call_sid, date_of_journey=date_of_journey)
+    return ask_class_prompt.response(date_of_journey=date_of_journey)
 
 
 # -------------------------------------------------------------------------
 # 4️⃣ Step 4 — Check seat availability from DB
 # -------------------------------------------------------------------------
+@StaticTwiML
+def class_not_captured():
+    response = VoiceResponse()
+    response.say(
+        "Sorry, I could not understand the class type. Let's try again.",
+        voice="man", language="en-IN"
+    )
+    response.redirect("/seat_availability")
+    return response
+
+
+@StaticTwiML
+def seat_lookup_failed():
+    response = VoiceResponse()
+    response.say(
+        "We are facing some technical issues fetching seat availability. Please try again later.",
+        voice="man", language="en-IN"
+    )
+    response.hangup()
+    return response
+
+
+@TwiMLTemplate
+def seats_found(train_number, train_name, class_type, date_of_journey, available, total):
+    response = VoiceResponse()
+    response.say(
+        f"Train {train_number}, {train_name}, class {class_type}, on {date_of_journey}.",
+        voice="man", language="en-IN"
+    )
+    response.pause(length=1)
+    response.say(
+        f"There are {available} seats available out of {total} total seats.",
+        voice="man", language="en-IN"
+    )
+    response.pause(length=1)
+    response.say(
+        "Thank you for using Indian Railways seat availability service.",
+        voice="man", language="en-IN"
+    )
+    response.hangup()
+    return response
+
+
+@TwiMLTemplate
+def seats_not_found(train_number, date_of_journey, class_type):
+    response = VoiceResponse()
+    response.say(
+        f"Sorry, no seat availability found for train number {train_number} on {date_of_journey} in class {class_type}.",
+        voice="man", language="en-IN"
+    )
+    response.pause(length=1)
+    response.say("Please verify your details and try again.", voice="man", language="en-IN")
+    response.redirect("/seat_availability")
+    return response
+
+
 @router.post("/check_availability")
 async def check_availability(request: Request):
     form = await request.form()
-    transcription_text = form.get("TranscriptionText")
-    recording_url = form.get("RecordingUrl")
-
-    query = request.query_params
-    train_number = query.get("train_number")
-    date_of_journey = query.get("date_of_journey")
+    caller_text = caller_input(form)
 
-    response = VoiceResponse()
+    session = await sessions.get(form.get("CallSid"))
+    train_number = session.get("train_number")
+    date_of_journey = session.get("date_of_journey")
 
-    if not transcription_text:
-        response.say(
-            "Sorry, I could not understand the class type. Let's try again.",
-            voice="man", language="en-IN"
-        )
-        response.redirect("/seat_availability")
-        return Response(content=str(response), media_type="application/xml")
+    if not caller_text:
+        return interaction_log.reprompt(class_not_captured)
+    if not train_number or not date_of_journey:
+        return interaction_log.reprompt(seat_session_expired)
 
-    class_type = transcription_text.strip().title()
+    class_type = spoken_class(caller_text)
 
     # --- Fetch from DB ---
     try:
-        conn = get_connection()
-        seat_info = seat_db.get_seat_availability(conn, train_number, date_of_journey, class_type)
-        conn.close()
-    except Exception as e:
-        print("❌ Database error while fetching seat availability:", e)
-        response.say(
-            "We are facing some technical issues fetching seat availability. Please try again later.",
-            voice="man", language="en-IN"
-        )
-        response.hangup()
-        return Response(content=str(response), media_type="application/xml")
+        seat_info = await async_db.get_seat_availability(train_number, date_of_journey, class_type)
+    except Exception:
+        logger.exception("❌ Database error while fetching seat availability", extra={
+            "train_number": train_number, "date_of_journey": date_of_journey, "class_type": class_type,
+        })
+        return seat_lookup_failed.response()
 
     # --- If found ---
     if seat_info:
-        train_name = seat_info["train_name"]
-        available = seat_info["available_seats"]
-        total = seat_info["total_seats"]
-
-        response.say(
-            f"Train {train_number}, {train_name}, class {class_type}, on {date_of_journey}.",
-            voice="man", language="en-IN"
-        )
-        response.pause(length=1)
-        response.say(
-            f"There are {available} seats available out of {total} total seats.",
-            voice="man", language="en-IN"
-        )
-        response.pause(length=1)
-        response.say(
-            "Thank you for using Indian Railways seat availability service.",
-            voice="man", language="en-IN"
-        )
-        response.hangup()
-    else:
-        response.say(
-            f"Sorry, no seat availability found for train number {train_number} on {date_of_journey} in class {class_type}.",
-            voice="man", language="en-IN"
+        # Once the inventory tracks this train/date/class its count is the live one
+        available = seat_inventory.available((train_number, date_of_journey, class_type))
+        return seats_found.response(
+            train_number=train_number,
+            train_name=seat_info["train_name"],
+            class_type=class_type,
+            date_of_journey=date_of_journey,
+            available=seat_info["available_seats"] if available is None else available,
+            total=seat_info["total_seats"],
         )
-        response.pause(length=1)
-        response.say("Please verify your details and try again.", voice="man", language="en-IN")
-        response.redirect("/seat_availability")
 
-    return Response(content=str(response), media_type="application/xml")
+    return seats_not_found.response(
+        train_number=train_number, date_of_journey=date_of_journey, class_type=class_type
+    )
+
+
+# -------------------------------------------------------------------------
+# 5️⃣ Seat holds (JSON, for the booking desk / partner integrations)
+# -------------------------------------------------------------------------
+@router.post("/holds")
+async def create_hold(request: Request):
+    try:
+        body = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Expected a JSON object with train_number, date_of_journey and class_type")
+    try:
+        train_number = str(body["train_number"])
+        date_of_journey = str(body["date_of_journey"])
+        class_type = str(body["class_type"])
+        seats = int(body.get("seats", 1))
+        hold_id = await seat_inventory.hold(train_number, date_of_journey, class_type, seats)
+    except (KeyError, TypeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    key = (train_number, date_of_journey, class_type)
+    if hold_id is None:
+        if seat_inventory.available(key) is None:
+            raise HTTPException(status_code=404, detail="No seat inventory for this train, date and class")
+        raise HTTPException(status_code=409, detail="Not enough seats available")
+    return {"hold_id": hold_id, "seats": seats, "expires_in": seat_inventory.hold_ttl,
+            "available": seat_inventory.available(key)}
+
+
+@router.post("/holds/{hold_id}/confirm")
+async def confirm_hold(hold_id: str):
+    if not seat_inventory.confirm(hold_id):
+        raise HTTPException(status_code=404, detail="Hold not found or expired")
+    return {"hold_id": hold_id, "status": "confirmed"}
+
+
+@router.delete("/holds/{hold_id}")
+async def release_hold(hold_id: str):
+    if not seat_inventory.release(hold_id):
+        raise HTTPException(status_code=404, detail="Hold not found or expired")
+    return {"hold_id": hold_id, "status": "released"}
@@ -1,127 +1,386 @@
-from fastapi import APIRouter, Request
-from fastapi.responses import Response
+import datetime
+import logging
+
+from fastapi import APIRouter, HTTPException, Request
 from twilio.twiml.voice_response import VoiceResponse
-from app.db.database import get_connection
-from app.db import train_schedule_db
+from app.db import async_db
+from app.services.interaction_log import interaction_log
+from app.services.session_store import sessions
+from app.services.speech_input import DIGIT_HINTS, caller_input, speech_gather
+from app.services.speech_normalizer import parse_date, parse_route, spoken_digits
+from app.services.train_name_index import train_name_index
+from app.services.twiml import StaticTwiML, TwiMLTemplate, TwiMLFragment, fragments_response
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/train_schedule", tags=["Train Schedule"])
 
+# The train prompt takes numbers, names and "from A to B" searches
+ROUTE_HINTS = ("from", "to", "today", "tomorrow", "day after tomorrow", "on")
+TRAIN_HINTS = DIGIT_HINTS + ("Express", "Mail", "Rajdhani", "Shatabdi") + ROUTE_HINTS
+
 # -------------------------------------------------------------------------
 # 1️⃣ Step 1 — Ask for train number
 # -------------------------------------------------------------------------
+@StaticTwiML
+def ask_train_number_prompt():
+    response = VoiceResponse()
+    response.say(
+        "Welcome to the Indian Railways train schedule department.",
+        voice="man", language="en-IN"
+    )
+    response.pause(length=1)
+    # Not only digits here, so the general phone-call speech model
+    gather = speech_gather(
+        response, "/train_schedule/process_train_number",
+        hints=TRAIN_HINTS, digits=5, partial="train", model="phone_call",
+    )
+    gather.say(
+        "Please say your train number or train name, or enter the number on your keypad. "
+        "For example, say one two six two seven, or Karnataka Express.",
+        voice="man", language="en-IN"
+    )
+    gather.say(
+        "To find trains between two stations, say from, and to, and the date, "
+        "for example, from New Delhi to Bangalore tomorrow.",
+        voice="man", language="en-IN"
+    )
+    return response
+
+
 @router.post("/")
 async def ask_for_train_number(request: Request):
     """
     Entry point when user is redirected to train schedule department.
-    Prompts the caller to say the train number clearly after the beep.
+    Asks for the train number or name (speech or keypad), or a station pair.
     """
+    return ask_train_number_prompt.response()
+
+
+# -------------------------------------------------------------------------
+# 2️⃣ Step 2 — Process the caller's answer and fetch schedule info
+# -------------------------------------------------------------------------
+@StaticTwiML
+def train_number_not_captured():
     response = VoiceResponse()
     response.say(
-        "Welcome to the Indian Railways train schedule department.",
+        "Sorry, I could not understand your train number. Let's try again.",
+        voice="man", language="en-IN"
+    )
+    response.redirect("/train_schedule")
+    return response
+
+
+@StaticTwiML
+def schedule_lookup_failed():
+    response = VoiceResponse()
+    response.say(
+        "We are facing technical issues fetching the train schedule. Please try again later.",
+        voice="man", language="en-IN"
+    )
+    response.hangup()
+    return response
+
+
+@TwiMLTemplate
+def schedule_found(train_number, train_name, source, destination, departure, arrival, duration, days):
+    response = VoiceResponse()
+    response.say(
+        f"Train number {train_number}, {train_name}, runs from {source} to {destination}.",
         voice="man", language="en-IN"
     )
     response.pause(length=1)
     response.say(
-        "Please say your train number clearly after the beep, "
-        "for example, say one two six two seven for Karnataka Express.",
+        f"It departs from {source} at {departure}, and arrives at {destination} at {arrival}.",
         voice="man", language="en-IN"
     )
+    response.pause(length=1)
+    response.say(
+        f"Total travel time is {duration}. This train operates on {days}.",
+        voice="man", language="en-IN"
+    )
+    response.pause(length=1)
+    response.say(
+        "Thank you for calling the train schedule department. Have a pleasant journey.",
+        voice="man", language="en-IN"
+    )
+    response.hangup()
+    return response
+
 
-    response.record(
-        timeout=6,
-        transcribe=True,
-        max_length=10,
-        play_beep=True,
-        action="/train_schedule/process_train_number"  # Next step
+@TwiMLTemplate
+def schedule_not_found(train_number):
+    response = VoiceResponse()
+    response.say(
+        f"Sorry, I could not find any schedule for train number {train_number}.",
+        voice="man", language="en-IN"
+    )
+    response.pause(length=1)
+    response.say(
+        "Please check your train number and try again.",
+        voice="man", language="en-IN"
     )
+    response.redirect("/train_schedule")
+    return response
 
-    return Response(content=str(response), media_type="application/xml")
+
+@TwiMLTemplate
+def train_choice_prompt(choices, hints):
+    response = VoiceResponse()
+    gather = response.gather(
+        input="dtmf speech",
+        num_digits=1,
+        timeout=5,
+        hints=hints,
+        action="/train_schedule/choose_train",
+    )
+    gather.say(f"I found more than one train. Please {choices}.", voice="man", language="en-IN")
+    response.redirect("/train_schedule")
+    return response
+
+
+async def schedule_response(call_sid: str, train_number: str):
+    """Look the train up and speak its schedule (shared by the number, name and choice paths)."""
+    try:
+        train_info = await async_db.get_train_schedule(train_number)
+    except Exception:
+        logger.exception("❌ Database error while fetching train schedule", extra={"train_number": train_number})
+        return schedule_lookup_failed.response()
+
+    # --- If found ---
+    if train_info:
+        await sessions.update(call_sid, train_number=train_number, train_options=None)
+        return schedule_found.response(
+            train_number=train_number,
+            train_name=train_info["train_name"],
+            source=train_info["source"],
+            destination=train_info["destination"],
+            departure=train_info["departure_time"],
+            arrival=train_info["arrival_time"],
+            duration=train_info["travel_duration"],
+            days=train_info["days_of_operation"],
+        )
+
+    # --- No record found ---
+    return schedule_not_found.response(train_number=train_number)
 
 
-# -------------------------------------------------------------------------
-# 2️⃣ Step 2 — Process the transcription and fetch schedule info
-# -------------------------------------------------------------------------
 @router.post("/process_train_number")
 async def process_train_number(request: Request):
     """
-    Process the user's spoken train number and fetch schedule from DB.
+    Process the user's spoken train number (or train name) and fetch schedule from DB.
     """
     form = await request.form()
-    transcription_text = form.get("TranscriptionText")
-    recording_url = form.get("RecordingUrl")
-
-    response = VoiceResponse()
+    caller_text = caller_input(form)
+    call_sid = form.get("CallSid")
 
     # --- Handle no speech or unclear input ---
-    if not transcription_text:
-        response.say(
-            "Sorry, I could not understand your train number. Let's try again.",
-            voice="man", language="en-IN"
+    if not caller_text:
+        return interaction_log.reprompt(train_number_not_captured)
+
+    # "from New Delhi to Bangalore tomorrow": a station-pair search instead
+    route = parse_route(caller_text)
+    if route:
+        return await route_response(route)
+
+    # Speech recognition may give numbers in words ("one two six two seven")
+    train_number = spoken_digits(caller_text)
+    logger.info("🚆 Train schedule requested", extra={"train_number": train_number})
+
+    if not train_number:
+        # No number: try it as a train name ("Karnataka Express")
+        train, candidates = train_name_index.resolve(caller_text)
+        if train:
+            train_number = train.train_number
+        elif candidates:
+            await sessions.update(call_sid, train_options=[m.train_number for m in candidates])
+            return train_choice_prompt.response(
+                choices=", or ".join(
+                    f"press {index} for {m.train_name}" for index, m in enumerate(candidates, start=1)
+                ),
+                hints=", ".join(m.train_name for m in candidates),
+            )
+        else:
+            return interaction_log.reprompt(train_number_not_captured)
+
+    return await schedule_response(call_sid, train_number)
+
+
+@router.post("/choose_train")
+async def choose_train(request: Request):
+    """
+    Caller's answer to the "press 1 for ..., press 2 for ..." train menu.
+    """
+    form = await request.form()
+    call_sid = form.get("CallSid")
+    digits = form.get("Digits")
+    speech = form.get("SpeechResult")
+    options = (await sessions.get(call_sid)).get("train_options") or []
+
+    train_number = None
+    if digits and digits.isdigit() and 1 <= int(digits) <= len(options):
+        train_number = options[int(digits) - 1]
+    elif speech:
+        # Said the name instead: take the best match among the offered trains
+        train_number = next(
+            (m.train_number for m in train_name_index.search(speech, limit=10) if m.train_number in options),
+            None,
         )
-        response.redirect("/train_schedule")
-        return Response(content=str(response), media_type="application/xml")
 
-    # Extract digits only (Twilio may transcribe numbers in words)
-    train_number = "".join(ch for ch in transcription_text if ch.isdigit())
-    print(f"🚆 Train schedule requested for Train No: {train_number}")
-    print(f"🎧 Recording URL: {recording_url}")
+    if train_number is None:
+        return interaction_log.reprompt(train_number_not_captured)
+    return await schedule_response(call_sid, train_number)
+
+
+# -------------------------------------------------------------------------
+# 3️⃣ Trains between two stations on a date
+# -------------------------------------------------------------------------
+# Trains read out per call; the JSON endpoint returns the full list
+MAX_SPOKEN_TRAINS = 5
+
+
+@StaticTwiML
+def ask_route_prompt():
+    response = VoiceResponse()
+    gather = speech_gather(response, "/train_schedule/process_route", hints=ROUTE_HINTS)
+    gather.say(
+        "Please say the two stations and the date of travel, "
+        "for example, from New Delhi to Bangalore on the fifth of November.",
+        voice="man", language="en-IN"
+    )
+    return response
+
+
+@router.post("/route")
+async def ask_for_route(request: Request):
+    """
+    Entry point for the station-pair search ("trains from A to B on D").
+    """
+    return ask_route_prompt.response()
 
-    # --- Database lookup ---
+
+@StaticTwiML
+def route_not_captured():
+    response = VoiceResponse()
+    response.say(
+        "Sorry, I could not understand the stations or the date. Let's try again.",
+        voice="man", language="en-IN"
+    )
+    response.redirect("/train_schedule/route")
+    return response
+
+
+@TwiMLTemplate
+def no_trains_between(source, destination, day):
+    response = VoiceResponse()
+    response.say(
+        f"Sorry, I could not find a direct train from {source} to {destination} on {day}.",
+        voice="man", language="en-IN"
+    )
+    response.redirect("/train_schedule/route")
+    return response
+
+
+@TwiMLFragment
+def route_count_fragment(count, plural, source, destination, day):
+    response = VoiceResponse()
+    response.say(
+        f"I found {count} train{plural} from {source} to {destination} on {day}.",
+        voice="man", language="en-IN"
+    )
+    return response
+
+
+@TwiMLFragment
+def route_train_fragment(train_number, train_name, source, departure, destination, arrival):
+    response = VoiceResponse()
+    response.say(
+        f"Train number {train_number}, {train_name}, departs {source} at {departure} "
+        f"and arrives at {destination} at {arrival}.",
+        voice="man", language="en-IN"
+    )
+    return response
+
+
+@TwiMLFragment
+def route_goodbye_fragment():
+    response = VoiceResponse()
+    response.say(
+        "Thank you for calling the train schedule department. Have a pleasant journey.",
+        voice="man", language="en-IN"
+    )
+    response.hangup()
+    return response
+
+
+def spoken_day(journey_date: str) -> str:
+    date = datetime.date.fromisoformat(journey_date)
+    return f"{date:%A}, {date.day} {date:%B}"
+
+
+async def route_response(route):
+    """Look up direct trains for a parsed RouteRequest and read out the first few."""
+    if route.journey_date is None:
+        return interaction_log.reprompt(route_not_captured)
     try:
-        conn = get_connection()
-        train_info = train_schedule_db.get_train_schedule(conn, train_number)
-        conn.close()
-    except Exception as e:
-        print("❌ Database error while fetching train schedule:", e)
-        response.say(
-            "We are facing technical issues fetching the train schedule. Please try again later.",
-            voice="man", language="en-IN"
+        # One more than is read out: enough to tell "5 trains" from "more than 5"
+        trains = await async_db.get_trains_between(
+            route.source, route.destination, route.journey_date, limit=MAX_SPOKEN_TRAINS + 1,
         )
-        response.hangup()
-        return Response(content=str(response), media_type="application/xml")
+    except Exception:
+        logger.exception("❌ Database error while searching trains between stations")
+        return schedule_lookup_failed.response()
 
-    # --- If found ---
-    if train_info:
-        train_name = train_info["train_name"]
-        source = train_info["source"]
-        destination = train_info["destination"]
-        departure = train_info["departure_time"]
-        arrival = train_info["arrival_time"]
-        duration = train_info["travel_duration"]
-        days = train_info["days_of_operation"]
-
-        response.say(
-            f"Train number {train_number}, {train_name}, runs from {source} to {destination}.",
-            voice="man", language="en-IN"
-        )
-        response.pause(length=1)
-        response.say(
-            f"It departs from {source} at {departure}, and arrives at {destination} at {arrival}.",
-            voice="man", language="en-IN"
-        )
-        response.pause(length=1)
-        response.say(
-            f"Total travel time is {duration}. This train operates on {days}.",
-            voice="man", language="en-IN"
-        )
-        response.pause(length=1)
-        response.say(
-            "Thank you for calling the train schedule department. Have a pleasant journey.",
-            voice="man", language="en-IN"
-        )
-        response.hangup()
+    count = len(trains) if len(trains) <= MAX_SPOKEN_TRAINS else f"more than {MAX_SPOKEN_TRAINS}"
+    logger.info("🚆 Station-pair search", extra={
+        "source": route.source, "destination": route.destination, "journey_date": route.journey_date, "found": count,
+    })
+    day = spoken_day(route.journey_date)
+    if not trains:
+        return no_trains_between.response(source=route.source, destination=route.destination, day=day)
 
-    else:
-        # --- No record found ---
-        response.say(
-            f"Sorry, I could not find any schedule for train number {train_number}.",
-            voice="man", language="en-IN"
-        )
-        response.pause(length=1)
-        response.say(
-            "Please check your train number and try again.",
-            voice="man", language="en-IN"
-        )
-        response.redirect("/train_schedule")
+    fragments = [route_count_fragment.render(
+        count=count, plural="s" if len(trains) > 1 else "",
+        source=route.source, destination=route.destination, day=day,
+    )]
+    for train in trains[:MAX_SPOKEN_TRAINS]:
+        fragments.append(route_train_fragment.render(
+            train_number=train["train_number"],
+            train_name=train["train_name"],
+            source=train["source"],
+            departure=train["departure_time"],
+            destination=train["destination"],
+            arrival=train["arrival_time"],
+        ))
+    fragments.append(route_goodbye_fragment.render())
+    return fragments_response(*fragments)
 
-    return Response(content=str(response), media_type="application/xml")
+
+@router.post("/process_route")
+async def process_route(request: Request):
+    """
+    Parse "from <station> to <station> [on <date>]" and read out the direct trains.
+    """
+    form = await request.form()
+    route = parse_route(caller_input(form))
+    if route is None:
+        return interaction_log.reprompt(route_not_captured)
+    return await route_response(route)
+
+
+# -------------------------------------------------------------------------
+# 4️⃣ Trains between two stations (JSON, for the booking desk / partner integrations)
+# -------------------------------------------------------------------------
+@router.get("/routes")
+async def trains_between(source: str, destination: str, date: str = None, limit: int = 50):
+    """
+    Direct trains from `source` to `destination` running on `date`
+    (YYYY-MM-DD or a spoken form like "tomorrow"; defaults to today).
+    """
+    journey_date = parse_date(date) if date else datetime.date.today().isoformat()
+    if journey_date is None:
+        raise HTTPException(status_code=400, detail=f"Could not read the date {date!r}")
+    if not 1 <= limit <= 200:
+        raise HTTPException(status_code=400, detail="limit must be between 1 and 200")
+    trains = await async_db.get_trains_between(source, destination, journey_date, limit)
+    return {"source": source, "destination": destination, "date": journey_date, "trains": trains}
@@ -1,22 +1,42 @@
-from fastapi import APIRouter, Request, Form
-from fastapi.responses import Response
-from twilio.rest import Client
+import logging
+from fastapi import APIRouter, Request, Form, Response
 from twilio.twiml.voice_response import VoiceResponse
 from app.core.config import settings  # Twilio credentials from .env
+from app.services.twiml import StaticTwiML
+from app.services import intent_classifier
+from app.services.twilio_client import get_twilio_client
+from app.services.session_store import sessions
+from app.services.caller_prefetch import caller_prefetch
+from app.services.speech_input import caller_input, prefetch_partial, speech_gather
+from app.services.interaction_log import interaction_log
+from app.models.interaction import EventType
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/voice", tags=["Voice"])
 
-# Initialize Twilio client
-client = Client(settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN)
+# Phrases the main menu expects (speech recognition hints)
+MENU_HINTS = ("P N R status", "complaint", "emergency", "train schedule", "seat availability", "refund status",
+              "cancellation", "booking status", "train timing")
 
 # -------------------------------------------------------------------------
 # 1️⃣ Incoming call entry point
 # -------------------------------------------------------------------------
-@router.post("/incoming")
-async def incoming_call(request: Request):
-    """
-    Handle incoming Twilio voice calls (caller speaks query).
-    """
+def main_menu_gather(response):
+    # Speech recognised while the caller talks; they can answer during the prompt
+    gather = speech_gather(response, f"{settings.PUBLIC_BASE_URL}/voice/recording_complete", hints=MENU_HINTS)
+    gather.say(
+        "Please briefly tell me your query. "
+        "You can say things like: Check P N R status, register a complaint, "
+        "emergency help, train schedule, seat availability, or refund status.",
+        voice="man"
+    )
+    return gather
+
+
+@StaticTwiML
+def greeting_prompt():
     response = VoiceResponse()
 
     # Greeting + instructions
@@ -25,82 +45,209 @@ async def incoming_call(request: Request):
         voice="man"
     )
     response.pause(length=1)
-    response.say(
-        "Please clearly state your query after the beep. "
-        "You can say things like: Check P N R status, register a complaint, "
-        "emergency help, train schedule, seat availability, or refund status.",
-        voice="man"
-    )
+    main_menu_gather(response)
+    return response
 
-    # Record caller speech and automatically transcribe
-    response.record(
-        timeout=5,
-        transcribe=True,  # Twilio does speech-to-text
-        max_length=20,    # Limit recording time
-        play_beep=True,
-        # ✅ FIX: Use full public URL for action
-        action="https://malissa-silvicultural-overwildly.ngrok-free.dev/voice/recording_complete"
-    )
 
-    return Response(content=str(response), media_type="application/xml")
+@StaticTwiML
+def main_menu_prompt():
+    response = VoiceResponse()
+    response.say("Sorry, I did not get your choice. Let's try again.", voice="man")
+    main_menu_gather(response)
+    return response
+
+
+@router.post("/incoming")
+async def incoming_call(request: Request):
+    """
+    Handle incoming Twilio voice calls (caller speaks query).
+    """
+    form = await request.form()
+    interaction_log.record(EventType.CALL_STARTED)
+    # Load what we know about this number while the greeting plays
+    caller_prefetch.start(form.get("CallSid"), form.get("From"))
+    return greeting_prompt.response()
+
+
+@router.post("/menu")
+async def main_menu():
+    """
+    Ask the main-menu question again later in the call (no new CALL_STARTED or caller prefetch).
+    """
+    return interaction_log.reprompt(main_menu_prompt)
 
 
 # -------------------------------------------------------------------------
-# 2️⃣ Twilio sends recorded + transcribed text here
+# 2️⃣ Twilio sends the caller's recognised query here
 # -------------------------------------------------------------------------
+def _redirect_twiml(name: str, message: str, redirect_url: str):
+    """Pre-render the fixed "Redirecting you to ..." response for one department."""
+    def build():
+        response = VoiceResponse()
+        response.say(message, voice="man")
+        response.redirect(redirect_url)
+        return response
+    return StaticTwiML(build, name=name)
+
+
+# department -> (spoken name used in the disambiguation menu, pre-rendered redirect)
+DEPARTMENTS = {
+    intent_classifier.PNR_STATUS: ("P N R status", _redirect_twiml(
+        "redirect_pnr_status",
+        "Redirecting you to the P N R status department.",
+        f"{settings.PUBLIC_BASE_URL}/pnr_status",
+    )),
+    intent_classifier.COMPLAINTS: ("complaints", _redirect_twiml(
+        "redirect_complaints",
+        "Redirecting you to the complaints department.",
+        f"{settings.PUBLIC_BASE_URL}/complaints",
+    )),
+    intent_classifier.EMERGENCY: ("emergency services", _redirect_twiml(
+        "redirect_emergency",
+        "Connecting you to emergency services.",
+        f"{settings.PUBLIC_BASE_URL}/emergency",
+    )),
+    intent_classifier.TRAIN_SCHEDULE: ("train schedule", _redirect_twiml(
+        "redirect_train_schedule",
+        "Redirecting you to the train schedule department.",
+        f"{settings.PUBLIC_BASE_URL}/train_schedule",
+    )),
+    intent_classifier.SEAT_AVAILABILITY: ("seat availability", _redirect_twiml(
+        "redirect_seat_availability",
+        "Redirecting you to the seat availability department.",
+        f"{settings.PUBLIC_BASE_URL}/seat_availability",
+    )),
+    intent_classifier.REFUNDS: ("refund status", _redirect_twiml(
+        "redirect_refunds",
+        "Redirecting you to the refund department.",
+        f"{settings.PUBLIC_BASE_URL}/refunds",
+    )),
+}
+
+
+@StaticTwiML
+def request_not_understood():
+    response = VoiceResponse()
+    response.say("Sorry, I could not understand your request.", voice="man")
+    response.say("Please try again or contact customer service.", voice="man")
+    response.hangup()
+    return response
+
+
+@lru_cache(maxsize=None)
+def disambiguation_prompt(options: tuple):
+    """Ask the caller to choose between the top-scoring departments (keypad or speech)."""
+    def build():
+        response = VoiceResponse()
+        gather = response.gather(
+            input="dtmf speech",
+            num_digits=1,
+            timeout=5,
+            hints=", ".join(DEPARTMENTS[d][0] for d in options),
+            action=f"{settings.PUBLIC_BASE_URL}/voice/disambiguate",
+        )
+        choices = ", or ".join(
+            f"press {index} for {DEPARTMENTS[d][0]}" for index, d in enumerate(options, start=1)
+        )
+        gather.say(f"I want to make sure I connect you correctly. Please {choices}.", voice="man")
+        # No choice made: back to the main-menu question, not the start of the call
+        response.redirect(f"{settings.PUBLIC_BASE_URL}/voice/menu")
+        return response
+    return StaticTwiML(build, name=f"disambiguate_{'_or_'.join(options)}")
+
+
+async def route_transcript(call_sid: str, text: str):
+    """Redirect to the classified department, or ask the caller to choose."""
+    result = intent_classifier.classify(text)
+    logger.debug("🧭 Intent classified", extra={
+        "department": result.department, "confidence": round(result.confidence, 2), "scores": result.scores,
+    })
+
+    if result.department:
+        interaction_log.record(EventType.INTENT_CHOSEN, department=result.department, outcome="classified",
+                               value=round(result.confidence, 3))
+        await sessions.update(call_sid, department=result.department, department_options=None)
+        return DEPARTMENTS[result.department][1].response()
+    if result.candidates:
+        options = result.candidates[:2]
+        interaction_log.record(EventType.INTENT_CHOSEN, outcome="ambiguous", value=round(result.confidence, 3))
+        await sessions.update(call_sid, department_options=list(options))
+        return disambiguation_prompt(options).response()
+    interaction_log.record(EventType.INTENT_CHOSEN, outcome="not_understood")
+    return request_not_understood.response()
+
+
 @router.post("/recording_complete")
 async def recording_complete(request: Request):
     """
-    Handle completed recording + transcription from Twilio.
+    The greeting's Gather result (SpeechResult; kept at this URL for calls in progress across a deploy).
     """
     form = await request.form()
-    recording_url = form.get("RecordingUrl")
-    transcription_text = form.get("TranscriptionText")
-
-    print("\n--- Incoming Call Transcription ---")
-    print(f"Recording URL: {recording_url}")
-    print(f"Transcription: {transcription_text}")
-    print("-----------------------------------\n")
 
     # --- Analyze what the caller said ---
-    if not transcription_text:
-        transcription_text = ""
-    text = transcription_text.lower()
-
-    # Identify which module the user is asking for
-    if "pnr" in text or "status" in text:
-        redirect_url = "https://malissa-silvicultural-overwildly.ngrok-free.dev/pnr_status"
-        message = "Redirecting you to the P N R status department."
-    elif "complaint" in text or "issue" in text or "problem" in text:
-        redirect_url = "https://malissa-silvicultural-overwildly.ngrok-free.dev/complaints"
-        message = "Redirecting you to the complaints department."
-    elif "emergency" in text or "help" in text or "accident" in text:
-        redirect_url = "https://malissa-silvicultural-overwildly.ngrok-free.dev/emergency"
-        message = "Connecting you to emergency services."
-    elif "schedule" in text or "time" in text or "train" in text:
-        redirect_url = "https://malissa-silvicultural-overwildly.ngrok-free.dev/train_schedule"
-        message = "Redirecting you to the train schedule department."
-    elif "seat" in text or "availability" in text or "booking" in text:
-        redirect_url = "https://malissa-silvicultural-overwildly.ngrok-free.dev/seat_availability"
-        message = "Redirecting you to the seat availability department."
-    elif "refund" in text or "cancel" in text or "money" in text:
-        redirect_url = "https://malissa-silvicultural-overwildly.ngrok-free.dev/refunds"
-        message = "Redirecting you to the refund department."
-    else:
-        redirect_url = None
-        message = "Sorry, I could not understand your request."
-
-    # --- Build TwiML response ---
-    response = VoiceResponse()
-    response.say(message, voice="man")
+    return await route_transcript(form.get("CallSid"), caller_input(form))
 
-    if redirect_url:
-        response.redirect(redirect_url)
-    else:
-        response.say("Please try again or contact customer service.", voice="man")
-        response.hangup()
 
-    return Response(content=str(response), media_type="application/xml")
+@router.post("/partial_speech")
+async def partial_speech(request: Request, kind: str = ""):
+    """
+    Gather partialResultCallback: interim transcripts while the caller is
+    still speaking. A complete PNR / train number starts its lookup now, so
+    the Gather's action finds the row cached.
+    """
+    form = await request.form()
+    heard = " ".join(filter(None, (form.get("StableSpeechResult"), form.get("UnstableSpeechResult"))))
+    prefetch_partial(kind, heard)
+    return Response(status_code=204)
+
+
+@router.post("/disambiguate")
+async def disambiguate(request: Request):
+    """
+    Caller's answer to the "press 1 for ..., press 2 for ..." menu.
+    """
+    form = await request.form()
+    call_sid = form.get("CallSid")
+    digits = form.get("Digits")
+    speech = form.get("SpeechResult")
+    session = await sessions.get(call_sid)
+    options = [d for d in session.get("department_options", ()) if d in DEPARTMENTS]
+
+    department = None
+    if digits and digits.isdigit() and 1 <= int(digits) <= len(options):
+        department = options[int(digits) - 1]
+    elif speech:
+        result = intent_classifier.classify(speech, allowed=options)
+        if result.candidates:
+            department = result.candidates[0]
+
+    if department is None:
+        interaction_log.record(EventType.INTENT_CHOSEN, outcome="not_understood")
+        return request_not_understood.response()
+    interaction_log.record(EventType.INTENT_CHOSEN, department=department, outcome="keypad" if digits else "speech")
+    await sessions.update(call_sid, department=department, department_options=None)
+    return DEPARTMENTS[department][1].response()
+
+
+@router.post("/status")
+async def call_status(request: Request):
+    """
+    Twilio call-status callback (set the number's "Call status changes" webhook
+    to {PUBLIC_BASE_URL}/voice/status). Records the hangup against the department
+    the caller was routed to and drops the call's session.
+    """
+    form = await request.form()
+    call_sid = form.get("CallSid")
+    status = form.get("CallStatus") or ""
+    if status in ("completed", "busy", "no-answer", "failed", "canceled"):
+        session = await sessions.get(call_sid)
+        duration = form.get("CallDuration")
+        interaction_log.record(
+            EventType.HANGUP, department=session.get("department") or "voice", outcome=status,
+            value=float(duration) if duration and duration.isdigit() else None,
+        )
+        await sessions.clear(call_sid)
+    return Response(status_code=204)
 
 
 # -------------------------------------------------------------------------
@@ -111,7 +258,7 @@ async def make_call(to_number: str = Form(...)):
     """
     Initiate an outbound call using Twilio.
     """
-    call = client.calls.create(
+    call = get_twilio_client().calls.create(
         twiml="""
             <Response>
                 <Say voice="man">Hello, this is the Indian Railways IVR system calling you.</Say>
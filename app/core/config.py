@@ -7,5 +7,92 @@ class Settings:
     TWILIO_ACCOUNT_SID: str = os.getenv("TWILIO_ACCOUNT_SID")
     TWILIO_AUTH_TOKEN: str = os.getenv("TWILIO_AUTH_TOKEN")
     TWILIO_PHONE_NUMBER: str = os.getenv("TWILIO_PHONE_NUMBER")
+    # REST calls (alert SMS, outbound calls): seconds to connect, and again per read
+    TWILIO_HTTP_TIMEOUT: float = float(os.getenv("TWILIO_HTTP_TIMEOUT", "10"))
+
+    # Public URL Twilio uses to reach this app (ngrok / Render)
+    PUBLIC_BASE_URL: str = os.getenv("PUBLIC_BASE_URL", "https://malissa-silvicultural-overwildly.ngrok-free.dev")
+
+    # SQLite database + connection pool tuning
+    DB_PATH: str = os.getenv(
+        "DB_PATH", os.path.join(os.path.dirname(os.path.dirname(__file__)), "db", "railway_ivr.db")
+    )
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "8"))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "5.0"))        # seconds to wait for a free connection
+    DB_BUSY_TIMEOUT_MS: int = int(os.getenv("DB_BUSY_TIMEOUT_MS", "5000"))     # SQLite lock wait before SQLITE_BUSY
+    DB_SYNCHRONOUS: str = os.getenv("DB_SYNCHRONOUS", "NORMAL")                # NORMAL is durable enough under WAL
+    DB_MMAP_SIZE: int = int(os.getenv("DB_MMAP_SIZE", str(64 * 1024 * 1024)))  # bytes
+    DB_CACHE_SIZE_KB: int = int(os.getenv("DB_CACHE_SIZE_KB", "8192"))         # page cache per connection
+    DB_EXECUTOR_WORKERS: int = int(os.getenv("DB_EXECUTOR_WORKERS", str(DB_POOL_SIZE)))  # threads running queries
+    # Skip the CREATE TABLE / seed bootstrap when the stored schema version is already current
+    DB_FAST_START: bool = os.getenv("DB_FAST_START", "true").lower() in ("1", "true", "yes")
+    DB_GROUP_COMMIT_MAX_BATCH: int = int(os.getenv("DB_GROUP_COMMIT_MAX_BATCH", "64"))          # inserts per commit
+    DB_GROUP_COMMIT_MAX_DELAY_MS: float = float(os.getenv("DB_GROUP_COMMIT_MAX_DELAY_MS", "2"))  # wait to fill a group
+
+    # In-memory copy of the reference tables (train_schedule, seat_availability, pnr_details) for their lookups
+    DB_READ_SNAPSHOT: bool = os.getenv("DB_READ_SNAPSHOT", "false").lower() in ("1", "true", "yes")
+    DB_SNAPSHOT_REFRESH_INTERVAL: float = float(os.getenv("DB_SNAPSHOT_REFRESH_INTERVAL", "300"))  # seconds; changes refresh sooner
+    # Changed rows are read from the file meanwhile; at most one change-driven re-copy per this many seconds
+    DB_SNAPSHOT_MIN_REFRESH_INTERVAL: float = float(os.getenv("DB_SNAPSHOT_MIN_REFRESH_INTERVAL", "30"))
+
+    # In-process lookup cache (entries per table, TTLs in seconds)
+    CACHE_MAX_ENTRIES: int = int(os.getenv("CACHE_MAX_ENTRIES", "5000"))
+    CACHE_TTL_PNR: float = float(os.getenv("CACHE_TTL_PNR", "300"))
+    CACHE_TTL_SCHEDULE: float = float(os.getenv("CACHE_TTL_SCHEDULE", "3600"))
+    CACHE_TTL_SEATS: float = float(os.getenv("CACHE_TTL_SEATS", "30"))
+    CACHE_TTL_COMPLAINTS: float = float(os.getenv("CACHE_TTL_COMPLAINTS", "60"))
+    # Cross-worker invalidation: each worker polls the change_log table written by triggers
+    CACHE_SYNC_INTERVAL: float = float(os.getenv("CACHE_SYNC_INTERVAL", "1.0"))        # seconds between polls
+    CHANGE_LOG_RETENTION: float = float(os.getenv("CHANGE_LOG_RETENTION", "3600"))     # seconds kept before purge
+
+    # Per-call session state (keyed by Twilio CallSid). Use "sqlite" when running several workers.
+    SESSION_BACKEND: str = os.getenv("SESSION_BACKEND", "memory")             # "memory" or "sqlite"
+    SESSION_TTL: float = float(os.getenv("SESSION_TTL", "1800"))               # seconds since last update
+    SESSION_MAX_ENTRIES: int = int(os.getenv("SESSION_MAX_ENTRIES", "20000"))  # memory backend bound
+
+    # Caller-ID prefetch: the caller's PNRs, refunds and complaints loaded into the session on /voice/incoming
+    CALLER_PREFETCH_PNRS: int = int(os.getenv("CALLER_PREFETCH_PNRS", "5"))        # most recent PNRs kept
+    CALLER_PREFETCH_WAIT: float = float(os.getenv("CALLER_PREFETCH_WAIT", "0.5"))  # seconds a handler waits for it
+
+    # In-memory seat inventory (holds are process-local; confirmed bookings are written behind)
+    SEAT_HOLD_TTL: float = float(os.getenv("SEAT_HOLD_TTL", "600"))               # seconds before an unconfirmed hold lapses
+    SEAT_MAX_PER_HOLD: int = int(os.getenv("SEAT_MAX_PER_HOLD", "6"))
+    SEAT_FLUSH_INTERVAL: float = float(os.getenv("SEAT_FLUSH_INTERVAL", "1.0"))   # write-behind period
+
+    # Caller input: <Gather input="speech dtmf"> (Twilio speech recognition) on every department prompt
+    SPEECH_LANGUAGE: str = os.getenv("SPEECH_LANGUAGE", "en-IN")
+    SPEECH_TIMEOUT: str = os.getenv("SPEECH_TIMEOUT", "auto")                     # silence that ends speech: seconds or "auto"
+    SPEECH_PARTIAL_RESULTS: bool = os.getenv("SPEECH_PARTIAL_RESULTS", "true").lower() in ("1", "true", "yes")  # prefetch from interim transcripts
+
+    # Fuzzy train-name index (train schedule department)
+    TRAIN_INDEX_REFRESH_INTERVAL: float = float(os.getenv("TRAIN_INDEX_REFRESH_INTERVAL", "300"))  # seconds
+
+    # Call interaction events: buffered in memory, appended in batches, rolled up per hour + department
+    INTERACTION_FLUSH_INTERVAL: float = float(os.getenv("INTERACTION_FLUSH_INTERVAL", "2.0"))  # seconds
+    INTERACTION_BATCH_SIZE: int = int(os.getenv("INTERACTION_BATCH_SIZE", "500"))              # flush early at this many
+    INTERACTION_BUFFER_MAX: int = int(os.getenv("INTERACTION_BUFFER_MAX", "20000"))            # then events are dropped
+    INTERACTION_RETENTION_DAYS: float = float(os.getenv("INTERACTION_RETENTION_DAYS", "30"))   # raw events; rollups are kept
+
+    # Logging: JSON lines (or "text") written by a background thread
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    LOG_FORMAT: str = os.getenv("LOG_FORMAT", "json")                            # "json" or "text"
+    LOG_DEBUG_SAMPLE_RATE: float = float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "0.1"))  # share of calls whose DEBUG lines are kept
+    LOG_QUEUE_SIZE: int = int(os.getenv("LOG_QUEUE_SIZE", "10000"))              # records; more are dropped, never waited on
+
+    # Partner batch API (/partner/*): JSON in, NDJSON out
+    PARTNER_API_KEY: str = os.getenv("PARTNER_API_KEY")                                # sent as X-Partner-Key; unset refuses every request
+    PARTNER_MAX_PNRS: int = int(os.getenv("PARTNER_MAX_PNRS", "500"))                  # per request
+    PARTNER_MAX_BODY_BYTES: int = int(os.getenv("PARTNER_MAX_BODY_BYTES", str(64 * 1024)))
+    PARTNER_QUERY_CHUNK: int = int(os.getenv("PARTNER_QUERY_CHUNK", "200"))            # PNRs per IN (...) query
+
+    # Outbound emergency alerts (queued in SQLite, sent by background workers)
+    ALERT_SENDER: str = os.getenv("ALERT_SENDER", "twilio")                   # "twilio" or "stub" (log only)
+    ALERT_RECIPIENT: str = os.getenv("ALERT_RECIPIENT", "+911234567890")      # control room number
+    ALERT_WORKERS: int = int(os.getenv("ALERT_WORKERS", "2"))
+    ALERT_MAX_ATTEMPTS: int = int(os.getenv("ALERT_MAX_ATTEMPTS", "6"))        # then dead-lettered
+    ALERT_BACKOFF_BASE: float = float(os.getenv("ALERT_BACKOFF_BASE", "2.0"))  # seconds, doubled per attempt
+    ALERT_BACKOFF_MAX: float = float(os.getenv("ALERT_BACKOFF_MAX", "300"))
+    ALERT_POLL_INTERVAL: float = float(os.getenv("ALERT_POLL_INTERVAL", "5.0"))  # idle re-check for due retries
+    ALERT_LEASE_SECONDS: float = float(os.getenv("ALERT_LEASE_SECONDS", "60"))   # reclaim sends a dead worker left
 
 settings = Settings()
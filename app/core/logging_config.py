@@ -0,0 +1,203 @@
+"""
+Non-blocking, structured logging.
+
+A handler that writes to stdout blocks the thread that logs, and for request
+handlers that thread is the event loop. `setup_logging()` instead puts one
+QueueHandler on the root logger. Logging a record only renders its message
+and puts it on an in-memory queue; a QueueListener thread does the writing.
+If that queue is full the record is dropped and counted, never waited for.
+
+Every record is stamped with the CallSid and route of the request that
+logged it (context variables set by LogContextMiddleware, inherited by tasks
+the request starts). The record is written as one JSON object per line,
+together with any `extra=` fields:
+
+  {"ts": "2024-05-01T10:15:02.113Z", "level": "INFO", "logger": "app.api.routes.pnr_status.pnr_status",
+   "msg": "📄 PNR status requested", "call_sid": "CA12...", "route": "/pnr_status/process_pnr",
+   "pnr_number": "1234567890"}
+
+LOG_FORMAT=text prints plain lines for local development instead.
+
+High-volume DEBUG lines (transcripts, intent scores, change-feed batches) are
+sampled per call. LOG_DEBUG_SAMPLE_RATE of calls log all of their debug
+lines and the rest log none, so a sampled call can still be followed from
+end to end.
+
+Call `setup_logging()` once per process (the app's startup hook, the
+gunicorn master around migrations) and `stop_logging()` before it exits,
+so queued records are written out.
+"""
+import atexit
+import contextvars
+import copy
+import json
+import logging
+import queue
+import random
+import sys
+import time
+import zlib
+from logging.handlers import QueueHandler, QueueListener
+
+from app.core.config import settings
+
+call_sid_var = contextvars.ContextVar("call_sid", default=None)
+route_var = contextvars.ContextVar("route", default=None)
+
+# Attributes every LogRecord has; anything else on a record came from `extra=`
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {
+    "message", "asctime", "call_sid", "route",
+}
+_TRACEBACKS = logging.Formatter()
+# Third-party loggers that are chatty at INFO
+_QUIET_LOGGERS = ("twilio.http_client",)
+
+
+def extra_fields(record: logging.LogRecord) -> dict:
+    return {key: value for key, value in vars(record).items() if key not in _RECORD_ATTRS}
+
+
+# ---------------------------------------------------------
+# 1️⃣ Filters (run in the caller's thread, before queueing)
+# ---------------------------------------------------------
+class ContextFilter(logging.Filter):
+    """Stamp records with the current call's CallSid and route."""
+
+    def filter(self, record):
+        record.call_sid = call_sid_var.get()
+        record.route = route_var.get()
+        return True
+
+
+class DebugSampler(logging.Filter):
+    """Keep DEBUG records for `rate` of calls (by CallSid hash), or at random outside a call."""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.threshold = int(min(max(rate, 0.0), 1.0) * 10000)
+
+    def filter(self, record):
+        if record.levelno > logging.DEBUG or self.threshold >= 10000:
+            return True
+        call_sid = getattr(record, "call_sid", None)
+        if call_sid:
+            return zlib.crc32(call_sid.encode()) % 10000 < self.threshold
+        return random.randrange(10000) < self.threshold
+
+
+# ---------------------------------------------------------
+# 2️⃣ Formatters (run on the listener thread)
+# ---------------------------------------------------------
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        if record.call_sid:
+            entry["call_sid"] = record.call_sid
+        if record.route:
+            entry["route"] = record.route
+        entry.update(extra_fields(record))
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)-7s %(message)s", "%H:%M:%S")
+
+    def format(self, record):
+        line = super().format(record)
+        context = " ".join(
+            f"{key}={value}"
+            for key, value in {"call_sid": record.call_sid, "route": record.route, **extra_fields(record)}.items()
+            if value is not None
+        )
+        return f"{line}  [{context}]" if context else line
+
+
+# ---------------------------------------------------------
+# 3️⃣ Queue handler that never blocks the caller
+# ---------------------------------------------------------
+class NonBlockingQueueHandler(QueueHandler):
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Render the message and traceback now: args and exc_info belong to the
+        # caller and may have changed by the time the listener gets to them.
+        # The traceback stays out of the message so JSON output can keep it apart.
+        record = copy.copy(record)
+        record.message = record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _TRACEBACKS.formatException(record.exc_info)
+            record.exc_info = None
+        if record.stack_info:
+            record.exc_text = "\n".join(filter(None, (record.exc_text, record.stack_info)))
+            record.stack_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _Listener(QueueListener):
+    def enqueue_sentinel(self):
+        # Blocking put: on a full queue the writer thread is draining it, so this
+        # waits a moment instead of raising queue.Full at shutdown
+        self.queue.put(self._sentinel)
+
+
+_handler = None
+_listener = None
+
+
+def setup_logging(level: str = None, fmt: str = None, sample_rate: float = None):
+    """Route all logging through the queue and start the writer thread (no-op if already running)."""
+    global _handler, _listener
+    if _listener is not None:
+        return
+
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(JsonFormatter() if (fmt or settings.LOG_FORMAT) == "json" else TextFormatter())
+
+    _handler = NonBlockingQueueHandler(queue.Queue(settings.LOG_QUEUE_SIZE))
+    _handler.addFilter(ContextFilter())
+    _handler.addFilter(DebugSampler(settings.LOG_DEBUG_SAMPLE_RATE if sample_rate is None else sample_rate))
+
+    root = logging.getLogger()
+    root.addHandler(_handler)
+    root.setLevel((level or settings.LOG_LEVEL).upper())
+    for name in _QUIET_LOGGERS:
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+    _listener = _Listener(_handler.queue, output)
+    _listener.start()
+
+
+def stop_logging():
+    """Write out queued records and stop the writer thread."""
+    global _handler, _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    logging.getLogger().removeHandler(_handler)
+    _handler = _listener = None
+
+
+def logging_stats():
+    if _handler is None:
+        return {"queued": 0, "dropped": 0}
+    return {"queued": _handler.queue.qsize(), "dropped": _handler.dropped}
+
+
+atexit.register(stop_logging)
@@ -0,0 +1,134 @@
+import sqlite3
+import datetime
+
+# Alert lifecycle: pending -> sending -> sent
+#                           \-> pending (retry, after backoff) ... -> dead
+PENDING = "pending"
+SENDING = "sending"
+SENT = "sent"
+DEAD = "dead"
+
+
+def _timestamp():
+    return datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+# -------------------------------------------------------------------
+# 1️⃣  Create the outbound alert queue table
+# -------------------------------------------------------------------
+def create_alerts_table(conn: sqlite3.Connection):
+    cursor = conn.cursor()
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS outbound_alerts (
+            alert_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            report_id TEXT,
+            channel TEXT,
+            recipient TEXT,
+            body TEXT,
+            status TEXT,
+            attempts INTEGER DEFAULT 0,
+            next_attempt_at REAL,
+            last_error TEXT,
+            provider_message_id TEXT,
+            created_at TEXT,
+            updated_at TEXT
+        )
+    """)
+    conn.commit()
+
+
+# -------------------------------------------------------------------
+# 2️⃣  Enqueue an alert for an emergency report
+# -------------------------------------------------------------------
+def enqueue_alert(conn: sqlite3.Connection, report_id: str, recipient: str, body: str,
+                  now: float, channel: str = "sms", commit: bool = True):
+    cursor = conn.cursor()
+    cursor.execute("""
+        INSERT INTO outbound_alerts (
+            report_id, channel, recipient, body, status,
+            attempts, next_attempt_at, created_at, updated_at
+        ) VALUES (?, ?, ?, ?, ?, 0, ?, ?, ?)
+    """, (report_id, channel, recipient, body, PENDING, now, _timestamp(), _timestamp()))
+    alert_id = cursor.lastrowid
+    cursor.execute(
+        "UPDATE emergency_reports SET alert_status = ?, alert_attempts = 0 WHERE report_id = ?",
+        (PENDING, report_id),
+    )
+    if commit:
+        conn.commit()
+    return alert_id
+
+
+# -------------------------------------------------------------------
+# 3️⃣  Claim alerts that are due (pending, or 'sending' with an expired lease)
+# -------------------------------------------------------------------
+def claim_due_alerts(conn: sqlite3.Connection, now: float, limit: int, lease_seconds: float):
+    """
+    Atomically move up to `limit` due alerts to 'sending' and return them.
+    The lease means an alert claimed by a worker that died mid-send becomes
+    due again after `lease_seconds` instead of being stuck forever.
+    """
+    cursor = conn.cursor()
+    cursor.execute("BEGIN IMMEDIATE")
+    try:
+        cursor.execute("""
+            SELECT alert_id, report_id, channel, recipient, body, attempts
+            FROM outbound_alerts
+            WHERE status IN (?, ?) AND next_attempt_at <= ?
+            ORDER BY next_attempt_at
+            LIMIT ?
+        """, (PENDING, SENDING, now, limit))
+        rows = cursor.fetchall()
+        for alert_id, *_ in rows:
+            cursor.execute("""
+                UPDATE outbound_alerts
+                SET status = ?, attempts = attempts + 1, next_attempt_at = ?, updated_at = ?
+                WHERE alert_id = ?
+            """, (SENDING, now + lease_seconds, _timestamp(), alert_id))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    keys = ["alert_id", "report_id", "channel", "recipient", "body", "attempts"]
+    claimed = [dict(zip(keys, row)) for row in rows]
+    for alert in claimed:
+        alert["attempts"] += 1  # count this attempt
+    return claimed
+
+
+# -------------------------------------------------------------------
+# 4️⃣  Record the outcome of a delivery attempt
+# -------------------------------------------------------------------
+def _update_report(cursor, report_id: str, status: str, attempts: int, error=None):
+    cursor.execute("""
+        UPDATE emergency_reports
+        SET alert_status = ?, alert_attempts = ?, alert_last_error = ?, alert_updated_at = ?
+        WHERE report_id = ?
+    """, (status, attempts, error, _timestamp(), report_id))
+
+
+def mark_alert_sent(conn: sqlite3.Connection, alert_id: int, report_id: str, attempts: int,
+                    provider_message_id: str = None):
+    cursor = conn.cursor()
+    cursor.execute("""
+        UPDATE outbound_alerts
+        SET status = ?, provider_message_id = ?, last_error = NULL, updated_at = ?
+        WHERE alert_id = ?
+    """, (SENT, provider_message_id, _timestamp(), alert_id))
+    _update_report(cursor, report_id, SENT, attempts)
+    conn.commit()
+
+
+def mark_alert_failed(conn: sqlite3.Connection, alert_id: int, report_id: str, attempts: int,
+                      error: str, retry_at: float = None):
+    """Schedule a retry at `retry_at`, or dead-letter the alert when it is None."""
+    status = PENDING if retry_at is not None else DEAD
+    cursor = conn.cursor()
+    cursor.execute("""
+        UPDATE outbound_alerts
+        SET status = ?, next_attempt_at = COALESCE(?, next_attempt_at), last_error = ?, updated_at = ?
+        WHERE alert_id = ?
+    """, (status, retry_at, error, _timestamp(), alert_id))
+    _update_report(cursor, report_id, status, attempts, error)
+    conn.commit()
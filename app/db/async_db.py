@@ -0,0 +1,326 @@
+import asyncio
+import time
+from contextvars import ContextVar
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from app.core.config import settings
+from app.db import (
+    database,
+    pnr_db,
+    complaints_db,
+    emergency_db,
+    train_schedule_db,
+    seat_db,
+    refunds_db,
+    alerts_db,
+    interactions_db,
+)
+from app.db.cache import caches, invalidate, MISSING
+from app.db.group_commit import writer
+
+# ---------------------------------------------------------
+# 1️⃣ Dedicated, bounded executor for blocking sqlite3 calls
+# ---------------------------------------------------------
+# The route handlers are `async def`, so running sqlite3 directly on the event
+# loop would stall every concurrent call on the worker. All queries run here
+# instead; one thread per pooled connection keeps threads from queueing on the pool.
+_executor = ThreadPoolExecutor(
+    max_workers=settings.DB_EXECUTOR_WORKERS,
+    thread_name_prefix="ivr-db",
+)
+
+
+# Per-request accumulator ([seconds]) installed by the metrics middleware, so
+# /metrics can split request latency into DB time vs. everything else.
+request_db_time: ContextVar = ContextVar("request_db_time", default=None)
+
+
+def _call_with_connection(connect, fn, *args, **kwargs):
+    with connect() as conn:
+        return fn(conn, *args, **kwargs)
+
+
+async def _run(connect, fn, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    start = time.perf_counter()
+    try:
+        return await loop.run_in_executor(
+            _executor, partial(_call_with_connection, connect, fn, *args, **kwargs)
+        )
+    finally:
+        spent = request_db_time.get()
+        if spent is not None:
+            spent[0] += time.perf_counter() - start
+
+
+async def run_db(fn, *args, **kwargs):
+    """Run `fn(conn, *args, **kwargs)` with a pooled connection, off the event loop."""
+    return await _run(database.db_connection, fn, *args, **kwargs)
+
+
+async def run_read(fn, *args, table: str = None, key=database.ALL_ROWS, **kwargs):
+    """
+    Like run_db, for read-only lookups of database.SNAPSHOT_TABLES: served
+    from the in-memory snapshot when DB_READ_SNAPSHOT is on, the file
+    otherwise. Pass the `table` read (and the `key` of a one-row lookup) so
+    rows the change feed reported since the last copy come from the file;
+    the snapshot then trails the file by at most a change-feed poll.
+    """
+    return await _run(partial(database.read_connection, table, key), fn, *args, **kwargs)
+
+
+async def refresh_read_snapshot():
+    """Re-copy the snapshot tables on a DB thread. Returns rows copied."""
+    return await asyncio.get_running_loop().run_in_executor(_executor, database.snapshot.refresh)
+
+
+def shutdown_executor():
+    """Shutdown hook: wait for in-flight queries, then stop the DB threads."""
+    _executor.shutdown(wait=True)
+
+
+# ---------------------------------------------------------
+# 2️⃣ Awaitable lookups (read-through cache for the hot tables)
+# ---------------------------------------------------------
+# Called as `observer(table, found, source)` after each lookup ("cache" / "db");
+# the interaction log registers one to record lookup hits and misses
+lookup_observers = []
+
+
+def _observe_lookup(table: str, found: bool, source: str):
+    for observer in lookup_observers:
+        observer(table, found, source)
+
+
+async def _cached_lookup(table: str, key, fn, *args):
+    cache = caches[table]
+    value = cache.get(key)
+    if value is MISSING:
+        if table in database.SNAPSHOT_TABLES:
+            value = await run_read(fn, *args, table=table, key=key)
+        else:
+            value = await run_db(fn, *args)
+        _observe_lookup(table, value is not None, "db")
+        if value is None:
+            return None  # not-found is not cached; the row may be inserted later
+        cache.set(key, value)
+    else:
+        _observe_lookup(table, True, "cache")
+    # Hand out copies so a caller can't mutate the cached row
+    return [dict(v) for v in value] if isinstance(value, list) else dict(value)
+
+
+async def get_pnr_details(pnr_number: str):
+    return await _cached_lookup("pnr_details", pnr_number, pnr_db.get_pnr_details, pnr_number)
+
+
+async def get_pnr_details_many(pnr_numbers):
+    """{pnr_number: details} for a batch: cached rows first, one IN query for the rest."""
+    cache = caches["pnr_details"]
+    found, missing = {}, []
+    for pnr_number in pnr_numbers:
+        value = cache.get(pnr_number)
+        if value is MISSING:
+            missing.append(pnr_number)
+        else:
+            found[pnr_number] = dict(value)
+    if missing:
+        for row in await run_read(pnr_db.get_pnr_details_many, missing, table="pnr_details"):
+            cache.set(row["pnr_number"], row)
+            found[row["pnr_number"]] = dict(row)
+    return found
+
+
+async def get_refund_status(pnr_number: str):
+    refund = await run_db(refunds_db.get_refund_status, pnr_number)
+    _observe_lookup("refunds", refund is not None, "db")
+    return refund
+
+
+async def get_refunds_for_pnrs(pnr_numbers):
+    """{pnr_number: [refunds]} for a batch, in one IN query (PNRs without refunds are left out)."""
+    refunds = {}
+    if not pnr_numbers:
+        return refunds
+    for refund in await run_db(refunds_db.get_refunds_for_pnrs, pnr_numbers):
+        refunds.setdefault(refund["pnr_number"], []).append(refund)
+    return refunds
+
+
+async def get_train_schedule(train_number: str):
+    return await _cached_lookup("train_schedule", train_number, train_schedule_db.get_train_schedule, train_number)
+
+
+async def get_trains_between(source: str, destination: str, journey_date: str, limit: int = 50):
+    return await run_read(
+        train_schedule_db.get_trains_between, source, destination, journey_date, limit, table="train_schedule",
+    )
+
+
+async def warm_schedule_cache():
+    """Load the (small, hot) schedule table into this worker's cache at startup. Returns rows cached."""
+    cache = caches["train_schedule"]
+    rows = await run_read(train_schedule_db.list_train_schedules, cache.max_size, table="train_schedule")
+    for row in rows:
+        cache.set(row["train_number"], row)
+    return len(rows)
+
+
+async def get_seat_availability(train_number: str, date_of_journey: str, class_type: str):
+    return await _cached_lookup(
+        "seat_availability", (train_number, date_of_journey, class_type),
+        seat_db.get_seat_availability, train_number, date_of_journey, class_type,
+    )
+
+
+def _complaint_status_counts(conn, pnr_number):
+    # None (not cached) rather than {} for a PNR without complaints
+    return complaints_db.get_complaint_status_counts(conn, pnr_number) or None
+
+
+async def get_complaint_overview(pnr_number: str, page_size: int):
+    """
+    Status counts and the newest page for a PNR, or None if it has no complaints.
+    Only the counts are cached (keyed by PNR, as the change feed invalidates
+    them); the page depends on `page_size` and is a short index walk.
+    """
+    counts = await _cached_lookup("complaints", pnr_number, _complaint_status_counts, pnr_number)
+    if not counts:
+        return None
+    complaints, next_before = await get_complaints_page(pnr_number, None, page_size)
+    return {"counts": counts, "total": sum(counts.values()), "complaints": complaints, "next_before": next_before}
+
+
+async def get_complaints_page(pnr_number: str, before, limit: int):
+    return await run_db(complaints_db.get_complaints_page, pnr_number, limit, before)
+
+
+async def get_emergency_details(report_id: str):
+    return await run_db(emergency_db.get_emergency_details, report_id)
+
+
+def _load_caller_records(conn, contact_numbers, max_pnrs):
+    # Complaints are the only table that ties a phone number to PNRs
+    complaints = complaints_db.get_complaints_by_contact(conn, contact_numbers)
+    pnr_numbers = list(dict.fromkeys(
+        c["pnr_number"] for c in complaints if (c["pnr_number"] or "").isdigit()
+    ))[:max_pnrs]
+    pnrs = {p["pnr_number"]: p for p in pnr_db.get_pnr_details_many(conn, pnr_numbers)}
+    return {
+        "pnrs": [pnrs[n] for n in pnr_numbers if n in pnrs],  # most recently mentioned first
+        "refunds": {r["pnr_number"]: r for r in refunds_db.get_refunds_for_pnrs(conn, list(pnrs))},
+        "complaints": complaints,
+    }
+
+
+async def get_caller_records(contact_numbers, max_pnrs: int):
+    """A caller's recent PNRs, their refunds and the caller's complaints, in one executor hop."""
+    return await run_db(_load_caller_records, list(contact_numbers), max_pnrs)
+
+
+# ---------------------------------------------------------
+# 3️⃣ Awaitable inserts / updates (invalidate cached rows they touch)
+# ---------------------------------------------------------
+async def run_write(fn, *args, **kwargs):
+    """Run an insert through the group-commit writer; resolves once its group is committed."""
+    start = time.perf_counter()
+    try:
+        return await asyncio.wrap_future(writer.submit(fn, *args, **kwargs))
+    finally:
+        spent = request_db_time.get()
+        if spent is not None:
+            spent[0] += time.perf_counter() - start
+
+
+async def register_complaint(passenger_name: str, pnr_number: str, contact_number: str, category: str, description: str):
+    complaint_id = await run_write(
+        complaints_db.register_complaint,
+        passenger_name, pnr_number, contact_number, category, description,
+    )
+    invalidate("complaints", pnr_number)
+    return complaint_id
+
+
+async def update_complaint_status(complaint_id: int, status: str, remarks: str = ""):
+    updated = await run_db(complaints_db.update_complaint_status, complaint_id, status, remarks)
+    if updated:
+        # Keyed by PNR, and we only know the complaint ID here
+        invalidate("complaints")
+    return updated
+
+
+async def update_pnr_status(pnr_number: str, status: str, coach: str = None, seat_number: str = None):
+    updated = await run_db(pnr_db.update_pnr_status, pnr_number, status, coach, seat_number)
+    invalidate("pnr_details", pnr_number)
+    return updated
+
+
+async def update_available_seats(train_number: str, date_of_journey: str, class_type: str, available_seats: int):
+    updated = await run_db(
+        seat_db.update_available_seats, train_number, date_of_journey, class_type, available_seats
+    )
+    invalidate("seat_availability", (train_number, date_of_journey, class_type))
+    return updated
+
+
+async def apply_seat_deltas(deltas):
+    """Write booked-seat deltas [(seats, train_number, date_of_journey, class_type), ...] in one group."""
+    updated = await run_write(seat_db.apply_seat_deltas, deltas)
+    for _, train_number, date_of_journey, class_type in deltas:
+        invalidate("seat_availability", (train_number, date_of_journey, class_type))
+    return updated
+
+
+async def insert_emergency(description: str, reported_at: str, **details):
+    return await run_write(emergency_db.insert_emergency, description, reported_at, **details)
+
+
+# ---------------------------------------------------------
+# 4️⃣ Outbound alert queue (drained by app.services.notifications)
+# ---------------------------------------------------------
+def _insert_emergency_with_alert(conn, description, reported_at, recipient, alert_body, commit=True, **details):
+    # One transaction: a saved report always has its alert queued, and vice versa
+    report_id = emergency_db.insert_emergency(conn, description, reported_at, commit=False, **details)
+    alerts_db.enqueue_alert(conn, report_id, recipient, alert_body, time.time(), commit=commit)
+    return report_id
+
+
+async def insert_emergency_with_alert(description: str, reported_at: str, recipient: str, alert_body: str, **details):
+    """Save an emergency report and queue its SMS alert atomically. Returns the report_id."""
+    return await run_write(_insert_emergency_with_alert, description, reported_at, recipient, alert_body, **details)
+
+
+async def claim_due_alerts(limit: int, lease_seconds: float):
+    return await run_db(alerts_db.claim_due_alerts, time.time(), limit, lease_seconds)
+
+
+async def mark_alert_sent(alert_id: int, report_id: str, attempts: int, provider_message_id: str = None):
+    await run_db(alerts_db.mark_alert_sent, alert_id, report_id, attempts, provider_message_id)
+
+
+async def mark_alert_failed(alert_id: int, report_id: str, attempts: int, error: str, retry_at: float = None):
+    await run_db(alerts_db.mark_alert_failed, alert_id, report_id, attempts, error, retry_at)
+
+
+# ---------------------------------------------------------
+# 5️⃣ Interaction events (buffered by app.services.interaction_log)
+# ---------------------------------------------------------
+async def append_interaction_events(events):
+    return await run_write(interactions_db.append_events, events)
+
+
+async def purge_interaction_events(before: float):
+    return await run_write(interactions_db.purge_interaction_events, before)
+
+
+async def get_interaction_rollups(since_hour: int, until_hour: int, department: str = None):
+    return await run_db(interactions_db.get_hourly_rollups, since_hour, until_hour, department)
+
+
+async def get_interaction_summary(since_hour: int, until_hour: int):
+    return await run_db(interactions_db.get_department_summary, since_hour, until_hour)
+
+
+async def get_call_events(call_sid: str):
+    return await run_db(interactions_db.get_call_events, call_sid)
@@ -0,0 +1,226 @@
+"""
+Streaming bulk loader for PNR, train schedule and seat inventory data.
+
+Reads CSV or JSONL (optionally .gz) one row at a time, so memory use does not
+grow with the file, and writes in chunked `executemany` transactions. Rows
+whose key already exists are updated in place (upsert) by default. Non-unique
+secondary indexes on the target table are dropped for the load and rebuilt
+once at the end, which is much cheaper than maintaining them row by row.
+
+Usage (from the repo root):
+    python -m app.db.bulk_loader pnr_details pnr.csv
+    python -m app.db.bulk_loader seat_availability inventory-2025-11-05.jsonl.gz --chunk-size 20000
+    python -m app.db.bulk_loader train_schedule schedules.csv --mode ignore
+
+Triggers log every loaded row to change_log, and running workers drop their
+cached copies on the next change-feed poll.
+"""
+import argparse
+import csv
+import gzip
+import itertools
+import json
+import logging
+import sqlite3
+import sys
+import time
+from typing import NamedTuple
+
+from app.core.logging_config import setup_logging
+from app.db import train_schedule_db
+from app.db.database import get_connection, _configure_connection
+
+logger = logging.getLogger(__name__)
+
+
+# ---------------------------------------------------------
+# 1️⃣ Loadable tables
+# ---------------------------------------------------------
+class TableSpec(NamedTuple):
+    columns: tuple       # columns read from the input, in insert order
+    key: tuple           # unique key used for upserts
+    integers: tuple = ()  # columns converted to int
+    after_load: object = None  # callable(conn) that refreshes derived columns once rows are in
+
+
+TABLES = {
+    "pnr_details": TableSpec(
+        columns=("pnr_number", "passenger_name", "train_number", "train_name", "source",
+                 "destination", "date_of_journey", "coach", "seat_number", "status"),
+        key=("pnr_number",),
+    ),
+    "train_schedule": TableSpec(
+        columns=("train_number", "train_name", "source", "destination", "departure_time",
+                 "arrival_time", "travel_duration", "days_of_operation"),
+        key=("train_number",),
+        after_load=train_schedule_db.refresh_route_keys,
+    ),
+    "seat_availability": TableSpec(
+        columns=("train_number", "train_name", "source", "destination", "date_of_journey",
+                 "class_type", "total_seats", "available_seats"),
+        key=("train_number", "date_of_journey", "class_type"),
+        integers=("total_seats", "available_seats"),
+    ),
+}
+
+MODES = ("upsert", "insert", "ignore")
+
+
+class LoadResult(NamedTuple):
+    rows: int
+    rejected: int
+    seconds: float
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+# ---------------------------------------------------------
+# 2️⃣ Streaming readers
+# ---------------------------------------------------------
+def _open(path: str):
+    if path == "-":
+        return sys.stdin
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", newline="")
+    return open(path, encoding="utf-8", newline="")
+
+
+def read_rows(path: str, fmt: str = None):
+    """Yield one dict per input row (CSV with a header line, or one JSON object per line)."""
+    fmt = fmt or ("jsonl" if ".jsonl" in path or ".ndjson" in path else "csv")
+    with _open(path) as handle:
+        if fmt == "csv":
+            yield from csv.DictReader(handle)
+        else:
+            for line in handle:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def _to_tuples(rows, spec: TableSpec, rejects: list):
+    """Map input dicts to column tuples; rows missing a key or with bad numbers go to `rejects`."""
+    for line_number, row in enumerate(rows, start=1):
+        try:
+            values = []
+            for column in spec.columns:
+                value = row.get(column)
+                if value == "":
+                    value = None
+                if value is not None and column in spec.integers:
+                    value = int(value)
+                values.append(value)
+            if any(row.get(column) in (None, "") for column in spec.key):
+                raise ValueError(f"missing key column(s) {', '.join(spec.key)}")
+        except (ValueError, TypeError, AttributeError) as error:
+            rejects.append((line_number, str(error)))
+            continue
+        yield tuple(values)
+
+
+# ---------------------------------------------------------
+# 3️⃣ SQL + index handling
+# ---------------------------------------------------------
+def build_insert_sql(table: str, spec: TableSpec, mode: str) -> str:
+    columns = ", ".join(spec.columns)
+    placeholders = ", ".join("?" for _ in spec.columns)
+    verb = "INSERT OR IGNORE" if mode == "ignore" else "INSERT"
+    sql = f"{verb} INTO {table} ({columns}) VALUES ({placeholders})"
+    if mode == "upsert":
+        updates = ", ".join(f"{c} = excluded.{c}" for c in spec.columns if c not in spec.key)
+        sql += f" ON CONFLICT ({', '.join(spec.key)}) DO UPDATE SET {updates}"
+    return sql
+
+
+def deferrable_indexes(conn, table: str):
+    """(name, CREATE sql) of the table's non-unique secondary indexes (upserts need the unique ones)."""
+    rows = conn.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL",
+        (table,),
+    ).fetchall()
+    return [(name, sql) for name, sql in rows if not sql.lstrip().upper().startswith("CREATE UNIQUE")]
+
+
+# ---------------------------------------------------------
+# 4️⃣ Load
+# ---------------------------------------------------------
+def load_rows(conn, table: str, rows, mode: str = "upsert", chunk_size: int = 5000,
+              defer_indexes: bool = True, progress=None) -> LoadResult:
+    """Insert an iterable of input dicts into `table` in chunked transactions."""
+    spec = TABLES[table]
+    sql = build_insert_sql(table, spec, mode)
+    rejects = []
+    tuples = _to_tuples(rows, spec, rejects)
+
+    dropped = deferrable_indexes(conn, table) if defer_indexes else []
+    for name, _ in dropped:
+        conn.execute(f"DROP INDEX {name}")
+    conn.commit()
+
+    loaded = 0
+    start = time.perf_counter()
+    try:
+        while True:
+            chunk = list(itertools.islice(tuples, chunk_size))
+            if not chunk:
+                break
+            with conn:  # one transaction per chunk
+                conn.executemany(sql, chunk)
+            loaded += len(chunk)
+            if progress:
+                progress(loaded, len(rejects), time.perf_counter() - start)
+    finally:
+        # Derived columns first, while their indexes are still dropped; then
+        # rebuild even if the load failed part-way, so lookups never lose their index
+        if spec.after_load:
+            spec.after_load(conn)
+        for _, create_sql in dropped:
+            conn.execute(create_sql)
+        conn.commit()
+
+    if rejects:
+        logger.warning("⚠️ Rows rejected by the bulk loader", extra={
+            "table": table, "rejected": len(rejects), "first_rejects": rejects[:5],
+        })
+    conn.execute("PRAGMA optimize")  # refresh planner stats after a big change
+    return LoadResult(loaded, len(rejects), time.perf_counter() - start)
+
+
+def load_file(path: str, table: str, fmt: str = None, db_path: str = None, **options) -> LoadResult:
+    conn = _configure_connection(sqlite3.connect(db_path)) if db_path else get_connection()
+    try:
+        return load_rows(conn, table, read_rows(path, fmt), **options)
+    finally:
+        conn.close()
+
+
+# ---------------------------------------------------------
+# 5️⃣ CLI
+# ---------------------------------------------------------
+def _print_progress(loaded, rejected, elapsed):
+    print(f"   {loaded:>12,} rows  {loaded / elapsed if elapsed else 0:>10,.0f} rows/s  ({rejected} rejected)",
+          end="\r", flush=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("table", choices=sorted(TABLES))
+    parser.add_argument("path", help="CSV / JSONL file (.gz ok), or - for stdin")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="Default: from the file extension")
+    parser.add_argument("--mode", choices=MODES, default="upsert",
+                        help="upsert: update existing keys; insert: fail on duplicates; ignore: skip them")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="Rows per transaction")
+    parser.add_argument("--keep-indexes", action="store_true", help="Don't drop/rebuild secondary indexes")
+    parser.add_argument("--db", help="Database file (default: DB_PATH)")
+    args = parser.parse_args()
+
+    setup_logging(fmt="text")
+    print(f"📥 Loading {args.path} into {args.table} ({args.mode}, {args.chunk_size} rows per chunk)")
+    result = load_file(
+        args.path, args.table, fmt=args.format, db_path=args.db, mode=args.mode,
+        chunk_size=args.chunk_size, defer_indexes=not args.keep_indexes, progress=_print_progress,
+    )
+    print(f"\n✅ {result.rows:,} rows loaded in {result.seconds:.2f}s "
+          f"({result.rows_per_second:,.0f} rows/s), {result.rejected} rejected")
+    sys.exit(1 if result.rejected else 0)
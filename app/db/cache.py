@@ -0,0 +1,105 @@
+import threading
+import time
+from collections import OrderedDict
+
+from app.core.config import settings
+
+# Returned by LookupCache.get() when a key is absent or expired
+# (None is a legitimate "no such row" value from the *_db lookups).
+MISSING = object()
+
+
+# ---------------------------------------------------------
+# 1️⃣ LRU cache with a TTL and a size bound
+# ---------------------------------------------------------
+class LookupCache:
+    """
+    In-process LRU cache for hot read-only lookups.
+
+    Entries expire `ttl` seconds after they are stored; once `max_size` is
+    reached the least recently used entry is evicted. Safe to share between
+    the event loop and the DB executor threads.
+    """
+
+    def __init__(self, name: str, max_size: int, ttl: float):
+        self.name = name
+        self.max_size = max(1, max_size)
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return MISSING
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return MISSING
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        expires_at = time.monotonic() + self.ttl
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key=None):
+        """Drop one key, or every entry when `key` is None."""
+        with self._lock:
+            if key is None:
+                self.invalidations += len(self._entries)
+                self._entries.clear()
+            elif self._entries.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_s": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+# ---------------------------------------------------------
+# 2️⃣ One cache per table, each with its own TTL
+# ---------------------------------------------------------
+caches = {
+    "pnr_details": LookupCache("pnr_details", settings.CACHE_MAX_ENTRIES, settings.CACHE_TTL_PNR),
+    "train_schedule": LookupCache("train_schedule", settings.CACHE_MAX_ENTRIES, settings.CACHE_TTL_SCHEDULE),
+    "seat_availability": LookupCache("seat_availability", settings.CACHE_MAX_ENTRIES, settings.CACHE_TTL_SEATS),
+    "complaints": LookupCache("complaints", settings.CACHE_MAX_ENTRIES, settings.CACHE_TTL_COMPLAINTS),
+}
+
+
+def invalidate(table: str, key=None):
+    """Writers call this after changing a row so readers never see stale data."""
+    caches[table].invalidate(key)
+
+
+def cache_stats():
+    return {name: cache.stats() for name, cache in caches.items()}
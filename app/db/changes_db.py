@@ -0,0 +1,86 @@
+import sqlite3
+import json
+
+# Cached tables -> SQL (over NEW / OLD) for the lookup-cache key of a changed row.
+# Keys are stored as JSON; a JSON array stands for a tuple key.
+CACHE_KEYS = {
+    "pnr_details": "json_quote({row}.pnr_number)",
+    "train_schedule": "json_quote({row}.train_number)",
+    "seat_availability": "json_array({row}.train_number, {row}.date_of_journey, {row}.class_type)",
+    "complaints": "json_quote({row}.pnr_number)",
+}
+
+
+# -------------------------------------------------------------------
+# 1️⃣  Create the change log (filled by triggers on the cached tables)
+# -------------------------------------------------------------------
+def create_change_log_table(conn: sqlite3.Connection):
+    cursor = conn.cursor()
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS change_log (
+            change_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            table_name TEXT NOT NULL,
+            row_key TEXT,
+            changed_at REAL NOT NULL
+        )
+    """)
+    conn.commit()
+
+
+def create_change_log_triggers(conn: sqlite3.Connection, table: str):
+    """Triggers that log every insert / update / delete on a cached table (run by a migration)."""
+    new_key, old_key = CACHE_KEYS[table].format(row="NEW"), CACHE_KEYS[table].format(row="OLD")
+    log = "INSERT INTO change_log (table_name, row_key, changed_at) VALUES ('{table}', {key}, {now});"
+    now = "CAST(strftime('%s', 'now') AS REAL)"
+    statements = [
+        f"""CREATE TRIGGER IF NOT EXISTS {table}_log_insert AFTER INSERT ON {table} BEGIN
+                {log.format(table=table, key=new_key, now=now)}
+            END""",
+        # A changed key also invalidates the old one
+        f"""CREATE TRIGGER IF NOT EXISTS {table}_log_update AFTER UPDATE ON {table} BEGIN
+                {log.format(table=table, key=new_key, now=now)}
+                INSERT INTO change_log (table_name, row_key, changed_at)
+                    SELECT '{table}', {old_key}, {now} WHERE {old_key} IS NOT {new_key};
+            END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {table}_log_delete AFTER DELETE ON {table} BEGIN
+                {log.format(table=table, key=old_key, now=now)}
+            END""",
+    ]
+    for statement in statements:
+        conn.execute(statement)
+
+
+# -------------------------------------------------------------------
+# 2️⃣  Read the log (each worker polls from its own last-seen ID)
+# -------------------------------------------------------------------
+def get_last_change_id(conn: sqlite3.Connection):
+    cursor = conn.cursor()
+    cursor.execute("SELECT MAX(change_id) FROM change_log")
+    return cursor.fetchone()[0] or 0
+
+
+def get_changes_since(conn: sqlite3.Connection, change_id: int, limit: int = 1000):
+    """[(change_id, table_name, key), ...] after `change_id`, oldest first; list keys become tuples."""
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT change_id, table_name, row_key FROM change_log
+        WHERE change_id > ?
+        ORDER BY change_id
+        LIMIT ?
+    """, (change_id, limit))
+    changes = []
+    for change_id, table_name, row_key in cursor.fetchall():
+        key = json.loads(row_key) if row_key is not None else None
+        changes.append((change_id, table_name, tuple(key) if isinstance(key, list) else key))
+    return changes
+
+
+# -------------------------------------------------------------------
+# 3️⃣  Drop entries every worker has long since seen
+# -------------------------------------------------------------------
+def purge_changes(conn: sqlite3.Connection, before: float, commit: bool = True):
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM change_log WHERE changed_at < ?", (before,))
+    if commit:
+        conn.commit()
+    return cursor.rowcount
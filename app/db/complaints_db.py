@@ -1,5 +1,13 @@
+import logging
 import sqlite3
 
+logger = logging.getLogger(__name__)
+
+COMPLAINT_KEYS = [
+    "complaint_id", "passenger_name", "pnr_number", "contact_number",
+    "category", "description", "complaint_date", "status", "resolution_remarks"
+]
+
 # -------------------------------------------------------------------
 # 1️⃣ Create the Complaints table
 # -------------------------------------------------------------------
@@ -38,37 +46,76 @@ def create_complaints_table(conn: sqlite3.Connection):
             ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
         """, sample_data)
         conn.commit()
-        print("✅ Complaints table created with 5 sample records.")
+        logger.info("✅ Complaints table created with 5 sample records.")
     else:
-        print("ℹ️ Complaints table already exists, skipping data insertion.")
+        logger.info("ℹ️ Complaints table already exists, skipping data insertion.")
 
 
 # -------------------------------------------------------------------
 # 2️⃣ Register a new complaint
 # -------------------------------------------------------------------
-def register_complaint(conn: sqlite3.Connection, passenger_name: str, pnr_number: str, contact_number: str, category: str, description: str):
+def register_complaint(conn: sqlite3.Connection, passenger_name: str, pnr_number: str, contact_number: str, category: str, description: str,
+                       commit: bool = True):
     cursor = conn.cursor()
     cursor.execute("""
         INSERT INTO complaints (
             passenger_name, pnr_number, contact_number, category, description, complaint_date, status
         ) VALUES (?, ?, ?, ?, ?, date('now'), 'Pending')
     """, (passenger_name, pnr_number, contact_number, category, description))
-    conn.commit()
+    if commit:
+        conn.commit()
     return cursor.lastrowid  # returns the new complaint_id
 
 
 # -------------------------------------------------------------------
-# 3️⃣ Fetch complaint details by PNR or Complaint ID
+# 3️⃣ A PNR's complaints: status counts + newest-first pages
 # -------------------------------------------------------------------
-def get_complaint_details(conn: sqlite3.Connection, pnr_number: str):
+# Both read idx_complaints_pnr_date (pnr_number, complaint_date, complaint_id, status):
+# the counts from the index alone, a page by walking it backwards from a keyset
+# cursor, so the work per call is bounded by the page size, not the history.
+def get_complaint_status_counts(conn: sqlite3.Connection, pnr_number: str):
+    """{status: number of complaints} for a PNR."""
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT status, COUNT(*) FROM complaints
+        WHERE pnr_number = ?
+        GROUP BY status
+    """, (pnr_number,))
+    return dict(cursor.fetchall())
+
+
+def get_complaints_page(conn: sqlite3.Connection, pnr_number: str, limit: int = 3, before=None):
+    """
+    (complaints, next_before): up to `limit` complaints, newest first, and the
+    cursor for the page after them (None on the last page). `before` is the
+    previous page's cursor, [complaint_date, complaint_id] of its last row.
+    """
+    sql = "SELECT * FROM complaints WHERE pnr_number = ?"
+    params = [pnr_number]
+    if before:
+        sql += " AND (complaint_date, complaint_id) < (?, ?)"
+        params += before
+    cursor = conn.cursor()
+    # One extra row tells whether another page follows
+    cursor.execute(sql + " ORDER BY complaint_date DESC, complaint_id DESC LIMIT ?", (*params, limit + 1))
+    complaints = [dict(zip(COMPLAINT_KEYS, row)) for row in cursor.fetchall()]
+    if len(complaints) <= limit:
+        return complaints, None
+    complaints = complaints[:limit]
+    return complaints, [complaints[-1]["complaint_date"], complaints[-1]["complaint_id"]]
+
+
+def get_complaints_by_contact(conn: sqlite3.Connection, contact_numbers, limit: int = 10):
+    """A caller's most recent complaints; `contact_numbers` are the spellings of one phone number."""
+    contact_numbers = list(contact_numbers)
     cursor = conn.cursor()
-    cursor.execute("SELECT * FROM complaints WHERE pnr_number = ?", (pnr_number,))
-    result = cursor.fetchall()
-    keys = [
-        "complaint_id", "passenger_name", "pnr_number", "contact_number",
-        "category", "description", "complaint_date", "status", "resolution_remarks"
-    ]
-    return [dict(zip(keys, row)) for row in result]
+    cursor.execute(f"""
+        SELECT * FROM complaints
+        WHERE contact_number IN ({", ".join("?" for _ in contact_numbers)})
+        ORDER BY complaint_date DESC, complaint_id DESC
+        LIMIT ?
+    """, (*contact_numbers, limit))
+    return [dict(zip(COMPLAINT_KEYS, row)) for row in cursor.fetchall()]
 
 
 # -------------------------------------------------------------------
@@ -1,5 +1,12 @@
-import sqlite3
+import logging
 import os
+import sqlite3
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+from app.core.config import settings
 
 # Import all your feature-specific database modules
 from app.db import (
@@ -9,29 +16,388 @@ from app.db import (
     train_schedule_db,
     seat_db,
     refunds_db,
+    alerts_db,
+    sessions_db,
+    changes_db,
+    interactions_db,
+    migrations,
 )
 
+logger = logging.getLogger(__name__)
+
 # ---------------------------------------------------------
-# 1️⃣ Define the database file path (inside the same folder)
+# 1️⃣ Define the database file path (inside the same folder by default)
 # ---------------------------------------------------------
-DB_PATH = os.path.join(os.path.dirname(__file__), "railway_ivr.db")
+DB_PATH = settings.DB_PATH
 
 
 # ---------------------------------------------------------
-# 2️⃣ Create a reusable database connection
+# 2️⃣ Connection setup: WAL journaling + tuned pragmas
 # ---------------------------------------------------------
+def _configure_connection(conn: sqlite3.Connection):
+    """Apply the pragmas every connection to the shared DB file should use."""
+    conn.execute(f"PRAGMA busy_timeout = {int(settings.DB_BUSY_TIMEOUT_MS)}")
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute(f"PRAGMA synchronous = {settings.DB_SYNCHRONOUS}")
+    conn.execute(f"PRAGMA mmap_size = {int(settings.DB_MMAP_SIZE)}")
+    conn.execute(f"PRAGMA cache_size = -{int(settings.DB_CACHE_SIZE_KB)}")  # negative = KiB
+    conn.execute("PRAGMA temp_store = MEMORY")
+    return conn
+
+
 def get_connection():
-    """Return a new SQLite connection to the shared DB file."""
-    return sqlite3.connect(DB_PATH)
+    """Return a new standalone SQLite connection to the shared DB file (not pooled)."""
+    return _configure_connection(sqlite3.connect(DB_PATH))
 
 
 # ---------------------------------------------------------
-# 3️⃣ Initialize all tables by calling each module’s setup function
+# 3️⃣ Bounded pool of long-lived connections
 # ---------------------------------------------------------
-def initialize_all_tables():
-    """Create all tables (PNR, complaints, emergency, etc.)"""
-    conn = get_connection()
+class PoolTimeout(Exception):
+    """Raised when no pooled connection becomes free within the wait timeout."""
+
+
+class ConnectionPool:
+    """
+    A fixed-size pool of SQLite connections shared by all request handlers.
+
+    Connections are opened lazily up to `max_size`, handed out one caller at
+    a time and kept open for the life of the worker, so lookups no longer pay
+    for file open, schema parse and pragma setup on every request.
+    """
+
+    def __init__(self, db_path: str, max_size: int = 8, timeout: float = 5.0):
+        self.db_path = db_path
+        self.max_size = max(1, max_size)
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._in_use = 0
+        self._closed = False
+
+        # Metrics
+        self._acquisitions = 0
+        self._waits = 0
+        self._timeouts = 0
+        self._wait_time_total = 0.0
+        self._wait_time_max = 0.0
+
+    def _open(self):
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        return _configure_connection(conn)
+
+    def acquire(self):
+        """Take a connection from the pool, opening a new one if below max_size."""
+        if self._closed:
+            raise RuntimeError("Connection pool is closed")
+
+        start = time.perf_counter()
+        conn = None
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_create = self._created < self.max_size
+                if can_create:
+                    self._created += 1
+            if can_create:
+                try:
+                    conn = self._open()
+                except Exception:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+            else:
+                try:
+                    conn = self._idle.get(timeout=self.timeout)
+                except queue.Empty:
+                    with self._lock:
+                        self._timeouts += 1
+                    raise PoolTimeout(
+                        f"No database connection available after {self.timeout}s "
+                        f"(pool size {self.max_size})"
+                    )
+                waited = time.perf_counter() - start
+                with self._lock:
+                    self._waits += 1
+                    self._wait_time_total += waited
+                    self._wait_time_max = max(self._wait_time_max, waited)
+
+        with self._lock:
+            self._in_use += 1
+            self._acquisitions += 1
+        return conn
+
+    def release(self, conn: sqlite3.Connection, discard: bool = False):
+        """Return a connection to the pool (or drop it if it is broken)."""
+        with self._lock:
+            self._in_use -= 1
+
+        if not discard and conn.in_transaction:
+            try:
+                conn.rollback()
+            except sqlite3.Error:
+                discard = True
+
+        if discard or self._closed:
+            conn.close()
+            with self._lock:
+                self._created -= 1
+            return
+        self._idle.put(conn)
+
+    @contextmanager
+    def connection(self):
+        """Context manager: `with pool.connection() as conn: ...`"""
+        conn = self.acquire()
+        discard = False
+        try:
+            yield conn
+        except sqlite3.ProgrammingError:
+            discard = True
+            raise
+        finally:
+            self.release(conn, discard=discard)
+
+    def prefill(self, count: int = None):
+        """Open connections up front so the first requests don't pay for it."""
+        target = self.max_size if count is None else min(count, self.max_size)
+        while True:
+            with self._lock:
+                if self._closed or self._created >= target:
+                    return
+                self._created += 1
+            try:
+                self._idle.put(self._open())
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+
+    def stats(self):
+        """Pool size and wait-time metrics."""
+        with self._lock:
+            return {
+                "max_size": self.max_size,
+                "open": self._created,
+                "in_use": self._in_use,
+                "idle": self._idle.qsize(),
+                "acquisitions": self._acquisitions,
+                "waits": self._waits,
+                "timeouts": self._timeouts,
+                "wait_time_total_s": round(self._wait_time_total, 6),
+                "wait_time_max_s": round(self._wait_time_max, 6),
+                "wait_time_avg_s": round(self._wait_time_total / self._waits, 6) if self._waits else 0.0,
+            }
+
+    def close(self):
+        """Close every idle connection; connections still in use close on release."""
+        self._closed = True
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._lock:
+                self._created -= 1
+
+
+pool = ConnectionPool(DB_PATH, max_size=settings.DB_POOL_SIZE, timeout=settings.DB_POOL_TIMEOUT)
+
+
+def db_connection():
+    """Borrow a pooled connection: `with db_connection() as conn: ...`"""
+    return pool.connection()
+
+
+def close_pool():
+    """Shutdown hook: close all pooled connections."""
+    pool.close()
+
 
+# ---------------------------------------------------------
+# 4️⃣ In-memory read snapshot of the reference tables
+# ---------------------------------------------------------
+# Read far more often than written; with DB_READ_SNAPSHOT on, their lookups
+# are served from memory (see app.services.read_snapshot for the refreshes)
+SNAPSHOT_TABLES = ("train_schedule", "seat_availability", "pnr_details")
+ALL_ROWS = object()  # stale marker / key for "every row of the table"
+
+
+class ReadSnapshot:
+    """
+    A copy of SNAPSHOT_TABLES (rows and indexes) in a shared-cache in-memory
+    database, so their lookups never touch the file, its locks or the pool.
+
+    `refresh()` copies the tables into a brand-new in-memory database in one
+    read transaction (a consistent point in time) and then switches readers
+    over; queries already running finish on the copy they started on. Each
+    DB thread keeps its own read-only connection and reopens it when it sees
+    a newer copy, which is when the old copy's memory is released.
+
+    Rows changed since the copy started are marked with `mark_stale()` and
+    read from the file (`read_connection`) until a copy that includes them
+    is switched in, so a busy table costs a few file reads, not a re-copy of
+    every table per change. One `refresh()` runs at a time.
+    """
+
+    def __init__(self, db_path: str, tables=SNAPSHOT_TABLES):
+        self.db_path = db_path
+        self.tables = tuple(tables)
+        self._current = None  # (generation, uri), replaced as a whole
+        self._holder = None   # keeps the current copy alive
+        self._generation = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # table -> set of row keys, or ALL_ROWS: changed since the current copy started.
+        # The marks a running refresh took over stay in force until its copy is switched in.
+        self._stale = {}
+        self._stale_in_copy = {}
+
+        self.refreshes = 0
+        self.rows = 0
+        self.last_refresh_at = None
+        self.last_refresh_s = 0.0
+
+    @property
+    def loaded(self) -> bool:
+        return self._current is not None
+
+    @property
+    def dirty(self) -> bool:
+        """Whether rows changed since the current copy (or one being made) started."""
+        return bool(self._stale)
+
+    def mark_stale(self, table: str, keys=None):
+        """Serve these rows of `table` (all of them when `keys` is None) from the file until the next copy."""
+        with self._lock:
+            if keys is None:
+                self._stale[table] = ALL_ROWS
+            elif self._stale.get(table) is not ALL_ROWS:
+                self._stale.setdefault(table, set()).update(keys)
+
+    def is_stale(self, table: str, key=ALL_ROWS) -> bool:
+        """Whether `key` of `table` (without a key: any of its rows) may be newer in the file."""
+        with self._lock:
+            for marks in (self._stale, self._stale_in_copy):
+                keys = marks.get(table)
+                if keys is not None and (keys is ALL_ROWS or key is ALL_ROWS or key in keys):
+                    return True
+        return False
+
+    def refresh(self):
+        """Copy the tables from the DB file into a new in-memory database. Returns rows copied."""
+        start = time.perf_counter()
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+            # Committed before the copy's read transaction, so the copy will include them
+            taken, self._stale = self._stale, {}
+            self._stale_in_copy = taken
+        uri = f"file:ivr_snapshot_{os.getpid()}_{id(self)}_{generation}?mode=memory&cache=shared"
+        holder = sqlite3.connect(uri, uri=True, check_same_thread=False, isolation_level=None)
+        try:
+            holder.execute(f"PRAGMA busy_timeout = {int(settings.DB_BUSY_TIMEOUT_MS)}")
+            holder.execute("ATTACH DATABASE ? AS disk", (self.db_path,))
+            placeholders = ", ".join("?" for _ in self.tables)
+            schema = holder.execute(f"""
+                SELECT type, name, sql FROM disk.sqlite_master
+                WHERE tbl_name IN ({placeholders}) AND type IN ('table', 'index') AND sql IS NOT NULL
+                ORDER BY type = 'index'
+            """, self.tables).fetchall()
+            rows = 0
+            holder.execute("BEGIN")
+            for kind, name, sql in schema:
+                holder.execute(sql)
+                if kind == "table":
+                    rows += holder.execute(f"INSERT INTO main.{name} SELECT * FROM disk.{name}").rowcount
+            holder.execute("COMMIT")
+            holder.execute("DETACH DATABASE disk")
+            holder.execute("ANALYZE")
+        except Exception:
+            holder.close()
+            with self._lock:
+                self._stale_in_copy = {}
+            for table, keys in taken.items():
+                self.mark_stale(table, None if keys is ALL_ROWS else keys)
+            raise
+
+        with self._lock:
+            old, self._holder = self._holder, holder
+            self._current = (generation, uri)
+            self._stale_in_copy = {}
+            self.refreshes += 1
+            self.rows = rows
+            self.last_refresh_at = time.time()
+            self.last_refresh_s = time.perf_counter() - start
+        if old is not None:
+            old.close()
+        return rows
+
+    def connection(self):
+        """This thread's read-only connection to the current copy (None before the first refresh)."""
+        current = self._current
+        if current is None:
+            return None
+        generation, uri = current
+        local = self._local
+        if getattr(local, "generation", None) != generation:
+            if getattr(local, "conn", None) is not None:
+                local.conn.close()
+            local.conn = sqlite3.connect(uri, uri=True)
+            local.conn.execute("PRAGMA query_only = ON")
+            local.generation = generation
+        return local.conn
+
+    def stats(self):
+        with self._lock:
+            return {
+                "loaded": self._current is not None,
+                "tables": list(self.tables),
+                "rows": self.rows,
+                "refreshes": self.refreshes,
+                "last_refresh_at": self.last_refresh_at,
+                "last_refresh_s": round(self.last_refresh_s, 6),
+                "stale": {t: "all" if k is ALL_ROWS else len(k) for t, k in self._stale.items()},
+            }
+
+    def close(self):
+        """Stop serving reads (they go back to the pool) and release the current copy."""
+        with self._lock:
+            holder, self._holder, self._current = self._holder, None, None
+            self._stale, self._stale_in_copy = {}, {}
+        if holder is not None:
+            holder.close()
+
+
+snapshot = ReadSnapshot(DB_PATH)
+
+
+@contextmanager
+def read_connection(table: str = None, key=ALL_ROWS):
+    """
+    Connection for read-only lookups of SNAPSHOT_TABLES: the in-memory
+    snapshot once it is loaded, a pooled connection otherwise. Given the
+    `table` (and `key` of a single-row lookup), rows changed since the
+    snapshot was copied are read from the file.
+    """
+    conn = snapshot.connection()
+    if conn is not None and table is not None and snapshot.is_stale(table, key):
+        conn = None
+    if conn is not None:
+        yield conn
+    else:
+        with pool.connection() as conn:
+            yield conn
+
+
+# ---------------------------------------------------------
+# 5️⃣ Initialize all tables by calling each module’s setup function
+# ---------------------------------------------------------
+def create_all_tables(conn: sqlite3.Connection):
+    """Create every table on `conn`, then bring it up to the latest schema version."""
     # Call the create_table() functions from each module
     pnr_db.create_pnr_table(conn)
     complaints_db.create_complaints_table(conn)
@@ -39,13 +405,35 @@ def initialize_all_tables():
     train_schedule_db.create_train_schedule_table(conn)
     seat_db.create_seat_table(conn)
     refunds_db.create_refunds_table(conn)
+    alerts_db.create_alerts_table(conn)
+    sessions_db.create_sessions_table(conn)
+    changes_db.create_change_log_table(conn)
+    interactions_db.create_interaction_tables(conn)
 
-    conn.close()
-    print("✅ All tables initialized successfully in railway_ivr.db")
+    # Indexes and later schema changes live in versioned migrations
+    migrations.apply_migrations(conn)
+
+
+def initialize_all_tables(fast_start: bool = None):
+    """Create all tables (PNR, complaints, emergency, etc.)"""
+    if fast_start is None:
+        fast_start = settings.DB_FAST_START
+    with db_connection() as conn:
+        # One indexed read instead of every CREATE TABLE / COUNT(*) / seed probe
+        if fast_start and migrations.schema_is_current(conn):
+            logger.info("⚡ Schema already at version %s, skipping table bootstrap.", migrations.LATEST_VERSION)
+            return
+        create_all_tables(conn)
+
+    logger.info("✅ All tables initialized successfully in railway_ivr.db")
 
 
 # ---------------------------------------------------------
-# 4️⃣ Run initialization if this file is executed directly
+# 6️⃣ Run initialization if this file is executed directly
 # ---------------------------------------------------------
 if __name__ == "__main__":
-    initialize_all_tables()
+    from app.core.logging_config import setup_logging
+
+    setup_logging(fmt="text")
+    initialize_all_tables(fast_start=False)  # run explicitly: always do the full bootstrap
+    close_pool()
@@ -1,5 +1,8 @@
+import logging
 import sqlite3
 
+logger = logging.getLogger(__name__)
+
 # -------------------------------------------------------------------
 # 1️⃣  Create the Emergency table
 # -------------------------------------------------------------------
@@ -46,9 +49,9 @@ def create_emergency_table(conn: sqlite3.Connection):
             ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """, sample_emergencies)
         conn.commit()
-        print("✅ Emergency table created with 10 sample records.")
+        logger.info("✅ Emergency table created with 10 sample records.")
     else:
-        print("ℹ️ Emergency table already exists, skipping data insertion.")
+        logger.info("ℹ️ Emergency table already exists, skipping data insertion.")
 
 
 # -------------------------------------------------------------------
@@ -62,8 +65,34 @@ def get_emergency_details(conn: sqlite3.Connection, report_id: str):
         keys = [
             "report_id", "passenger_name", "contact_number", "emergency_type",
             "description", "train_number", "coach", "seat_number",
-            "location", "date_reported", "status"
+            "location", "date_reported", "status", "recording_url",
+            "alert_status", "alert_attempts", "alert_last_error", "alert_updated_at"
         ]
         return dict(zip(keys, result))
     else:
         return None
+
+
+# -------------------------------------------------------------------
+# 3️⃣  Insert a new emergency report (called from the IVR flow)
+# -------------------------------------------------------------------
+def insert_emergency(conn: sqlite3.Connection, description: str, reported_at: str,
+                     passenger_name: str = "Unknown Caller", contact_number: str = "Not Provided",
+                     emergency_type: str = "General", status: str = "Pending",
+                     recording_url: str = None, commit: bool = True):
+    cursor = conn.cursor()
+    # Next ID follows the existing E001, E002, ... sequence (one row per rowid);
+    # computed inside the INSERT so concurrent callers can't pick the same number.
+    cursor.execute("""
+        INSERT INTO emergency_reports (
+            report_id, passenger_name, contact_number, emergency_type,
+            description, date_reported, status, recording_url
+        )
+        SELECT 'E' || printf('%03d', COALESCE(MAX(rowid), 0) + 1),
+               ?, ?, ?, ?, ?, ?, ?
+        FROM emergency_reports
+    """, (passenger_name, contact_number, emergency_type, description, reported_at, status, recording_url))
+    if commit:
+        conn.commit()
+    cursor.execute("SELECT report_id FROM emergency_reports WHERE rowid = ?", (cursor.lastrowid,))
+    return cursor.fetchone()[0]  # returns the new report_id
@@ -0,0 +1,166 @@
+"""
+Group-commit writer for the insert-heavy call paths (complaints, emergencies).
+
+Every write submitted here is executed by one dedicated writer thread on its
+own connection. The thread takes whatever has queued up (up to `max_batch`,
+waiting at most `max_delay` seconds for stragglers), runs the whole group in
+a single BEGIN IMMEDIATE ... COMMIT, and then resolves each caller's future
+with its own return value (e.g. the new complaint_id). A burst of N inserts
+therefore costs one write-lock acquisition and one WAL commit instead of N.
+
+Each write runs inside its own SAVEPOINT, so one failing insert is rolled
+back and reported to its caller without affecting the rest of the group.
+Write functions are called as `fn(conn, *args, commit=False, **kwargs)`.
+"""
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+
+from app.core.config import settings
+from app.db import database
+
+_STOP = object()
+
+
+class GroupCommitWriter:
+    def __init__(self, db_path: str = None, max_batch: int = None, max_delay: float = None):
+        self.db_path = db_path or database.DB_PATH
+        self.max_batch = max_batch or settings.DB_GROUP_COMMIT_MAX_BATCH
+        self.max_delay = settings.DB_GROUP_COMMIT_MAX_DELAY_MS / 1000 if max_delay is None else max_delay
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+        # Metrics (written only by the writer thread)
+        self.batches = 0
+        self.writes = 0
+        self.failed_writes = 0
+        self.largest_batch = 0
+
+    # ---------------------------------------------------------
+    # 1️⃣ Submitting writes
+    # ---------------------------------------------------------
+    def submit(self, fn, *args, **kwargs) -> Future:
+        """Queue `fn(conn, *args, commit=False, **kwargs)`; the future resolves after its group commits."""
+        self._ensure_started()
+        future = Future()
+        self._queue.put((fn, args, kwargs, future))
+        return future
+
+    def write(self, fn, *args, **kwargs):
+        """Blocking form of submit()."""
+        return self.submit(fn, *args, **kwargs).result()
+
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="ivr-db-writer", daemon=True)
+                    self._thread.start()
+
+    def close(self):
+        """Commit everything already queued, then stop the writer thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join()
+
+    def stats(self):
+        return {
+            "batches": self.batches,
+            "writes": self.writes,
+            "failed_writes": self.failed_writes,
+            "largest_batch": self.largest_batch,
+            "avg_batch": round(self.writes / self.batches, 2) if self.batches else 0.0,
+        }
+
+    # ---------------------------------------------------------
+    # 2️⃣ Writer thread
+    # ---------------------------------------------------------
+    def _next_batch(self):
+        """Block for the first write, then gather more until the size/time bound."""
+        batch = [self._queue.get()]
+        if batch[0] is _STOP:
+            return batch
+        deadline = time.monotonic() + self.max_delay
+        while len(batch) < self.max_batch:
+            try:
+                # Already-queued writes are taken without waiting
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+            batch.append(item)
+            if item is _STOP:
+                break
+        return batch
+
+    def _run(self):
+        # Autocommit mode: transactions and savepoints are issued explicitly below
+        conn = database._configure_connection(
+            sqlite3.connect(self.db_path, isolation_level=None, check_same_thread=False)
+        )
+        try:
+            while True:
+                batch = self._next_batch()
+                stop = batch[-1] is _STOP
+                writes = [item for item in batch if item is not _STOP]
+                if writes:
+                    self._commit_group(conn, writes)
+                if stop:
+                    return
+        finally:
+            conn.close()
+
+    def _commit_group(self, conn: sqlite3.Connection, writes):
+        results = []
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for fn, args, kwargs, future in writes:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                conn.execute("SAVEPOINT group_write")
+                try:
+                    result = fn(conn, *args, commit=False, **kwargs)
+                    conn.execute("RELEASE group_write")
+                    results.append((future, result, None))
+                except Exception as error:
+                    conn.execute("ROLLBACK TO group_write")
+                    conn.execute("RELEASE group_write")
+                    results.append((future, None, error))
+            conn.execute("COMMIT")
+        except Exception as error:
+            # BEGIN or COMMIT itself failed: nothing in this group was written
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            for fn, args, kwargs, future in writes:
+                if not future.done():
+                    future.set_exception(error)
+            self.failed_writes += len(writes)
+            return
+
+        self.batches += 1
+        self.writes += len(results)
+        self.largest_batch = max(self.largest_batch, len(results))
+        for future, result, error in results:
+            if error is None:
+                future.set_result(result)
+            else:
+                self.failed_writes += 1
+                future.set_exception(error)
+
+
+writer = GroupCommitWriter()
+
+
+def close_writer():
+    """Shutdown hook: flush queued writes and stop the writer thread."""
+    writer.close()
@@ -0,0 +1,127 @@
+import sqlite3
+
+from app.models.base import insert_sql
+from app.models.interaction import InteractionEvent
+
+_INSERT_EVENT = insert_sql("interaction_events", InteractionEvent)
+_UPSERT_ROLLUP = """
+    INSERT INTO interaction_rollups (hour, department, event, outcome, events, value_sum, value_count)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (hour, department, event, outcome) DO UPDATE SET
+        events = events + excluded.events,
+        value_sum = value_sum + excluded.value_sum,
+        value_count = value_count + excluded.value_count
+"""
+
+
+# -------------------------------------------------------------------
+# 1️⃣  Create the raw event log + hourly rollups
+# -------------------------------------------------------------------
+def create_interaction_tables(conn: sqlite3.Connection):
+    cursor = conn.cursor()
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS interaction_events (
+            event_id INTEGER PRIMARY KEY,
+            ts REAL NOT NULL,
+            call_sid TEXT,
+            event INTEGER NOT NULL,
+            department TEXT NOT NULL DEFAULT '',
+            step TEXT NOT NULL DEFAULT '',
+            outcome TEXT NOT NULL DEFAULT '',
+            value REAL
+        )
+    """)
+    # One row per (hour, department, event, outcome), kept current by append_events
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS interaction_rollups (
+            hour INTEGER NOT NULL,
+            department TEXT NOT NULL,
+            event INTEGER NOT NULL,
+            outcome TEXT NOT NULL,
+            events INTEGER NOT NULL,
+            value_sum REAL NOT NULL DEFAULT 0,
+            value_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (hour, department, event, outcome)
+        ) WITHOUT ROWID
+    """)
+    conn.commit()
+
+
+# -------------------------------------------------------------------
+# 2️⃣  Append a batch of events and fold it into the rollups
+# -------------------------------------------------------------------
+def append_events(conn: sqlite3.Connection, events, commit: bool = True):
+    """Insert InteractionEvents and add them to the hourly rollups in the same transaction."""
+    rollups = {}
+    for event in events:
+        key = (event.hour, event.department, event.event, event.outcome)
+        counts = rollups.get(key)
+        if counts is None:
+            counts = rollups[key] = [0, 0.0, 0]
+        counts[0] += 1
+        if event.value is not None:
+            counts[1] += event.value
+            counts[2] += 1
+
+    cursor = conn.cursor()
+    cursor.executemany(_INSERT_EVENT, events)
+    cursor.executemany(_UPSERT_ROLLUP, [(*key, *counts) for key, counts in rollups.items()])
+    if commit:
+        conn.commit()
+    return len(events)
+
+
+# -------------------------------------------------------------------
+# 3️⃣  Analytics reads (rollups only) + single-call trace
+# -------------------------------------------------------------------
+def get_hourly_rollups(conn: sqlite3.Connection, since_hour: int, until_hour: int, department: str = None):
+    cursor = conn.cursor()
+    sql = """
+        SELECT hour, department, event, outcome, events, value_sum, value_count
+        FROM interaction_rollups
+        WHERE hour BETWEEN ? AND ?
+    """
+    params = [since_hour, until_hour]
+    if department is not None:
+        sql += " AND department = ?"
+        params.append(department)
+    cursor.execute(sql + " ORDER BY hour, department, event, outcome", params)
+    columns = [c[0] for c in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+def get_department_summary(conn: sqlite3.Connection, since_hour: int, until_hour: int):
+    """Totals per (department, event, outcome) over an hour range."""
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT department, event, outcome,
+               SUM(events) AS events, SUM(value_sum) AS value_sum, SUM(value_count) AS value_count
+        FROM interaction_rollups
+        WHERE hour BETWEEN ? AND ?
+        GROUP BY department, event, outcome
+        ORDER BY department, event, outcome
+    """, (since_hour, until_hour))
+    columns = [c[0] for c in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+def get_call_events(conn: sqlite3.Connection, call_sid: str):
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT ts, call_sid, event, department, step, outcome, value
+        FROM interaction_events
+        WHERE call_sid = ?
+        ORDER BY ts
+    """, (call_sid,))
+    return [InteractionEvent(*row) for row in cursor.fetchall()]
+
+
+# -------------------------------------------------------------------
+# 4️⃣  Retention: raw events expire, rollups are kept
+# -------------------------------------------------------------------
+def purge_interaction_events(conn: sqlite3.Connection, before: float, commit: bool = True):
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM interaction_events WHERE ts < ?", (before,))
+    if commit:
+        conn.commit()
+    return cursor.rowcount
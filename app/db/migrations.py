@@ -0,0 +1,160 @@
+import logging
+import sqlite3
+import datetime
+
+from app.db import changes_db, train_schedule_db
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------
+# 1️⃣ Ordered list of schema migrations
+# ---------------------------------------------------------
+# Each entry is (version, description, steps). A step is either a SQL string
+# or a callable taking the connection. Versions only ever grow: never edit a
+# migration that has shipped, append a new one instead. A new create_*_table
+# also needs a migration (its index, or a no-op) so that fast start, which
+# skips the table bootstrap on current databases, picks it up.
+MIGRATIONS = [
+    (1, "Index the columns the lookups filter by", [
+        "CREATE INDEX IF NOT EXISTS idx_complaints_pnr ON complaints (pnr_number)",
+        "CREATE INDEX IF NOT EXISTS idx_refunds_pnr ON refunds (pnr_number)",
+        """CREATE INDEX IF NOT EXISTS idx_seat_availability_lookup
+           ON seat_availability (train_number, date_of_journey, class_type)""",
+    ]),
+    (2, "Outbound alert queue index + alert delivery status on emergency reports", [
+        "ALTER TABLE emergency_reports ADD COLUMN recording_url TEXT",
+        "ALTER TABLE emergency_reports ADD COLUMN alert_status TEXT",
+        "ALTER TABLE emergency_reports ADD COLUMN alert_attempts INTEGER DEFAULT 0",
+        "ALTER TABLE emergency_reports ADD COLUMN alert_last_error TEXT",
+        "ALTER TABLE emergency_reports ADD COLUMN alert_updated_at TEXT",
+        """CREATE INDEX IF NOT EXISTS idx_outbound_alerts_due
+           ON outbound_alerts (status, next_attempt_at)""",
+    ]),
+    (3, "Index call session expiry for purges", [
+        "CREATE INDEX IF NOT EXISTS idx_call_sessions_expiry ON call_sessions (expires_at)",
+    ]),
+    (4, "Make (train, date, class) the unique seat inventory key for upserts", [
+        # Keep the most recent row if the same inventory line was inserted twice
+        """DELETE FROM seat_availability WHERE id NOT IN (
+               SELECT MAX(id) FROM seat_availability
+               GROUP BY train_number, date_of_journey, class_type)""",
+        "DROP INDEX IF EXISTS idx_seat_availability_lookup",
+        """CREATE UNIQUE INDEX IF NOT EXISTS idx_seat_availability_key
+           ON seat_availability (train_number, date_of_journey, class_type)""",
+    ]),
+    (5, "Station-pair route search: normalized station keys + weekday bitmask on train_schedule", [
+        "ALTER TABLE train_schedule ADD COLUMN source_key TEXT",
+        "ALTER TABLE train_schedule ADD COLUMN destination_key TEXT",
+        "ALTER TABLE train_schedule ADD COLUMN days_mask INTEGER",
+        lambda conn: train_schedule_db.refresh_route_keys(conn, commit=False),
+        """CREATE INDEX IF NOT EXISTS idx_train_schedule_route
+           ON train_schedule (source_key, destination_key, departure_time)""",
+    ]),
+    (6, "Index contact numbers for the caller-ID prefetch", [
+        """CREATE INDEX IF NOT EXISTS idx_complaints_contact
+           ON complaints (contact_number, complaint_date)""",
+    ]),
+    (7, "Change log + triggers on the cached tables for cross-worker cache invalidation", [
+        "CREATE INDEX IF NOT EXISTS idx_change_log_changed_at ON change_log (changed_at)",
+        *[
+            (lambda conn, table=table: changes_db.create_change_log_triggers(conn, table))
+            for table in ("pnr_details", "train_schedule", "seat_availability", "complaints")
+        ],
+    ]),
+    (8, "Interaction event log: per-call and retention indexes, append-only guard", [
+        "CREATE INDEX IF NOT EXISTS idx_interaction_events_call ON interaction_events (call_sid, ts)",
+        "CREATE INDEX IF NOT EXISTS idx_interaction_events_ts ON interaction_events (ts)",
+        """CREATE TRIGGER IF NOT EXISTS interaction_events_append_only
+           BEFORE UPDATE ON interaction_events
+           BEGIN SELECT RAISE(ABORT, 'interaction_events is append-only'); END""",
+    ]),
+    (9, "Covering index for newest-first complaint pages and status counts per PNR", [
+        """CREATE INDEX IF NOT EXISTS idx_complaints_pnr_date
+           ON complaints (pnr_number, complaint_date, complaint_id, status)""",
+        # Same leading column: every lookup idx_complaints_pnr served now uses the new index
+        "DROP INDEX IF EXISTS idx_complaints_pnr",
+    ]),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+# ---------------------------------------------------------
+# 2️⃣ schema_version bookkeeping
+# ---------------------------------------------------------
+def create_schema_version_table(conn: sqlite3.Connection):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT,
+            applied_at TEXT
+        )
+    """)
+    conn.commit()
+
+
+def get_schema_version(conn: sqlite3.Connection):
+    """Highest applied migration version (0 for a fresh database)."""
+    row = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+    return row[0] or 0
+
+
+def schema_is_current(conn: sqlite3.Connection):
+    """True when the database is already at LATEST_VERSION, i.e. fully bootstrapped."""
+    has_table = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'schema_version'"
+    ).fetchone()
+    return bool(has_table) and get_schema_version(conn) >= LATEST_VERSION
+
+
+# ---------------------------------------------------------
+# 3️⃣ Apply pending migrations (idempotent, safe with many workers)
+# ---------------------------------------------------------
+def apply_migrations(conn: sqlite3.Connection):
+    """Apply every migration newer than the stored schema version. Returns the versions applied."""
+    create_schema_version_table(conn)
+    applied = []
+
+    for version, description, steps in MIGRATIONS:
+        if version <= get_schema_version(conn):
+            continue
+
+        # BEGIN IMMEDIATE takes the write lock, so when several workers start
+        # at once only one applies a migration; the rest re-check and skip it.
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if version <= get_schema_version(conn):
+                conn.rollback()
+                continue
+            for step in steps:
+                if callable(step):
+                    step(conn)
+                else:
+                    conn.execute(step)
+            conn.execute(
+                "INSERT INTO schema_version (version, description, applied_at) VALUES (?, ?, ?)",
+                (version, description, datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")),
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+        applied.append(version)
+        logger.info("🛠️ Applied migration %s: %s", version, description)
+
+    return applied
+
+
+# ---------------------------------------------------------
+# 4️⃣ Run migrations if this file is executed directly
+# ---------------------------------------------------------
+if __name__ == "__main__":
+    from app.core.logging_config import setup_logging
+    from app.db.database import get_connection
+
+    setup_logging(fmt="text")
+    conn = get_connection()
+    applied = apply_migrations(conn)
+    logger.info("✅ Schema is at version %s (%s migration(s) applied)", get_schema_version(conn), len(applied))
+    conn.close()
@@ -1,5 +1,8 @@
+import logging
 import sqlite3
 
+logger = logging.getLogger(__name__)
+
 # -------------------------------------------------------------------
 # 1️⃣  Create the PNR table
 # -------------------------------------------------------------------
@@ -54,9 +57,9 @@ def create_pnr_table(conn: sqlite3.Connection):
             ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """, sample_data)
         conn.commit()
-        print("✅ PNR table created with 20 sample records.")
+        logger.info("✅ PNR table created with 20 sample records.")
     else:
-        print("ℹ️ PNR table already exists, skipping sample data insertion.")
+        logger.info("ℹ️ PNR table already exists, skipping sample data insertion.")
 
 
 # -------------------------------------------------------------------
@@ -75,3 +78,35 @@ def get_pnr_details(conn: sqlite3.Connection, pnr_number: str):
         return dict(zip(keys, result))
     else:
         return None
+
+
+def get_pnr_details_many(conn: sqlite3.Connection, pnr_numbers):
+    """PNR details for several PNRs in one query (unknown PNRs are left out)."""
+    pnr_numbers = list(pnr_numbers)
+    if not pnr_numbers:
+        return []
+    cursor = conn.cursor()
+    cursor.execute(
+        f"SELECT * FROM pnr_details WHERE pnr_number IN ({', '.join('?' for _ in pnr_numbers)})",
+        pnr_numbers,
+    )
+    keys = [
+        "pnr_number", "passenger_name", "train_number", "train_name",
+        "source", "destination", "date_of_journey",
+        "coach", "seat_number", "status"
+    ]
+    return [dict(zip(keys, row)) for row in cursor.fetchall()]
+
+
+# -------------------------------------------------------------------
+# 3️⃣  Update booking status (e.g. after chart preparation)
+# -------------------------------------------------------------------
+def update_pnr_status(conn: sqlite3.Connection, pnr_number: str, status: str, coach: str = None, seat_number: str = None):
+    cursor = conn.cursor()
+    cursor.execute("""
+        UPDATE pnr_details
+        SET status = ?, coach = COALESCE(?, coach), seat_number = COALESCE(?, seat_number)
+        WHERE pnr_number = ?
+    """, (status, coach, seat_number, pnr_number))
+    conn.commit()
+    return cursor.rowcount > 0  # returns True if updated successfully
@@ -0,0 +1,139 @@
+"""
+Query-plan check for the *_db modules.
+
+Runs every data-access function against a throwaway in-memory copy of the
+schema (tables + migrations + sample rows), captures the SQL it actually
+executes and asserts with EXPLAIN QUERY PLAN that none of it falls back to a
+full table scan.
+
+Run with:  python -m app.db.query_plan_check
+"""
+import inspect
+import sqlite3
+import sys
+
+from app.db import (
+    pnr_db,
+    complaints_db,
+    emergency_db,
+    train_schedule_db,
+    seat_db,
+    refunds_db,
+    alerts_db,
+    sessions_db,
+    changes_db,
+    interactions_db,
+)
+from app.db.database import create_all_tables
+from app.models.interaction import EventType, InteractionEvent
+
+DB_MODULES = [pnr_db, complaints_db, emergency_db, train_schedule_db, seat_db, refunds_db, alerts_db, sessions_db,
+              changes_db, interactions_db]
+
+# ---------------------------------------------------------
+# 1️⃣ One sample call per data-access function
+# ---------------------------------------------------------
+# Every public function in the *_db modules (other than the create_*_table
+# bootstrap helpers) must appear here; the check fails if one is missing.
+QUERY_CASES = [
+    (pnr_db.get_pnr_details, ("1234567890",)),
+    (pnr_db.get_pnr_details_many, (["1234567890", "2345678901"],)),
+    (pnr_db.update_pnr_status, ("1234567890", "Confirmed")),
+    (complaints_db.register_complaint, ("Test Passenger", "1234567890", "9876543210", "General", "Plan check")),
+    (complaints_db.get_complaint_status_counts, ("1234567890",)),
+    (complaints_db.get_complaints_page, ("1234567890", 3, ["2025-10-25", 9])),
+    (complaints_db.get_complaints_by_contact, (["9876543210", "+919876543210"],)),
+    (complaints_db.update_complaint_status, (1, "Resolved", "Plan check")),
+    (emergency_db.get_emergency_details, ("E001",)),
+    (emergency_db.insert_emergency, ("Plan check", "2025-11-01 10:00:00")),
+    (train_schedule_db.get_train_schedule, ("12627",)),
+    (train_schedule_db.list_train_names, ()),
+    (train_schedule_db.list_train_schedules, (100,)),
+    (train_schedule_db.get_trains_between, ("New Delhi", "Bangalore", "2025-11-05")),
+    (train_schedule_db.refresh_route_keys, ()),
+    (seat_db.get_seat_availability, ("12627", "2025-11-05", "Sleeper")),
+    (seat_db.update_available_seats, ("12627", "2025-11-05", "Sleeper", 34)),
+    (seat_db.apply_seat_deltas, ([(2, "12627", "2025-11-05", "Sleeper")],)),
+    (refunds_db.get_refund_status, ("1234567890",)),
+    (refunds_db.get_refunds_for_pnrs, (["1234567890", "2345678901"],)),
+    (alerts_db.enqueue_alert, ("E001", "+911234567890", "Plan check", 0.0)),
+    (alerts_db.claim_due_alerts, (1.0, 10, 60.0)),
+    (alerts_db.mark_alert_sent, (1, "E001", 1, "SM123")),
+    (alerts_db.mark_alert_failed, (1, "E001", 2, "Plan check", 5.0)),
+    (sessions_db.save_session, ("CA123", {"train_number": "12627"}, 1.0, 61.0)),
+    (sessions_db.get_session, ("CA123", 1.0)),
+    (sessions_db.delete_session, ("CA123",)),
+    (sessions_db.purge_expired_sessions, (1.0,)),
+    (changes_db.get_last_change_id, ()),
+    (changes_db.get_changes_since, (0,)),
+    (changes_db.purge_changes, (1.0,)),
+    (interactions_db.append_events, ([InteractionEvent(7200.0, "CA123", EventType.CALL_STARTED, "voice")],)),
+    (interactions_db.get_hourly_rollups, (0, 10, "pnr_status")),
+    (interactions_db.get_department_summary, (0, 10)),
+    (interactions_db.get_call_events, ("CA123",)),
+    (interactions_db.purge_interaction_events, (1.0,)),
+]
+
+# Functions that read a whole table on purpose (index builds), with the reason
+FULL_SCAN_ALLOWED = {
+    train_schedule_db.list_train_names: "builds the train-name index; runs at startup and on refresh",
+    train_schedule_db.list_train_schedules: "warms the schedule cache once per worker start",
+    train_schedule_db.refresh_route_keys: "rewrites every row's route keys; migration and bulk loads only",
+}
+
+
+def _data_access_functions():
+    for module in DB_MODULES:
+        for name, fn in inspect.getmembers(module, inspect.isfunction):
+            if fn.__module__ == module.__name__ and not name.startswith(("_", "create_")):
+                yield fn
+
+
+def _full_scans(conn: sqlite3.Connection, sql: str):
+    plan = conn.execute(f"EXPLAIN QUERY PLAN {sql}").fetchall()
+    return [detail for _, _, _, detail in plan if detail.startswith("SCAN")]
+
+
+# ---------------------------------------------------------
+# 2️⃣ Run every case and collect problems
+# ---------------------------------------------------------
+def check_query_plans():
+    """Return a list of human-readable failures (empty when every query uses an index)."""
+    conn = sqlite3.connect(":memory:")
+    create_all_tables(conn)
+
+    failures = []
+    covered = {fn for fn, _ in QUERY_CASES}
+    for fn in _data_access_functions():
+        if fn not in covered:
+            failures.append(f"{fn.__module__}.{fn.__name__}: no entry in QUERY_CASES")
+
+    for fn, args in QUERY_CASES:
+        statements = []
+        conn.set_trace_callback(statements.append)
+        try:
+            fn(conn, *args)
+        finally:
+            conn.set_trace_callback(None)
+
+        if fn in FULL_SCAN_ALLOWED:
+            continue
+        for sql in statements:
+            if not sql.lstrip().upper().startswith(("SELECT", "INSERT", "UPDATE", "DELETE")):
+                continue
+            for detail in _full_scans(conn, sql):
+                failures.append(f"{fn.__module__}.{fn.__name__}: {detail}\n    {' '.join(sql.split())}")
+
+    conn.close()
+    return failures
+
+
+if __name__ == "__main__":
+    problems = check_query_plans()
+    if problems:
+        print("❌ Queries without index support:")
+        for problem in problems:
+            print(f"  - {problem}")
+        sys.exit(1)
+    print(f"✅ All {len(QUERY_CASES)} data-access functions use indexed query plans "
+          f"({len(FULL_SCAN_ALLOWED)} intentional full scan(s) allowed).")
@@ -1,5 +1,8 @@
+import logging
 import sqlite3
 
+logger = logging.getLogger(__name__)
+
 # -------------------------------------------------------------------
 # 1️⃣  Create the Refunds table
 # -------------------------------------------------------------------
@@ -43,9 +46,9 @@ def create_refunds_table(conn: sqlite3.Connection):
             ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
         """, sample_refunds)
         conn.commit()
-        print("✅ Refunds table created with 10 sample records.")
+        logger.info("✅ Refunds table created with 10 sample records.")
     else:
-        print("ℹ️ Refunds table already exists, skipping data insertion.")
+        logger.info("ℹ️ Refunds table already exists, skipping data insertion.")
 
 
 # -------------------------------------------------------------------
@@ -63,3 +66,23 @@ def get_refund_status(conn: sqlite3.Connection, pnr_number: str):
         return dict(zip(keys, result))
     else:
         return None
+
+
+# -------------------------------------------------------------------
+# 3️⃣  Refund records for several PNRs (caller-ID prefetch)
+# -------------------------------------------------------------------
+def get_refunds_for_pnrs(conn: sqlite3.Connection, pnr_numbers):
+    """Refund records for several PNRs in one query."""
+    pnr_numbers = list(pnr_numbers)
+    if not pnr_numbers:
+        return []
+    cursor = conn.cursor()
+    cursor.execute(
+        f"SELECT * FROM refunds WHERE pnr_number IN ({', '.join('?' for _ in pnr_numbers)})",
+        pnr_numbers,
+    )
+    keys = [
+        "refund_id", "pnr_number", "passenger_name", "train_number",
+        "amount", "payment_mode", "refund_status", "refund_date", "remarks"
+    ]
+    return [dict(zip(keys, row)) for row in cursor.fetchall()]
@@ -1,5 +1,8 @@
+import logging
 import sqlite3
 
+logger = logging.getLogger(__name__)
+
 # -------------------------------------------------------------------
 # 1️⃣  Create the Seat Availability table
 # -------------------------------------------------------------------
@@ -43,9 +46,9 @@ def create_seat_table(conn: sqlite3.Connection):
             ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
         """, sample_seats)
         conn.commit()
-        print("✅ Seat Availability table created with 10 sample records.")
+        logger.info("✅ Seat Availability table created with 10 sample records.")
     else:
-        print("ℹ️ Seat Availability table already exists, skipping data insertion.")
+        logger.info("ℹ️ Seat Availability table already exists, skipping data insertion.")
 
 
 # -------------------------------------------------------------------
@@ -66,3 +69,36 @@ def get_seat_availability(conn: sqlite3.Connection, train_number: str, date_of_j
         return dict(zip(keys, result))
     else:
         return None
+
+
+# -------------------------------------------------------------------
+# 3️⃣  Update the available seat count for a given train/date/class
+# -------------------------------------------------------------------
+def update_available_seats(conn: sqlite3.Connection, train_number: str, date_of_journey: str, class_type: str, available_seats: int):
+    cursor = conn.cursor()
+    cursor.execute("""
+        UPDATE seat_availability
+        SET available_seats = ?
+        WHERE train_number = ? AND date_of_journey = ? AND class_type = ?
+    """, (available_seats, train_number, date_of_journey, class_type))
+    conn.commit()
+    return cursor.rowcount > 0  # returns True if updated successfully
+
+
+# -------------------------------------------------------------------
+# 4️⃣  Apply booked-seat deltas (write-behind from the seat inventory)
+# -------------------------------------------------------------------
+def apply_seat_deltas(conn: sqlite3.Connection, deltas, commit: bool = True):
+    """
+    Subtract booked seats from available_seats.
+    `deltas` is a list of (seats_booked, train_number, date_of_journey, class_type).
+    """
+    cursor = conn.cursor()
+    cursor.executemany("""
+        UPDATE seat_availability
+        SET available_seats = MAX(available_seats - ?, 0)
+        WHERE train_number = ? AND date_of_journey = ? AND class_type = ?
+    """, deltas)
+    if commit:
+        conn.commit()
+    return cursor.rowcount
@@ -0,0 +1,87 @@
+import sqlite3
+import json
+
+
+# -------------------------------------------------------------------
+# 1️⃣  Create the call session table (one row per active CallSid)
+# -------------------------------------------------------------------
+def create_sessions_table(conn: sqlite3.Connection):
+    cursor = conn.cursor()
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS call_sessions (
+            call_sid TEXT PRIMARY KEY,
+            data TEXT NOT NULL,
+            expires_at REAL NOT NULL
+        )
+    """)
+    conn.commit()
+
+
+# -------------------------------------------------------------------
+# 2️⃣  Read a live (unexpired) session
+# -------------------------------------------------------------------
+def get_session(conn: sqlite3.Connection, call_sid: str, now: float):
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT data FROM call_sessions WHERE call_sid = ? AND expires_at > ?",
+        (call_sid, now),
+    )
+    row = cursor.fetchone()
+    return json.loads(row[0]) if row else None
+
+
+# -------------------------------------------------------------------
+# 3️⃣  Merge values into a session and push its expiry out
+# -------------------------------------------------------------------
+def _merge_expression(base: str, values: dict, params: dict) -> str:
+    """
+    SQL for `base` (a JSON object) with each top-level key of `values` set,
+    or removed when its value is None. Values go in whole through json(), so
+    nulls inside nested objects and lists are kept (json_patch would drop them).
+    """
+    expr = base
+    for i, (key, value) in enumerate(values.items()):
+        if '"' in key:
+            raise ValueError(f"Session keys cannot contain double quotes: {key!r}")
+        params[f"path{i}"] = f'$."{key}"'  # quoted label: dots in a key are not a nested path
+        if value is None:
+            expr = f"json_remove({expr}, :path{i})"
+        else:
+            params[f"value{i}"] = json.dumps(value)
+            expr = f"json_set({expr}, :path{i}, json(:value{i}))"
+    return expr
+
+
+def save_session(conn: sqlite3.Connection, call_sid: str, values: dict, now: float, expires_at: float,
+                 commit: bool = True):
+    """Upsert: keys in `values` overwrite, a None value removes the key, an expired session starts over."""
+    params = {"call_sid": call_sid, "expires_at": expires_at, "now": now}
+    cursor = conn.cursor()
+    cursor.execute(f"""
+        INSERT INTO call_sessions (call_sid, data, expires_at)
+        VALUES (:call_sid, {_merge_expression("'{}'", values, params)}, :expires_at)
+        ON CONFLICT (call_sid) DO UPDATE SET
+            data = {_merge_expression(
+                "CASE WHEN call_sessions.expires_at > :now THEN call_sessions.data ELSE '{}' END", values, params)},
+            expires_at = excluded.expires_at
+    """, params)
+    if commit:
+        conn.commit()
+
+
+# -------------------------------------------------------------------
+# 4️⃣  Delete one session / purge expired ones
+# -------------------------------------------------------------------
+def delete_session(conn: sqlite3.Connection, call_sid: str, commit: bool = True):
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM call_sessions WHERE call_sid = ?", (call_sid,))
+    if commit:
+        conn.commit()
+
+
+def purge_expired_sessions(conn: sqlite3.Connection, now: float, commit: bool = True):
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM call_sessions WHERE expires_at <= ?", (now,))
+    if commit:
+        conn.commit()
+    return cursor.rowcount
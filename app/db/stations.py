@@ -0,0 +1,81 @@
+"""
+Lookup keys for station-pair searches on train_schedule.
+
+  station_key("Mumbai Central")   -> "mumbai"
+  station_key("New Delhi")        -> "delhi"
+  days_mask("Mon, Wed, Fri")      -> 0b0010101   (bit 0 = Monday ... bit 6 = Sunday)
+  days_mask("Daily")              -> 0b1111111
+
+Station keys are city-level on purpose: a caller asking for trains "from
+Delhi to Mumbai" means every Delhi and every Mumbai terminal, so terminal
+qualifiers ("Central", "Junction", "CST", "New") are dropped and old or
+alternate city names are folded onto one spelling. Both functions are pure
+so they can be registered as SQLite functions for the backfill.
+"""
+import datetime
+import re
+
+ALL_DAYS = 0b1111111
+
+_WORD_RE = re.compile(r"[a-z]+")
+# Terminal / station qualifiers that don't change which city is meant
+_QUALIFIERS = frozenset("""
+    new old central junction jn jct terminus terminal terminals cst ltt city cantt cantonment
+    station railway rly main road
+""".split())
+# Alternate and former city names, and twin terminals callers name by city
+_ALIASES = {
+    "bengaluru": "bangalore", "bombay": "mumbai", "madras": "chennai", "calcutta": "kolkata",
+    "howrah": "kolkata", "sealdah": "kolkata", "thiruvananthapuram": "trivandrum",
+    "secunderabad": "hyderabad", "kochi": "ernakulam", "cochin": "ernakulam", "vizag": "visakhapatnam",
+    "mysuru": "mysore", "puducherry": "pondicherry", "gurugram": "gurgaon",
+}
+
+_DAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+_DAY = r"(mon|tue|wed|thu|fri|sat|sun)[a-z]*"
+_DAY_RE = re.compile(rf"\b{_DAY}\b")
+_RANGE_RE = re.compile(rf"\b{_DAY}\s*(?:-|to|till|through)\s*{_DAY}\b")
+_DAILY_RE = re.compile(r"\b(daily|everyday|every day|all days)\b")
+_EXCEPT_RE = re.compile(r"\b(?:except|excluding|ex)\b\.?(.*)")
+
+
+def station_key(name: str):
+    """City-level key for a station name (None for an empty name)."""
+    words = [_ALIASES.get(word, word) for word in _WORD_RE.findall((name or "").lower())]
+    kept = [word for word in words if word not in _QUALIFIERS]
+    return " ".join(kept or words) or None
+
+
+def _listed_days(text: str) -> int:
+    mask = 0
+    if "weekday" in text:
+        mask |= 0b0011111
+    if "weekend" in text:
+        mask |= 0b1100000
+    for first, last in _RANGE_RE.findall(text):
+        day = _DAYS.index(first)
+        while True:  # "Fri - Mon" wraps round the week
+            mask |= 1 << day
+            if _DAYS[day] == last:
+                break
+            day = (day + 1) % 7
+    for day in _DAY_RE.findall(text):
+        mask |= 1 << _DAYS.index(day)
+    return mask
+
+
+def days_mask(days_of_operation: str):
+    """Weekday bitmask (bit 0 = Monday) for free-text days of operation, or None if unreadable."""
+    text = (days_of_operation or "").lower()
+    if _DAILY_RE.search(text):
+        return ALL_DAYS
+    excluded = _EXCEPT_RE.search(text)
+    if excluded:
+        mask = _listed_days(excluded.group(1))
+        return ALL_DAYS & ~mask if mask else None
+    return _listed_days(text) or None
+
+
+def weekday_bit(journey_date: str) -> int:
+    """The days_mask bit for an ISO date (raises ValueError for a malformed one)."""
+    return 1 << datetime.date.fromisoformat(journey_date).weekday()
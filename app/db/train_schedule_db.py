@@ -1,5 +1,10 @@
+import logging
 import sqlite3
 
+from app.db.stations import station_key, days_mask, weekday_bit
+
+logger = logging.getLogger(__name__)
+
 # -------------------------------------------------------------------
 # 1️⃣  Create the Train Schedule table
 # -------------------------------------------------------------------
@@ -42,23 +47,87 @@ def create_train_schedule_table(conn: sqlite3.Connection):
             ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
         """, sample_schedules)
         conn.commit()
-        print("✅ Train Schedule table created with 10 sample records.")
+        logger.info("✅ Train Schedule table created with 10 sample records.")
     else:
-        print("ℹ️ Train Schedule table already exists, skipping data insertion.")
+        logger.info("ℹ️ Train Schedule table already exists, skipping data insertion.")
 
 
 # -------------------------------------------------------------------
 # 2️⃣  Fetch train schedule by train number
 # -------------------------------------------------------------------
+SCHEDULE_COLUMNS = (
+    "train_number", "train_name", "source", "destination",
+    "departure_time", "arrival_time", "travel_duration", "days_of_operation"
+)
+
+
 def get_train_schedule(conn: sqlite3.Connection, train_number: str):
     cursor = conn.cursor()
-    cursor.execute("SELECT * FROM train_schedule WHERE train_number = ?", (train_number,))
+    cursor.execute(f"SELECT {', '.join(SCHEDULE_COLUMNS)} FROM train_schedule WHERE train_number = ?",
+                   (train_number,))
     result = cursor.fetchone()
     if result:
-        keys = [
-            "train_number", "train_name", "source", "destination",
-            "departure_time", "arrival_time", "travel_duration", "days_of_operation"
-        ]
-        return dict(zip(keys, result))
+        return dict(zip(SCHEDULE_COLUMNS, result))
     else:
         return None
+
+
+# -------------------------------------------------------------------
+# 3️⃣  Whole-table reads (name index, cache warmup)
+# -------------------------------------------------------------------
+def list_train_names(conn: sqlite3.Connection):
+    cursor = conn.cursor()
+    cursor.execute("SELECT train_number, train_name FROM train_schedule ORDER BY train_number")
+    return cursor.fetchall()
+
+
+def list_train_schedules(conn: sqlite3.Connection, limit: int):
+    """Up to `limit` full schedule rows (warms the lookup cache at worker start)."""
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT {', '.join(SCHEDULE_COLUMNS)} FROM train_schedule LIMIT ?", (limit,))
+    return [dict(zip(SCHEDULE_COLUMNS, row)) for row in cursor.fetchall()]
+
+
+# -------------------------------------------------------------------
+# 4️⃣  Trains between two stations on a date
+# -------------------------------------------------------------------
+def get_trains_between(conn: sqlite3.Connection, source: str, destination: str, journey_date: str,
+                       limit: int = 50):
+    """
+    Direct trains from `source` to `destination` running on `journey_date`
+    (YYYY-MM-DD), earliest departure first. Served from
+    idx_train_schedule_route; the weekday test is a bit check on days_mask.
+    """
+    cursor = conn.cursor()
+    cursor.execute(f"""
+        SELECT {', '.join(SCHEDULE_COLUMNS)} FROM train_schedule
+        WHERE source_key = ? AND destination_key = ? AND (days_mask & ?) != 0
+        ORDER BY departure_time
+        LIMIT ?
+    """, (station_key(source), station_key(destination), weekday_bit(journey_date), limit))
+    return [dict(zip(SCHEDULE_COLUMNS, row)) for row in cursor.fetchall()]
+
+
+# -------------------------------------------------------------------
+# 5️⃣  Recompute the route-search columns from the free-text ones
+# -------------------------------------------------------------------
+def refresh_route_keys(conn: sqlite3.Connection, commit: bool = True):
+    """
+    Fill source_key / destination_key / days_mask for every row (see
+    app.db.stations). Run by the migration that adds them and after bulk loads.
+    Returns the number of rows whose days of operation could not be read.
+    """
+    conn.create_function("route_station_key", 1, station_key, deterministic=True)
+    conn.create_function("route_days_mask", 1, days_mask, deterministic=True)
+    cursor = conn.cursor()
+    cursor.execute("""
+        UPDATE train_schedule SET
+            source_key = route_station_key(source),
+            destination_key = route_station_key(destination),
+            days_mask = route_days_mask(days_of_operation)
+    """)
+    cursor.execute("SELECT COUNT(*) FROM train_schedule WHERE days_mask IS NULL")
+    unreadable = cursor.fetchone()[0]
+    if commit:
+        conn.commit()
+    return unreadable
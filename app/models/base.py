@@ -0,0 +1,28 @@
+"""
+Base pieces for the app's record models.
+
+Models are NamedTuples: immutable, cheap to build on a request path, and laid
+out in the column order of the table that stores them, so a batch goes
+straight to `executemany`. Enumerated fields are stored as small integers and
+shown by name in API output.
+"""
+from enum import IntEnum
+
+
+class Code(IntEnum):
+    """A small-integer code stored in SQLite."""
+
+    @property
+    def label(self) -> str:
+        return self.name.lower()
+
+    @classmethod
+    def from_label(cls, label: str):
+        return cls[label.upper()]
+
+
+def insert_sql(table: str, model) -> str:
+    """INSERT statement for a NamedTuple model whose fields are the table's columns."""
+    columns = ", ".join(model._fields)
+    placeholders = ", ".join("?" * len(model._fields))
+    return f"INSERT INTO {table} ({columns}) VALUES ({placeholders})"
@@ -0,0 +1,44 @@
+"""
+Call interaction events: what happened on each call, one row per event.
+
+  event            recorded when                           step / outcome / value
+  CALL_STARTED     /voice/incoming                         -
+  INTENT_CHOSEN    a department is picked for the caller   - / classified, keypad, ambiguous, not_understood / confidence
+  DEPARTMENT_STEP  any webhook for the call was handled    URL path / HTTP status / handling time in ms
+  LOOKUP_HIT       a record the caller asked for exists    table / cache or db
+  LOOKUP_MISS      ... and does not                        table / db
+  RETRY            the caller is asked again               prompt name
+  HANGUP           Twilio's call-status callback           - / CallStatus / call duration in seconds
+
+`department` is the IVR department ("pnr_status", "refunds", ...; "voice" for
+the main menu). Text fields use "" rather than NULL so they can be part of
+the rollup key.
+"""
+from typing import NamedTuple, Optional
+
+from app.models.base import Code
+
+
+class EventType(Code):
+    CALL_STARTED = 1
+    INTENT_CHOSEN = 2
+    DEPARTMENT_STEP = 3
+    LOOKUP_HIT = 4
+    LOOKUP_MISS = 5
+    RETRY = 6
+    HANGUP = 7
+
+
+class InteractionEvent(NamedTuple):
+    ts: float                  # epoch seconds
+    call_sid: Optional[str]
+    event: int                 # EventType
+    department: str = ""
+    step: str = ""
+    outcome: str = ""
+    value: Optional[float] = None
+
+    @property
+    def hour(self) -> int:
+        """Rollup bucket: whole hours since the epoch (UTC)."""
+        return int(self.ts // 3600)
@@ -0,0 +1,101 @@
+"""
+Caller-ID prefetch: what we already know about the calling number.
+
+Twilio sends the caller's `From` number with /voice/incoming. While the
+greeting plays and the caller records their query (ten seconds or more),
+a background task looks that number up in `complaints.contact_number`,
+follows the PNRs it finds to `pnr_details` and `refunds`, and stores the
+result in the call session under "caller". Department handlers then answer
+from the session ("your P N R ending 7 8 9 0?") instead of querying after
+transcription.
+
+The data is a snapshot taken at the start of the call, which is as fresh as
+a caller on a few-minute call needs.
+"""
+import asyncio
+import logging
+import re
+
+from app.core.config import settings
+from app.db import async_db
+from app.services.session_store import sessions
+
+logger = logging.getLogger(__name__)
+
+_NON_DIGITS = re.compile(r"\D")
+
+
+def contact_variants(number: str):
+    """The spellings one phone number may be stored under ("+919876543210", "9876543210", ...)."""
+    number = (number or "").strip()
+    digits = _NON_DIGITS.sub("", number)
+    if len(digits) < 6:
+        return []  # "anonymous", "Not Provided", short codes
+    variants = {number, digits}
+    # Indian mobiles: with or without +91 / 0 in front
+    national = digits[2:] if len(digits) == 12 and digits.startswith("91") else \
+        digits[1:] if len(digits) == 11 and digits.startswith("0") else digits if len(digits) == 10 else None
+    if national:
+        variants.update((national, "0" + national, "91" + national, "+91" + national))
+    return sorted(variants)
+
+
+def spoken_ending(number: str, digits: int = 4) -> str:
+    """ "1234567890" -> "7 8 9 0", read out digit by digit."""
+    return " ".join(number[-digits:])
+
+
+def find_pnr(records: dict, pnr_number: str):
+    """The prefetched details for `pnr_number`, or None."""
+    return next((p for p in records.get("pnrs", ()) if p["pnr_number"] == pnr_number), None)
+
+
+class CallerPrefetch:
+    def __init__(self, max_pnrs: int = None, wait: float = None):
+        self.max_pnrs = max_pnrs or settings.CALLER_PREFETCH_PNRS
+        self.wait = wait if wait is not None else settings.CALLER_PREFETCH_WAIT
+        self._pending = {}  # CallSid -> prefetch task still running
+        self.stats = {"started": 0, "found": 0, "empty": 0, "failed": 0, "waited": 0}
+
+    def start(self, call_sid: str, from_number: str):
+        """Begin loading the caller's records in the background (called from /voice/incoming)."""
+        variants = contact_variants(from_number)
+        if not call_sid or not variants or call_sid in self._pending:
+            return
+        task = asyncio.create_task(self._prefetch(call_sid, variants))
+        self._pending[call_sid] = task
+        task.add_done_callback(lambda _: self._pending.pop(call_sid, None))
+        self.stats["started"] += 1
+
+    async def _prefetch(self, call_sid, variants):
+        try:
+            records = await async_db.get_caller_records(variants, self.max_pnrs)
+        except Exception:
+            self.stats["failed"] += 1
+            logger.exception("⚠️ Caller prefetch failed")
+            return
+        self.stats["found" if records["complaints"] else "empty"] += 1
+        await sessions.update(call_sid, caller=records)
+
+    async def records(self, call_sid: str) -> dict:
+        """The caller's prefetched records ({} if none); waits briefly for a prefetch still running."""
+        task = self._pending.get(call_sid)
+        if task is not None:
+            self.stats["waited"] += 1
+            try:
+                await asyncio.wait_for(asyncio.shield(task), self.wait)
+            except asyncio.TimeoutError:
+                pass
+        return (await sessions.get(call_sid)).get("caller") or {}
+
+    async def stop(self):
+        """Drop prefetches still in flight (app shutdown); they only read."""
+        for task in list(self._pending.values()):
+            task.cancel()
+        await asyncio.gather(*self._pending.values(), return_exceptions=True)
+
+    def summary(self):
+        return {**self.stats, "pending": len(self._pending)}
+
+
+caller_prefetch = CallerPrefetch()
@@ -0,0 +1,122 @@
+"""
+Cross-worker cache coherence over the SQLite change log.
+
+Each gunicorn worker has its own lookup caches, train-name index and seat
+counters. A write in one worker invalidates only that worker's cache, so
+triggers on the cached tables (migration 7) append every changed row's cache
+key to `change_log`, whatever wrote it: a request in another worker, the bulk
+loader, or a manual UPDATE. Every worker polls the log from the last ID it
+has seen, every CACHE_SYNC_INTERVAL seconds, and:
+
+  - drops those keys from its caches (the whole table's cache when a batch
+    touches more than CLEAR_TABLE_AFTER keys, e.g. after a bulk load);
+  - hands the keys to subscribers such as the train-name index and the seat
+    inventory, which re-read what they hold.
+
+Entries older than CHANGE_LOG_RETENTION seconds are purged.
+"""
+import asyncio
+import logging
+import time
+from collections import defaultdict
+
+from app.core.config import settings
+from app.db import async_db, changes_db
+from app.db.cache import caches, invalidate
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 1000
+CLEAR_TABLE_AFTER = 200
+# Purge old entries every this many polls
+PURGE_EVERY = 300
+
+
+class ChangeFeed:
+    def __init__(self, poll_interval: float = None, retention: float = None):
+        self.poll_interval = poll_interval or settings.CACHE_SYNC_INTERVAL
+        self.retention = retention or settings.CHANGE_LOG_RETENTION
+        self._last_id = None
+        self._subscribers = defaultdict(list)  # table -> [async callback(keys or None)]
+        self._task = None
+        self._stopping = None
+        self.stats = {"polls": 0, "changes": 0, "keys_invalidated": 0, "tables_cleared": 0, "purged": 0}
+
+    def subscribe(self, table: str, callback):
+        """Call `await callback(keys)` when rows of `table` change; keys is None for "anything may have"."""
+        self._subscribers[table].append(callback)
+
+    async def poll(self) -> int:
+        """Apply the changes logged since the last poll. Returns how many were read."""
+        if self._last_id is None:
+            # Start from now: this worker's caches are empty, nothing older matters
+            self._last_id = await async_db.run_db(changes_db.get_last_change_id)
+            return 0
+        changes = await async_db.run_db(changes_db.get_changes_since, self._last_id, BATCH_SIZE)
+        self.stats["polls"] += 1
+        if not changes:
+            return 0
+        self._last_id = changes[-1][0]
+        self.stats["changes"] += len(changes)
+        logger.debug("🔁 Change-log batch", extra={"changes": len(changes), "last_change_id": self._last_id})
+
+        by_table = defaultdict(set)
+        for _, table, key in changes:
+            by_table[table].add(key)
+        for table, keys in by_table.items():
+            if len(keys) > CLEAR_TABLE_AFTER:
+                keys = None
+            if table in caches:
+                if keys is None:
+                    invalidate(table)
+                    self.stats["tables_cleared"] += 1
+                else:
+                    for key in keys:
+                        invalidate(table, key)
+                    self.stats["keys_invalidated"] += len(keys)
+            for callback in self._subscribers[table]:
+                try:
+                    await callback(keys)
+                except Exception:
+                    logger.exception("⚠️ Change-feed subscriber failed", extra={"table": table})
+        return len(changes)
+
+    async def purge(self) -> int:
+        purged = await async_db.run_write(changes_db.purge_changes, time.time() - self.retention)
+        self.stats["purged"] += purged
+        return purged
+
+    def start(self):
+        """Start polling on the running event loop (app startup)."""
+        if self._task is None:
+            self._stopping = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._stopping.set()
+            await self._task
+            self._task = None
+
+    async def _run(self):
+        polls = 0
+        while not self._stopping.is_set():
+            try:
+                # A full batch means more are waiting: keep reading without sleeping
+                while await self.poll() == BATCH_SIZE:
+                    pass
+                polls += 1
+                if polls % PURGE_EVERY == 0:
+                    await self.purge()
+            except Exception:
+                logger.exception("⚠️ Change-feed poll failed")
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def summary(self):
+        return {**self.stats, "last_change_id": self._last_id}
+
+
+change_feed = ChangeFeed()
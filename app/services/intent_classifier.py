@@ -0,0 +1,174 @@
+"""
+Keyword/phrase intent classifier for the main IVR menu.
+
+All phrases are compiled into one regex alternation (longest phrase first),
+so a transcript is scanned once, left to right, and a multi-word phrase such
+as "refund status" is consumed whole instead of also counting as "status".
+Each matched phrase adds its weights to one or more departments; the best
+score wins if it is strong and clearly ahead, otherwise the caller is asked
+to pick between the top candidates.
+"""
+import re
+from typing import NamedTuple
+
+# ---------------------------------------------------------
+# 1️⃣ Phrase weights per department
+# ---------------------------------------------------------
+PNR_STATUS = "pnr_status"
+COMPLAINTS = "complaints"
+EMERGENCY = "emergency"
+TRAIN_SCHEDULE = "train_schedule"
+SEAT_AVAILABILITY = "seat_availability"
+REFUNDS = "refunds"
+
+DEPARTMENTS = (PNR_STATUS, COMPLAINTS, EMERGENCY, TRAIN_SCHEDULE, SEAT_AVAILABILITY, REFUNDS)
+
+PHRASE_WEIGHTS = {
+    # PNR status
+    "pnr": {PNR_STATUS: 3.0},
+    "p n r": {PNR_STATUS: 3.0},
+    "pnr status": {PNR_STATUS: 4.0},
+    "p n r status": {PNR_STATUS: 4.0},
+    "pnr number": {PNR_STATUS: 3.0},
+    "booking status": {PNR_STATUS: 3.5},
+    "ticket status": {PNR_STATUS: 3.5},
+    "status": {PNR_STATUS: 1.0},
+    "confirmed": {PNR_STATUS: 1.5},
+    "waiting list": {PNR_STATUS: 2.0},
+    "rac": {PNR_STATUS: 1.5},
+    "r a c": {PNR_STATUS: 1.5},
+
+    # Complaints
+    "complaint": {COMPLAINTS: 3.0},
+    "complaints": {COMPLAINTS: 3.0},
+    "complain": {COMPLAINTS: 3.0},
+    "complaint status": {COMPLAINTS: 4.0},
+    "register a complaint": {COMPLAINTS: 4.0},
+    "issue": {COMPLAINTS: 1.5},
+    "i have an issue": {COMPLAINTS: 3.0},
+    "i have a problem": {COMPLAINTS: 3.0},
+    "problem": {COMPLAINTS: 1.5},
+    "dirty": {COMPLAINTS: 2.0},
+    "not clean": {COMPLAINTS: 2.0},
+    "rude": {COMPLAINTS: 2.0},
+    "feedback": {COMPLAINTS: 1.5},
+
+    # Emergency
+    "emergency": {EMERGENCY: 4.0},
+    "accident": {EMERGENCY: 4.0},
+    "ambulance": {EMERGENCY: 4.0},
+    "fire": {EMERGENCY: 3.0},
+    "smoke": {EMERGENCY: 3.0},
+    "medical": {EMERGENCY: 3.0},
+    "doctor": {EMERGENCY: 3.0},
+    "injured": {EMERGENCY: 3.0},
+    "police": {EMERGENCY: 3.0},
+    "theft": {EMERGENCY: 3.0},
+    "stolen": {EMERGENCY: 3.0},
+    "urgent": {EMERGENCY: 2.0},
+    "help": {EMERGENCY: 1.0},
+
+    # Train schedule
+    "train schedule": {TRAIN_SCHEDULE: 4.0},
+    "schedule": {TRAIN_SCHEDULE: 3.0},
+    "timing": {TRAIN_SCHEDULE: 2.5},
+    "timings": {TRAIN_SCHEDULE: 2.5},
+    "time table": {TRAIN_SCHEDULE: 3.0},
+    "timetable": {TRAIN_SCHEDULE: 3.0},
+    "arrival": {TRAIN_SCHEDULE: 2.0},
+    "departure": {TRAIN_SCHEDULE: 2.0},
+    "running status": {TRAIN_SCHEDULE: 3.0},
+    "time": {TRAIN_SCHEDULE: 1.0},
+    "when does": {TRAIN_SCHEDULE: 1.5},
+    "train": {TRAIN_SCHEDULE: 0.5, SEAT_AVAILABILITY: 0.25},
+
+    # Seat availability
+    "seat availability": {SEAT_AVAILABILITY: 4.0},
+    "seats available": {SEAT_AVAILABILITY: 4.0},
+    "available seats": {SEAT_AVAILABILITY: 4.0},
+    "availability": {SEAT_AVAILABILITY: 3.0},
+    "available": {SEAT_AVAILABILITY: 1.5},
+    "seat": {SEAT_AVAILABILITY: 2.5},
+    "seats": {SEAT_AVAILABILITY: 2.5},
+    "berth": {SEAT_AVAILABILITY: 1.5},
+    "booking": {SEAT_AVAILABILITY: 1.0, PNR_STATUS: 0.5},
+    "book a ticket": {SEAT_AVAILABILITY: 2.5},
+
+    # Refunds
+    "refund": {REFUNDS: 3.0},
+    "refunds": {REFUNDS: 3.0},
+    "refund status": {REFUNDS: 4.5},
+    "cancel": {REFUNDS: 2.5},
+    "cancelled": {REFUNDS: 2.5},
+    "cancellation": {REFUNDS: 2.5},
+    "cancelled ticket": {REFUNDS: 3.5},
+    "money back": {REFUNDS: 3.0},
+    "money": {REFUNDS: 1.5},
+}
+
+# A department needs at least this score, and this share of the top-two
+# total, to be chosen without asking the caller.
+MIN_SCORE = 1.5
+MIN_CONFIDENCE = 0.65
+
+# Routed straight through whenever they reach MIN_SCORE, ambiguity or not
+PRIORITY_DEPARTMENTS = (EMERGENCY,)
+
+
+# ---------------------------------------------------------
+# 2️⃣ Compile the phrase automaton once
+# ---------------------------------------------------------
+_PHRASE_RE = re.compile(
+    r"\b(?:"
+    + "|".join(re.escape(p) for p in sorted(PHRASE_WEIGHTS, key=len, reverse=True))
+    + r")\b"
+)
+
+# Punctuation becomes a space so "p.n.r." / "P-N-R" normalize like "p n r"
+_PUNCTUATION = str.maketrans({ch: " " for ch in ".,;:!?-_'\"()/\\"})
+
+
+class IntentResult(NamedTuple):
+    department: str      # chosen department, or None when the caller must be asked
+    confidence: float    # top score / (top + runner-up)
+    candidates: tuple    # departments ranked by score (only those that scored)
+    scores: dict
+
+
+def normalize_transcript(text: str) -> str:
+    return " ".join((text or "").lower().translate(_PUNCTUATION).split())
+
+
+def score_transcript(text: str) -> dict:
+    """Single pass over the (normalized) transcript, summing phrase weights."""
+    scores = {}
+    for match in _PHRASE_RE.finditer(normalize_transcript(text)):
+        for department, weight in PHRASE_WEIGHTS[match.group()].items():
+            scores[department] = scores.get(department, 0.0) + weight
+    return scores
+
+
+# ---------------------------------------------------------
+# 3️⃣ Classify
+# ---------------------------------------------------------
+def classify(text: str, allowed=None) -> IntentResult:
+    """Pick a department for the transcript (optionally only among `allowed`)."""
+    scores = score_transcript(text)
+    if allowed is not None:
+        scores = {d: s for d, s in scores.items() if d in allowed}
+
+    candidates = tuple(sorted(scores, key=scores.get, reverse=True))
+    if not candidates:
+        return IntentResult(None, 0.0, (), scores)
+
+    top = scores[candidates[0]]
+    runner_up = scores[candidates[1]] if len(candidates) > 1 else 0.0
+    confidence = top / (top + runner_up)
+
+    for department in PRIORITY_DEPARTMENTS:
+        if scores.get(department, 0.0) >= MIN_SCORE:
+            return IntentResult(department, confidence, candidates, scores)
+
+    if top >= MIN_SCORE and confidence >= MIN_CONFIDENCE:
+        return IntentResult(candidates[0], confidence, candidates, scores)
+    return IntentResult(None, confidence, candidates, scores)
@@ -0,0 +1,148 @@
+"""
+Call interaction events, buffered in memory and written in batches.
+
+`interaction_log.record(...)` only appends a tuple to a list, so request
+handlers never wait on the database for analytics. A background task hands
+the buffer to the group-commit writer every INTERACTION_FLUSH_INTERVAL
+seconds, or sooner once INTERACTION_BATCH_SIZE events are waiting. The same
+transaction appends the raw events and adds them to the hourly
+per-department rollups (app.db.interactions_db), so analytics read only the
+rollups.
+
+If the database falls behind, the buffer is capped at INTERACTION_BUFFER_MAX
+and new events are dropped (counted in `stats`). Call handling must never
+slow down for the sake of analytics. Raw events older than
+INTERACTION_RETENTION_DAYS are purged once an hour; the rollups are kept.
+
+The CallSid and department are taken from the request context when not
+given, so a handler usually only names the event:
+
+    interaction_log.record(EventType.CALL_STARTED)
+"""
+import asyncio
+import logging
+import time
+
+from app.core.config import settings
+from app.core.logging_config import call_sid_var, route_var
+from app.db import async_db
+from app.models.interaction import EventType, InteractionEvent
+
+logger = logging.getLogger(__name__)
+
+PURGE_INTERVAL = 3600  # seconds
+
+
+def department_for(path: str) -> str:
+    """"/pnr_status/process_pnr" -> "pnr_status"."""
+    return (path or "").strip("/").split("/", 1)[0]
+
+
+class InteractionLog:
+    def __init__(self, flush_interval: float = None, batch_size: int = None, max_buffered: int = None,
+                 retention_days: float = None):
+        self.flush_interval = flush_interval or settings.INTERACTION_FLUSH_INTERVAL
+        self.batch_size = batch_size or settings.INTERACTION_BATCH_SIZE
+        self.max_buffered = max_buffered or settings.INTERACTION_BUFFER_MAX
+        self.retention = (retention_days or settings.INTERACTION_RETENTION_DAYS) * 86400
+        self._buffer = []
+        self._task = None
+        self._stopping = None
+        self._wake = None
+        self._last_purge = 0.0
+        self.stats = {"recorded": 0, "written": 0, "flushes": 0, "dropped": 0, "failed_flushes": 0, "purged": 0}
+
+    # ---------------------------------------------------------
+    # 1️⃣ Recording (event loop; never blocks)
+    # ---------------------------------------------------------
+    def record(self, event: EventType, department: str = None, step: str = "", outcome: str = "",
+               value: float = None, call_sid: str = None):
+        if len(self._buffer) >= self.max_buffered:
+            self.stats["dropped"] += 1
+            return
+        if department is None:
+            department = department_for(route_var.get())
+        self._buffer.append(InteractionEvent(
+            time.time(), call_sid or call_sid_var.get(), int(event), department, step, outcome, value,
+        ))
+        self.stats["recorded"] += 1
+        if len(self._buffer) >= self.batch_size and self._wake is not None:
+            self._wake.set()
+
+    def record_lookup(self, table: str, found: bool, source: str):
+        """async_db lookup observer: only lookups made while handling a call are recorded."""
+        if call_sid_var.get():
+            self.record(EventType.LOOKUP_HIT if found else EventType.LOOKUP_MISS, step=table, outcome=source)
+
+    def reprompt(self, prompt):
+        """Record a RETRY for a re-ask prompt (StaticTwiML) and return its response."""
+        self.record(EventType.RETRY, step=prompt.name)
+        return prompt.response()
+
+    # ---------------------------------------------------------
+    # 2️⃣ Batched writes
+    # ---------------------------------------------------------
+    async def flush(self) -> int:
+        if not self._buffer:
+            return 0
+        batch, self._buffer = self._buffer, []
+        try:
+            await async_db.append_interaction_events(batch)
+        except Exception:
+            self.stats["failed_flushes"] += 1
+            logger.exception("⚠️ Interaction event flush failed (will retry)", extra={"events": len(batch)})
+            # Put the batch back in front of newer events, within the buffer cap
+            room = max(self.max_buffered - len(self._buffer), 0)
+            self.stats["dropped"] += max(len(batch) - room, 0)
+            self._buffer[:0] = batch[:room]
+            return 0
+        self.stats["flushes"] += 1
+        self.stats["written"] += len(batch)
+        return len(batch)
+
+    async def purge(self) -> int:
+        purged = await async_db.purge_interaction_events(time.time() - self.retention)
+        self.stats["purged"] += purged
+        return purged
+
+    # ---------------------------------------------------------
+    # 3️⃣ Background flusher
+    # ---------------------------------------------------------
+    def start(self):
+        """Start flushing on the running event loop (app startup)."""
+        if self._task is None:
+            self._stopping = asyncio.Event()
+            self._wake = asyncio.Event()
+            async_db.lookup_observers.append(self.record_lookup)
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flusher and write out whatever is still buffered."""
+        if self._task is not None:
+            self._stopping.set()
+            self._wake.set()
+            await self._task
+            self._task = None
+            async_db.lookup_observers.remove(self.record_lookup)
+        await self.flush()
+
+    async def _run(self):
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.flush()
+                if time.time() - self._last_purge >= PURGE_INTERVAL:
+                    self._last_purge = time.time()
+                    await self.purge()
+            except Exception:
+                logger.exception("⚠️ Interaction log maintenance failed")
+
+    def summary(self):
+        return {**self.stats, "buffered": len(self._buffer)}
+
+
+interaction_log = InteractionLog()
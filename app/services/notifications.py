@@ -0,0 +1,193 @@
+"""
+Outbound notification queue for emergency alerts.
+
+The emergency webhook only writes the alert into the `outbound_alerts` table
+(in the same transaction as the report) and returns; background workers on
+the event loop claim due alerts, hand them to a pluggable sender in a small
+thread pool, and record the outcome back on the alert and the emergency
+report. Failed sends are retried with exponential backoff and dead-lettered
+after ALERT_MAX_ATTEMPTS. Because the queue lives in SQLite, alerts survive a
+restart, and a send a crashed worker left half-done is reclaimed after its lease.
+A send must therefore finish well within ALERT_LEASE_SECONDS, or another
+worker reclaims the alert and sends it again: the Twilio client has an HTTP
+timeout (TWILIO_HTTP_TIMEOUT), and the sender is built in the thread pool too.
+"""
+import asyncio
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.core.config import settings
+from app.db import async_db
+from app.services.twilio_client import get_twilio_client
+
+logger = logging.getLogger(__name__)
+
+
+# ---------------------------------------------------------
+# 1️⃣ Senders (blocking; run in the alert thread pool)
+# ---------------------------------------------------------
+class TwilioSmsSender:
+    """Send alerts as SMS through the Twilio REST API."""
+
+    def __init__(self, client=None, from_number=None):
+        self.client = client or get_twilio_client()
+        self.from_number = from_number or settings.TWILIO_PHONE_NUMBER
+
+    def send(self, recipient: str, body: str) -> str:
+        message = self.client.messages.create(to=recipient, from_=self.from_number, body=body)
+        return message.sid
+
+
+class StubSender:
+    """Local/test sender: records messages instead of sending them. Can be told to fail."""
+
+    def __init__(self, fail_times: int = 0):
+        self.sent = []            # (recipient, body)
+        self.fail_times = fail_times
+
+    def send(self, recipient: str, body: str) -> str:
+        if self.fail_times > 0:
+            self.fail_times -= 1
+            raise RuntimeError("stub sender: simulated delivery failure")
+        self.sent.append((recipient, body))
+        logger.info("📩 [stub] SMS sent", extra={"recipient": recipient, "body": body})
+        return f"STUB{len(self.sent):06d}"
+
+
+SENDERS = {
+    "twilio": TwilioSmsSender,
+    "stub": StubSender,
+}
+
+
+def emergency_alert_body(emergency_text: str) -> str:
+    return f"🚨 Emergency Alert: {emergency_text[:150]}..."
+
+
+def backoff_delay(attempts: int) -> float:
+    """Exponential backoff with jitter: base * 2^(attempts-1), capped at ALERT_BACKOFF_MAX."""
+    delay = min(settings.ALERT_BACKOFF_MAX, settings.ALERT_BACKOFF_BASE * 2 ** (attempts - 1))
+    return delay * random.uniform(0.8, 1.2)
+
+
+# ---------------------------------------------------------
+# 2️⃣ Queue workers
+# ---------------------------------------------------------
+class AlertQueue:
+    def __init__(self, sender=None, workers: int = None):
+        self._sender = sender
+        self.workers = workers or settings.ALERT_WORKERS
+        self._tasks = []
+        self._stopping = False
+        self._wakeup = None
+        self._executor = None
+        self._sender_lock = threading.Lock()
+        self.stats = {"sent": 0, "retried": 0, "dead": 0}
+
+    @property
+    def sender(self):
+        # Built on first use (in the thread pool, see _send) so importing the app never needs Twilio credentials
+        if self._sender is None:
+            self._sender = SENDERS[settings.ALERT_SENDER]()
+        return self._sender
+
+    @sender.setter
+    def sender(self, sender):
+        self._sender = sender
+
+    def start(self):
+        """Start the workers on the running event loop (app startup)."""
+        if self._tasks:
+            return
+        if settings.ALERT_SENDER == "twilio" and 2 * settings.TWILIO_HTTP_TIMEOUT >= settings.ALERT_LEASE_SECONDS:
+            logger.warning("⚠️ A hung SMS send can outlast the alert lease and be sent twice", extra={
+                "twilio_http_timeout": settings.TWILIO_HTTP_TIMEOUT, "lease_seconds": settings.ALERT_LEASE_SECONDS,
+            })
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    def wake(self):
+        """Tell idle workers a new alert was queued (instead of waiting for the next poll)."""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def stop(self, timeout: float = 10.0):
+        """Let in-flight sends finish (up to `timeout`), then stop; unsent alerts stay queued."""
+        if not self._tasks:
+            return
+        self._stopping = True
+        self._wakeup.set()
+        _, pending = await asyncio.wait(self._tasks, timeout=timeout)
+        for task in pending:
+            task.cancel()  # its claimed alert is retried once the lease expires
+        self._tasks = []
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    async def drain(self):
+        """Process everything currently due, then return (used by tools and checks)."""
+        while await self._process_batch():
+            pass
+
+    async def _worker(self):
+        while not self._stopping:
+            try:
+                if await self._process_batch():
+                    continue
+            except Exception:
+                logger.exception("⚠️ Alert worker error")
+            if self._stopping:
+                break
+            # Nothing due: sleep until an enqueue wakes us or a retry may have come due
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=settings.ALERT_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _process_batch(self) -> bool:
+        alerts = await async_db.claim_due_alerts(1, settings.ALERT_LEASE_SECONDS)
+        for alert in alerts:
+            await self._deliver(alert)
+        return bool(alerts)
+
+    def _send(self, recipient: str, body: str) -> str:
+        """Runs in the alert thread pool: importing and building the Twilio client blocks too."""
+        with self._sender_lock:
+            sender = self.sender
+        return sender.send(recipient, body)
+
+    async def _deliver(self, alert):
+        loop = asyncio.get_running_loop()
+        try:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="ivr-alerts")
+            message_id = await loop.run_in_executor(self._executor, self._send, alert["recipient"], alert["body"])
+        except Exception as error:
+            attempts = alert["attempts"]
+            if attempts >= settings.ALERT_MAX_ATTEMPTS:
+                await async_db.mark_alert_failed(alert["alert_id"], alert["report_id"], attempts, str(error))
+                self.stats["dead"] += 1
+                logger.error("☠️ Alert dead-lettered", extra={
+                    "alert_id": alert["alert_id"], "report_id": alert["report_id"], "attempts": attempts, "error": str(error),
+                })
+            else:
+                retry_at = time.time() + backoff_delay(attempts)
+                await async_db.mark_alert_failed(alert["alert_id"], alert["report_id"], attempts, str(error), retry_at)
+                self.stats["retried"] += 1
+                logger.warning("⚠️ Alert send failed; retrying", extra={
+                    "alert_id": alert["alert_id"], "report_id": alert["report_id"], "attempts": attempts, "error": str(error),
+                })
+            return
+
+        await async_db.mark_alert_sent(alert["alert_id"], alert["report_id"], alert["attempts"], message_id)
+        self.stats["sent"] += 1
+        logger.info("📩 Alert sent", extra={"alert_id": alert["alert_id"], "report_id": alert["report_id"]})
+
+
+alert_queue = AlertQueue()
@@ -0,0 +1,110 @@
+"""
+Keeps this worker's in-memory read snapshot (app.db.database.ReadSnapshot)
+close to the database file.
+
+The snapshot is re-copied every DB_SNAPSHOT_REFRESH_INTERVAL seconds. When
+the change feed reports changed rows in one of its tables (whichever worker,
+request or bulk load wrote them), those rows are marked stale and read from
+the file from then on, and the next copy is made once
+DB_SNAPSHOT_MIN_REFRESH_INTERVAL has passed since the last one. A table
+written every second (seat write-behind) therefore costs a few file reads,
+not a re-copy of every snapshot table per change.
+
+The change feed drops the changed keys from the lookup caches before it
+notifies subscribers, so a lookup in between could re-cache the old row from
+the copy; the keys are dropped again once they are marked stale.
+"""
+import asyncio
+import logging
+import time
+
+from app.core.config import settings
+from app.db import async_db
+from app.db.cache import caches, invalidate
+from app.db.database import snapshot
+
+logger = logging.getLogger(__name__)
+
+
+class SnapshotRefresher:
+    def __init__(self, refresh_interval: float = None, min_interval: float = None):
+        self.refresh_interval = refresh_interval or settings.DB_SNAPSHOT_REFRESH_INTERVAL
+        self.min_interval = min_interval if min_interval is not None else settings.DB_SNAPSHOT_MIN_REFRESH_INTERVAL
+        self._lock = None
+        self._started_at = None
+        self._task = None
+        self._stopping = None
+        self._changed = None
+        self.stats = {"refreshes": 0, "coalesced": 0, "failed": 0, "change_batches": 0}
+
+    async def refresh(self) -> int:
+        """Re-copy the snapshot tables unless a copy started since this call. Returns rows copied."""
+        asked = time.monotonic()
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self._started_at is not None and self._started_at >= asked:
+                self.stats["coalesced"] += 1
+                return 0
+            self._started_at = time.monotonic()
+            rows = await async_db.refresh_read_snapshot()
+        self.stats["refreshes"] += 1
+        logger.debug("🧊 Read snapshot refreshed", extra={"rows": rows, "seconds": snapshot.last_refresh_s})
+        return rows
+
+    async def on_change(self, table: str, keys):
+        """Change-feed subscriber for a snapshot table (register it before the table's other subscribers)."""
+        self.stats["change_batches"] += 1
+        whole_table = keys is None or None in keys
+        snapshot.mark_stale(table, None if whole_table else keys)
+        if table in caches:
+            if whole_table:
+                invalidate(table)
+            else:
+                for key in keys:
+                    invalidate(table, key)
+        if self._changed is not None:
+            self._changed.set()  # the periodic loop schedules the re-copy
+
+    def start(self):
+        """Start the periodic refresh on the running event loop (after the first `refresh()`)."""
+        if self._task is None:
+            self._stopping = asyncio.Event()
+            self._changed = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop refreshing and release the snapshot (reads go back to the file)."""
+        if self._task is not None:
+            self._stopping.set()
+            await self._task
+            self._task = None
+        snapshot.close()
+
+    async def _wait(self, timeout: float):
+        """Sleep up to `timeout`, waking early on stop() or a change."""
+        waits = [asyncio.ensure_future(self._stopping.wait()), asyncio.ensure_future(self._changed.wait())]
+        await asyncio.wait(waits, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        for waiting in waits:
+            waiting.cancel()
+
+    async def _run(self):
+        while not self._stopping.is_set():
+            self._changed.clear()
+            interval = self.min_interval if snapshot.dirty else self.refresh_interval
+            remaining = (self._started_at or 0) + interval - time.monotonic()
+            if remaining > 0:
+                await self._wait(remaining)
+                continue
+            try:
+                await self.refresh()
+            except Exception:
+                self.stats["failed"] += 1
+                logger.exception("⚠️ Read snapshot refresh failed (still serving the previous copy)")
+                await self._wait(self.min_interval)
+
+    def summary(self):
+        return {**self.stats, **snapshot.stats()}
+
+
+read_snapshot = SnapshotRefresher()
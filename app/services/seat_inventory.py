@@ -0,0 +1,269 @@
+"""
+In-memory seat inventory with atomic hold / confirm / release.
+
+Each (train_number, date_of_journey, class_type) gets a slot in a set of flat
+integer arrays: total seats, seats free to hold, seats held and confirmed
+bookings not yet written to SQLite. Every operation is a few array updates
+under one lock, so concurrent callers can never take more seats than exist
+and nothing waits on a SQLite row lock.
+
+  hold     take seats from `available`; lapses after SEAT_HOLD_TTL unless confirmed
+  confirm  turn a hold into a booking (queued for write-behind)
+  release  give a hold's seats back
+
+A background task on the event loop expires lapsed holds and, every
+SEAT_FLUSH_INTERVAL seconds, writes the accumulated bookings as deltas
+(`available_seats - n`) through the group-commit writer. Only confirmed
+bookings reach the database, so holds simply vanish on a restart.
+
+Slots are loaded from `seat_availability` on first use. Each worker keeps
+its own counters; when another worker's bookings (or a bulk load) change a
+tracked row, the change feed calls `reconcile()` and the slot is re-read.
+Between one worker's flush and the others' next poll a seat can still be
+promised twice, and a hold can only be confirmed or released on the worker
+that made it, so bookings that must never oversell belong on one worker.
+"""
+import asyncio
+import heapq
+import logging
+import secrets
+import threading
+import time
+from array import array
+
+from app.core.config import settings
+from app.db import async_db, seat_db
+
+logger = logging.getLogger(__name__)
+
+
+class SeatInventory:
+    def __init__(self, hold_ttl: float = None, flush_interval: float = None, max_per_hold: int = None):
+        self.hold_ttl = hold_ttl or settings.SEAT_HOLD_TTL
+        self.flush_interval = flush_interval or settings.SEAT_FLUSH_INTERVAL
+        self.max_per_hold = max_per_hold or settings.SEAT_MAX_PER_HOLD
+
+        # key -> slot; the arrays below are indexed by slot
+        self._slots = {}
+        self._keys = []
+        self._total = array("l")
+        self._available = array("l")   # free to hold
+        self._held = array("l")
+        self._unflushed = array("l")   # confirmed, not yet written to SQLite
+        self._dirty = set()            # slots with _unflushed > 0
+
+        self._holds = {}               # hold_id -> (slot, seats, expires_at)
+        self._expiry = []              # heap of (expires_at, hold_id)
+        self._lock = threading.Lock()
+        self._flush_lock = asyncio.Lock()  # reconcile must not read the table mid-flush
+        self._task = None
+        self._stopping = None
+        self.stats = {"holds": 0, "rejected": 0, "confirmed": 0, "released": 0, "expired": 0,
+                      "flushes": 0, "seats_flushed": 0, "reconciled": 0}
+
+    # ---------------------------------------------------------
+    # 1️⃣ Slots
+    # ---------------------------------------------------------
+    def register(self, key, total_seats: int, available_seats: int) -> int:
+        """Add a slot for `key` (no-op if it is already tracked). Returns the slot."""
+        with self._lock:
+            slot = self._slots.get(key)
+            if slot is None:
+                slot = len(self._keys)
+                self._slots[key] = slot
+                self._keys.append(key)
+                self._total.append(total_seats or 0)
+                self._available.append(max(available_seats or 0, 0))
+                self._held.append(0)
+                self._unflushed.append(0)
+            return slot
+
+    async def load(self, train_number: str, date_of_journey: str, class_type: str) -> bool:
+        """Make sure the key is tracked, reading it from SQLite the first time. False if no such row."""
+        key = (train_number, date_of_journey, class_type)
+        if key in self._slots:
+            return True
+        # Straight from the table, not the lookup cache: the starting count must be current
+        row = await async_db.run_db(seat_db.get_seat_availability, train_number, date_of_journey, class_type)
+        if row is None:
+            return False
+        self.register(key, row["total_seats"], row["available_seats"])
+        return True
+
+    async def reconcile(self, keys=None) -> int:
+        """
+        Re-read tracked keys (all of them when `keys` is None) after the table
+        changed underneath us. The table already has every booking this worker
+        flushed; seats still held or unflushed here are taken off the new count.
+        """
+        tracked = [key for key in (list(self._keys) if keys is None else keys) if key in self._slots]
+        async with self._flush_lock:
+            for key in tracked:
+                row = await async_db.run_db(seat_db.get_seat_availability, *key)
+                if row is None:
+                    continue
+                slot = self._slots[key]
+                with self._lock:
+                    self._total[slot] = row["total_seats"] or 0
+                    self._available[slot] = max(
+                        (row["available_seats"] or 0) - self._held[slot] - self._unflushed[slot], 0
+                    )
+        self.stats["reconciled"] += len(tracked)
+        return len(tracked)
+
+    def available(self, key):
+        """Seats free to hold for `key`, or None when the key is not tracked."""
+        slot = self._slots.get(key)
+        return None if slot is None else self._available[slot]
+
+    def snapshot(self, key):
+        slot = self._slots.get(key)
+        if slot is None:
+            return None
+        with self._lock:
+            return {"total": self._total[slot], "available": self._available[slot],
+                    "held": self._held[slot], "unflushed": self._unflushed[slot]}
+
+    # ---------------------------------------------------------
+    # 2️⃣ Hold / confirm / release (atomic)
+    # ---------------------------------------------------------
+    def try_hold(self, key, seats: int, ttl: float = None):
+        """Hold `seats` on a tracked key. Returns a hold ID, or None if not enough are free."""
+        if not 0 < seats <= self.max_per_hold:
+            raise ValueError(f"seats must be between 1 and {self.max_per_hold}")
+        slot = self._slots[key]
+        expires_at = time.monotonic() + (ttl or self.hold_ttl)
+        with self._lock:
+            if self._available[slot] < seats:
+                self.stats["rejected"] += 1
+                return None
+            self._available[slot] -= seats
+            self._held[slot] += seats
+            hold_id = secrets.token_hex(8)
+            self._holds[hold_id] = (slot, seats, expires_at)
+            heapq.heappush(self._expiry, (expires_at, hold_id))
+            self.stats["holds"] += 1
+        return hold_id
+
+    async def hold(self, train_number: str, date_of_journey: str, class_type: str, seats: int):
+        """Load the key if needed, then hold. Returns a hold ID, or None (unknown key / sold out)."""
+        if not await self.load(train_number, date_of_journey, class_type):
+            return None
+        return self.try_hold((train_number, date_of_journey, class_type), seats)
+
+    def confirm(self, hold_id: str) -> bool:
+        """Book a live hold's seats. False if the hold is unknown, released or expired."""
+        now = time.monotonic()
+        with self._lock:
+            hold = self._holds.get(hold_id)
+            if hold is None:
+                return False
+            slot, seats, expires_at = hold
+            if expires_at <= now:
+                # Lapsed but not swept yet: it must not be booked
+                self._release(hold_id)
+                self.stats["expired"] += 1
+                return False
+            del self._holds[hold_id]
+            self._held[slot] -= seats
+            self._unflushed[slot] += seats
+            self._dirty.add(slot)
+            self.stats["confirmed"] += 1
+        return True
+
+    def release(self, hold_id: str) -> bool:
+        """Give a live hold's seats back. False if it is unknown or already gone."""
+        with self._lock:
+            if not self._release(hold_id):
+                return False
+            self.stats["released"] += 1
+        return True
+
+    def _release(self, hold_id):
+        hold = self._holds.pop(hold_id, None)
+        if hold is None:
+            return False
+        slot, seats, _ = hold
+        self._held[slot] -= seats
+        self._available[slot] += seats
+        return True
+
+    def expire_holds(self, now: float = None) -> int:
+        """Release every hold past its expiry. Returns how many lapsed."""
+        now = time.monotonic() if now is None else now
+        expired = 0
+        with self._lock:
+            while self._expiry and self._expiry[0][0] <= now:
+                _, hold_id = heapq.heappop(self._expiry)
+                # Confirmed / released holds leave a stale heap entry behind; skip those
+                if self._release(hold_id):
+                    expired += 1
+            self.stats["expired"] += expired
+        return expired
+
+    # ---------------------------------------------------------
+    # 3️⃣ Write-behind
+    # ---------------------------------------------------------
+    def _take_deltas(self):
+        with self._lock:
+            deltas = [(self._unflushed[slot], *self._keys[slot]) for slot in self._dirty]
+            for slot in self._dirty:
+                self._unflushed[slot] = 0
+            self._dirty.clear()
+        return deltas
+
+    def _restore_deltas(self, deltas):
+        with self._lock:
+            for seats, *key in deltas:
+                slot = self._slots[tuple(key)]
+                self._unflushed[slot] += seats
+                self._dirty.add(slot)
+
+    async def flush(self) -> int:
+        """Write confirmed bookings to SQLite. Returns seats written; on failure they stay queued."""
+        async with self._flush_lock:
+            deltas = self._take_deltas()
+            if not deltas:
+                return 0
+            try:
+                await async_db.apply_seat_deltas(deltas)
+            except Exception:
+                self._restore_deltas(deltas)
+                raise
+        seats = sum(seats for seats, *_ in deltas)
+        self.stats["flushes"] += 1
+        self.stats["seats_flushed"] += seats
+        return seats
+
+    def start(self):
+        """Start the expiry / write-behind loop on the running event loop (app startup)."""
+        if self._task is None:
+            self._stopping = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the loop and write out every confirmed booking."""
+        if self._task is not None:
+            # Not cancelled: a flush in progress must finish, or its deltas would be lost
+            self._stopping.set()
+            await self._task
+            self._task = None
+        await self.flush()
+
+    async def _run(self):
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            try:
+                self.expire_holds()
+                await self.flush()
+            except Exception:
+                logger.exception("⚠️ Seat inventory flush failed (will retry)")
+
+    def summary(self):
+        return {**self.stats, "tracked": len(self._keys), "active_holds": len(self._holds)}
+
+
+seat_inventory = SeatInventory()
@@ -0,0 +1,102 @@
+"""
+Per-call session state, keyed by Twilio's CallSid.
+
+Multi-step flows (seat availability, the department menu, ...) keep what the
+caller has told us so far here instead of in action-URL query strings, and
+anything captured once (PNR, train number) can be reused by later departments
+in the same call. Sessions expire SESSION_TTL seconds after their last update.
+
+Two backends with the same async interface:
+  MemorySessionStore  dict in the worker process; fastest, single worker only
+  SqliteSessionStore  `call_sessions` table, shared by every worker on the host
+Pick one with SESSION_BACKEND; `sessions` is the app-wide instance.
+"""
+import time
+from collections import OrderedDict
+
+from app.core.config import settings
+from app.db import async_db, sessions_db
+
+
+class MemorySessionStore:
+    def __init__(self, ttl: float = None, max_entries: int = None):
+        self.ttl = ttl or settings.SESSION_TTL
+        self.max_entries = max_entries or settings.SESSION_MAX_ENTRIES
+        # CallSid -> (expires_at, data), least recently updated first. With one
+        # TTL for everyone that is also expiry order, so sweeping only ever
+        # looks at the front. Only touched from the event loop thread.
+        self._sessions = OrderedDict()
+
+    def _sweep(self, now: float):
+        while self._sessions:
+            call_sid, (expires_at, _) = next(iter(self._sessions.items()))
+            if expires_at > now and len(self._sessions) <= self.max_entries:
+                break
+            del self._sessions[call_sid]
+
+    async def get(self, call_sid: str) -> dict:
+        """The session's values (a copy; empty when unknown or expired)."""
+        entry = self._sessions.get(call_sid)
+        if entry is None or entry[0] <= time.monotonic():
+            return {}
+        return dict(entry[1])
+
+    async def update(self, call_sid: str, **values):
+        """Merge `values` into the session (None removes a key) and renew its TTL."""
+        if not call_sid:
+            return
+        now = time.monotonic()
+        entry = self._sessions.pop(call_sid, None)
+        data = entry[1] if entry is not None and entry[0] > now else {}
+        for key, value in values.items():
+            if value is None:
+                data.pop(key, None)
+            else:
+                data[key] = value
+        self._sessions[call_sid] = (now + self.ttl, data)
+        self._sweep(now)
+
+    async def clear(self, call_sid: str):
+        self._sessions.pop(call_sid, None)
+
+    def stats(self):
+        return {"backend": "memory", "sessions": len(self._sessions)}
+
+
+class SqliteSessionStore:
+    # Expired rows are deleted once every this many updates
+    PURGE_EVERY = 500
+
+    def __init__(self, ttl: float = None):
+        self.ttl = ttl or settings.SESSION_TTL
+        self._updates = 0
+
+    async def get(self, call_sid: str) -> dict:
+        if not call_sid:
+            return {}
+        return await async_db.run_db(sessions_db.get_session, call_sid, time.time()) or {}
+
+    async def update(self, call_sid: str, **values):
+        if not call_sid:
+            return
+        now = time.time()
+        # Through the group-commit writer: a burst of calls stepping at once shares one commit
+        await async_db.run_write(sessions_db.save_session, call_sid, values, now, now + self.ttl)
+        self._updates += 1
+        if self._updates % self.PURGE_EVERY == 0:
+            await async_db.run_write(sessions_db.purge_expired_sessions, now)
+
+    async def clear(self, call_sid: str):
+        if call_sid:
+            await async_db.run_write(sessions_db.delete_session, call_sid)
+
+    def stats(self):
+        return {"backend": "sqlite", "updates": self._updates}
+
+
+BACKENDS = {
+    "memory": MemorySessionStore,
+    "sqlite": SqliteSessionStore,
+}
+
+sessions = BACKENDS[settings.SESSION_BACKEND]()
@@ -0,0 +1,117 @@
+"""
+Caller input through <Gather input="speech dtmf">.
+
+Twilio recognises the speech while the caller is still talking and posts the
+result (SpeechResult, Confidence) straight to the Gather's action URL. A
+<Record transcribe="true"> instead recorded first and transcribed
+afterwards, which added seconds to every step and often came back empty.
+
+    gather = speech_gather(response, "/pnr_status/process_pnr", digits=10, partial="pnr")
+    gather.say("Please say your ten digit P N R number, or enter it on your keypad.")
+
+Prompts that take a number also accept the keypad (`digits`): entry ends
+after that many keys, or on #. The prompt is nested in the Gather, so the
+caller can answer before it finishes. Answers that hold no number or station
+get each step's "not captured" re-prompt. Silence falls through the Gather
+and ends the call, as it did after a silent <Record>, so a dead line is not
+re-prompted forever.
+
+With `partial`, Twilio also posts interim transcripts to
+/voice/partial_speech while the caller speaks. Once they contain a whole PNR
+or train number, the lookup starts and fills the lookup cache, so the final
+webhook usually answers from it.
+"""
+import asyncio
+import logging
+
+from app.core.config import settings
+from app.core.logging_config import call_sid_var
+from app.db import async_db
+from app.services.speech_normalizer import spoken_digits
+
+logger = logging.getLogger(__name__)
+
+# Twilio class token: bias recognition towards digit strings
+DIGIT_HINTS = ("$OOV_CLASS_DIGIT_SEQUENCE",)
+# Twilio's speech model for short number / command answers
+DIGITS_MODEL = "numbers_and_commands"
+
+# partial kind -> (digits in a complete answer, cache-filling lookup)
+PARTIAL_PREFETCH = {
+    "pnr": (10, async_db.get_pnr_details),
+    "train": (5, async_db.get_train_schedule),
+}
+
+
+# ---------------------------------------------------------
+# 1️⃣ Prompt side: the <Gather> every department uses
+# ---------------------------------------------------------
+def speech_gather(response, action: str, hints=(), digits: int = None, partial: str = None, model: str = None,
+                  timeout: int = 6):
+    """
+    Add a <Gather> that posts the caller's speech (or, with `digits`, keypad
+    entry) to `action` and return it, so the prompt can be nested inside.
+    Number prompts use DIGITS_MODEL unless `model` names another speech model.
+    """
+    options = {
+        "input": "speech dtmf" if digits else "speech",
+        "action": action,
+        "method": "POST",
+        "language": settings.SPEECH_LANGUAGE,
+        "speech_timeout": settings.SPEECH_TIMEOUT,
+        "timeout": timeout,
+    }
+    if hints:
+        options["hints"] = ", ".join(hints)
+    if digits:
+        options["num_digits"] = digits
+        options["finish_on_key"] = "#"
+    if model or digits:
+        options["speech_model"] = model or DIGITS_MODEL
+    if partial and settings.SPEECH_PARTIAL_RESULTS:
+        if partial not in PARTIAL_PREFETCH:
+            raise ValueError(f"Unknown partial-result kind {partial!r}")
+        options["partial_result_callback"] = f"{settings.PUBLIC_BASE_URL}/voice/partial_speech?kind={partial}"
+    return response.gather(**options)
+
+
+# ---------------------------------------------------------
+# 2️⃣ Webhook side
+# ---------------------------------------------------------
+def caller_input(form) -> str:
+    """
+    What the caller gave a Gather: keypad digits, else the recognised speech.
+    TranscriptionText covers calls still on a <Record> prompt across a deploy.
+    """
+    text = form.get("Digits") or form.get("SpeechResult") or form.get("TranscriptionText") or ""
+    if form.get("SpeechResult"):
+        logger.debug("🎧 Speech result", extra={"transcript": text, "confidence": form.get("Confidence")})
+    return text.strip()
+
+
+_prefetching = set()  # (kind, digits) lookups in flight
+_tasks = set()        # strong references until they finish
+
+
+def prefetch_partial(kind: str, text: str) -> bool:
+    """Start the lookup for a complete number heard in an interim transcript. True if one started."""
+    expected, lookup = PARTIAL_PREFETCH.get(kind, (None, None))
+    number = spoken_digits(text or "")
+    if lookup is None or len(number) != expected or (kind, number) in _prefetching:
+        return False
+
+    async def fetch():
+        # The task's own copy of the context: the final webhook's lookup is the one the interaction log records
+        call_sid_var.set(None)
+        try:
+            await lookup(number)
+        except Exception:
+            logger.exception("⚠️ Partial-result prefetch failed", extra={"kind": kind})
+        finally:
+            _prefetching.discard((kind, number))
+
+    _prefetching.add((kind, number))
+    task = asyncio.create_task(fetch())
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+    return True
@@ -0,0 +1,292 @@
+"""
+Spoken-number and spoken-date normalizer for Twilio transcripts.
+
+Callers say PNRs, train numbers and dates the way the prompts ask them to
+("one two six two seven", "twenty twenty five dash eleven dash zero five"),
+and the transcription comes back as words, digits or a mix of both. Keeping
+only the digit characters loses everything spoken as words, so here the
+transcript is tokenized once with a compiled regex, each token is looked up
+in a single word table, and one left-to-right pass assembles:
+
+  digit words / digit runs   "one two 6 27"          -> 12627
+  repeats                    "double seven", "triple 0"
+  number words               "twelve", "twenty five", "one hundred and five",
+                             "two thousand twenty five"
+  dates                      "2025-11-05", "twenty twenty five dash eleven dash
+                             zero five", "5th November", "tomorrow", "Friday", 05/11/2025
+  station pairs              "from New Delhi to Bangalore on the fifth of November"
+
+Anything else (filler words, "my PNR is ...") is skipped.
+"""
+import datetime
+import re
+from typing import NamedTuple
+
+# ---------------------------------------------------------
+# 1️⃣ Word table
+# ---------------------------------------------------------
+UNIT, TEEN, TENS, MULTIPLIER, REPEAT, AND, SEPARATOR, MONTH, ORDINAL, DIGITS = range(10)
+
+_UNITS = ("zero", "one", "two", "three", "four", "five", "six", "seven", "eight", "nine")
+_TEENS = ("ten", "eleven", "twelve", "thirteen", "fourteen", "fifteen", "sixteen",
+          "seventeen", "eighteen", "nineteen")
+_TENS = ("twenty", "thirty", "forty", "fifty", "sixty", "seventy", "eighty", "ninety")
+_ORDINALS = ("first", "second", "third", "fourth", "fifth", "sixth", "seventh", "eighth", "ninth",
+             "tenth", "eleventh", "twelfth", "thirteenth", "fourteenth", "fifteenth", "sixteenth",
+             "seventeenth", "eighteenth", "nineteenth", "twentieth")
+_MONTHS = ("january", "february", "march", "april", "may", "june", "july", "august",
+           "september", "october", "november", "december")
+
+WORDS = {}
+WORDS.update({word: (UNIT, value) for value, word in enumerate(_UNITS)})
+WORDS.update({word: (TEEN, 10 + value) for value, word in enumerate(_TEENS)})
+WORDS.update({word: (TENS, 20 + 10 * value) for value, word in enumerate(_TENS)})
+WORDS.update({word: (ORDINAL, 1 + value) for value, word in enumerate(_ORDINALS)})
+WORDS.update({word: (MONTH, 1 + value) for value, word in enumerate(_MONTHS)})
+WORDS.update({word[:3]: (MONTH, 1 + value) for value, word in enumerate(_MONTHS)})
+WORDS.update({
+    "oh": (UNIT, 0), "o": (UNIT, 0), "nought": (UNIT, 0),
+    "fourty": (TENS, 40),  # common mis-transcription
+    "thirtieth": (ORDINAL, 30), "sept": (MONTH, 9),
+    "hundred": (MULTIPLIER, 100), "thousand": (MULTIPLIER, 1000),
+    "double": (REPEAT, 2), "triple": (REPEAT, 3), "treble": (REPEAT, 3),
+    "and": (AND, None),
+    "dash": (SEPARATOR, None), "hyphen": (SEPARATOR, None), "minus": (SEPARATOR, None),
+    "slash": (SEPARATOR, None), "stroke": (SEPARATOR, None),
+})
+
+# One alternation, tried left to right: digit runs (with an ordinal suffix),
+# date punctuation, then words. Everything else is skipped.
+_TOKEN_RE = re.compile(r"(\d+)(?:st|nd|rd|th)?\b|(\d+)|([-/.])|([a-z]+)")
+
+_RELATIVE_DAYS = (
+    (re.compile(r"\bday after tomorrow\b"), 2),
+    (re.compile(r"\btomorrow\b"), 1),
+    (re.compile(r"\btoday\b"), 0),
+)
+_WEEKDAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+_WEEKDAY_RE = re.compile(rf"\b({'|'.join(_WEEKDAYS)})\b")
+
+
+def _tokenize(text: str):
+    tokens = []
+    for match in _TOKEN_RE.finditer(text.lower()):
+        ordinal_digits, digits, separator, word = match.groups()
+        if ordinal_digits is not None:
+            if match.group().isdigit():
+                tokens.append((DIGITS, ordinal_digits))
+            else:
+                tokens.append((ORDINAL, int(ordinal_digits)))
+        elif digits is not None:
+            tokens.append((DIGITS, digits))
+        elif separator is not None:
+            tokens.append((SEPARATOR, None))
+        else:
+            entry = WORDS.get(word)
+            if entry is not None:
+                tokens.append(entry)
+    return tokens
+
+
+# ---------------------------------------------------------
+# 2️⃣ Assemble numbers
+# ---------------------------------------------------------
+class Piece(NamedTuple):
+    kind: int      # DIGITS, SEPARATOR, MONTH or ORDINAL
+    value: object  # digit string for DIGITS, int otherwise
+
+
+def _below_hundred(tokens, i):
+    """`twenty` / `twenty five` / `twelve` / `seven` at tokens[i] -> (value, next index)."""
+    kind, value = tokens[i]
+    if kind == TENS and i + 1 < len(tokens) and tokens[i + 1][0] == UNIT and tokens[i + 1][1]:
+        return value + tokens[i + 1][1], i + 2
+    return value, i + 1
+
+
+def _is_number_word(tokens, i):
+    return i < len(tokens) and tokens[i][0] in (UNIT, TEEN, TENS)
+
+
+def _below_thousand(tokens, i):
+    """Like _below_hundred, plus `<n> hundred [and] <m>`."""
+    value, i = _below_hundred(tokens, i)
+    if i < len(tokens) and tokens[i] == (MULTIPLIER, 100):
+        value *= 100
+        i += 1
+        j = i + 1 if i < len(tokens) and tokens[i][0] == AND else i
+        if _is_number_word(tokens, j):
+            rest, i = _below_hundred(tokens, j)
+            value += rest
+    return value, i
+
+
+def _cardinal(tokens, i):
+    """A spoken number starting at tokens[i] -> (digit string, next index)."""
+    value, i = _below_thousand(tokens, i)
+    if i < len(tokens) and tokens[i] == (MULTIPLIER, 1000):
+        value *= 1000
+        i += 1
+        j = i + 1 if i < len(tokens) and tokens[i][0] == AND else i
+        if _is_number_word(tokens, j):
+            rest, i = _below_thousand(tokens, j)
+            value += rest
+    return str(value), i
+
+
+def pieces(text: str):
+    """The transcript as a list of Pieces: digit strings, separators, months and ordinals."""
+    tokens = _tokenize(text or "")
+    out = []
+    i = 0
+    while i < len(tokens):
+        kind, value = tokens[i]
+        if kind == REPEAT and i + 1 < len(tokens) and tokens[i + 1][0] in (UNIT, DIGITS):
+            repeated = tokens[i + 1][1]
+            out.append(Piece(DIGITS, str(repeated) * value))
+            i += 2
+        elif kind == TENS and i + 1 < len(tokens) and tokens[i + 1][0] == ORDINAL and tokens[i + 1][1] < 10:
+            out.append(Piece(ORDINAL, value + tokens[i + 1][1]))  # "twenty first"
+            i += 2
+        elif kind in (UNIT, TEEN, TENS):
+            digits, i = _cardinal(tokens, i)
+            out.append(Piece(DIGITS, digits))
+        elif kind in (DIGITS, SEPARATOR, MONTH, ORDINAL):
+            out.append(Piece(kind, value))
+            i += 1
+        else:
+            i += 1  # a stray "and" / "hundred" / "double"
+    return out
+
+
+def spoken_digits(text: str) -> str:
+    """Every number in the transcript, spoken or written, as one digit string."""
+    return "".join(piece.value for piece in pieces(text) if piece.kind == DIGITS)
+
+
+# ---------------------------------------------------------
+# 3️⃣ Dates
+# ---------------------------------------------------------
+def _iso(year, month, day):
+    try:
+        return datetime.date(int(year), int(month), int(day)).isoformat()
+    except (TypeError, ValueError):
+        return None
+
+
+def _with_month_name(parts, month, today):
+    """`5th November [2025]`, `November five twenty twenty five`, ... -> ISO date."""
+    numbers = [p.value for p in parts if p.kind == DIGITS]
+    day = next((p.value for p in parts if p.kind == ORDINAL), None)
+    if day is None and numbers and len(numbers[0]) <= 2:
+        day, numbers = numbers[0], numbers[1:]
+    if day is None:
+        return None
+    year = "".join(numbers)
+    if len(year) == 4:
+        return _iso(year, month, day)
+    # No year: the next time that day comes round
+    date = _iso(today.year, month, day)
+    if date is not None and date < today.isoformat():
+        date = _iso(today.year + 1, month, day)
+    return date
+
+
+def _numeric(parts):
+    """`2025-11-05`, `05/11/2025`, `2025 11 05`, `20251105` -> ISO date."""
+    groups = [""]
+    for piece in parts:
+        if piece.kind == SEPARATOR:
+            if groups[-1]:
+                groups.append("")
+        elif piece.kind == DIGITS:
+            groups[-1] += piece.value
+    groups = [g for g in groups if g]
+    if len(groups) == 1:
+        # No separators: "2025 11 05" still arrives as three separate digit runs
+        runs = [p.value for p in parts if p.kind == DIGITS]
+        if len(runs) == 3 and 4 in (len(runs[0]), len(runs[2])):
+            groups = runs
+
+    if len(groups) == 3:
+        if len(groups[0]) == 4:
+            return _iso(*groups)                        # year-month-day, as the prompt asks
+        if len(groups[2]) == 4:
+            return _iso(groups[2], groups[1], groups[0])  # day/month/year
+        return None
+    digits = "".join(groups)
+    if len(digits) == 8:
+        if digits[:2] in ("19", "20"):
+            date = _iso(digits[:4], digits[4:6], digits[6:])
+            if date:
+                return date
+        return _iso(digits[4:], digits[2:4], digits[:2])
+    return None
+
+
+def parse_date(text: str, today: datetime.date = None):
+    """The spoken date as YYYY-MM-DD, or None if it can't be read as one."""
+    today = today or datetime.date.today()
+    lowered = (text or "").lower()
+    for pattern, days in _RELATIVE_DAYS:
+        if pattern.search(lowered):
+            return (today + datetime.timedelta(days=days)).isoformat()
+    weekday = _WEEKDAY_RE.search(lowered)
+    if weekday:
+        # "on Friday", "next Friday": the next time that weekday comes round
+        ahead = (_WEEKDAYS.index(weekday.group(1)) - today.weekday()) % 7
+        if ahead == 0 and "next" in lowered:
+            ahead = 7
+        return (today + datetime.timedelta(days=ahead)).isoformat()
+
+    parts = pieces(lowered)
+    month = next((p.value for p in parts if p.kind == MONTH), None)
+    if month is not None:
+        return _with_month_name(parts, month, today)
+    if [p.kind for p in parts] == [ORDINAL]:
+        # "on the third": that day of this month, or of next month once it has passed
+        month = today.month if parts[0].value >= today.day else today.month % 12 + 1
+        year = today.year + (month < today.month)
+        return _iso(year, month, parts[0].value)
+    return _numeric(parts)
+
+
+# ---------------------------------------------------------
+# 4️⃣ Station pairs
+# ---------------------------------------------------------
+class RouteRequest(NamedTuple):
+    source: str
+    destination: str
+    journey_date: str  # YYYY-MM-DD, or None if a date was said but couldn't be read
+
+
+_ROUTE_WORD_RE = re.compile(r"[a-z]+|\d+(?:st|nd|rd|th)?")
+# Words that start the date part of "... to Bangalore on the fifth of November"
+_DATE_WORDS = frozenset(("on", "for", "this", "next", "coming", "today", "tomorrow", "day", "the"))
+
+
+def parse_route(text: str, today: datetime.date = None):
+    """
+    "from X to Y [date]" / "between X and Y [date]" -> RouteRequest, or None
+    if the transcript doesn't name two stations. No date means today.
+    """
+    today = today or datetime.date.today()
+    words = _ROUTE_WORD_RE.findall((text or "").lower())
+    for opener, joiner in (("from", "to"), ("between", "and")):
+        if opener in words and joiner in words[words.index(opener) + 1:]:
+            start = words.index(opener) + 1
+            middle = words.index(joiner, start)
+            break
+    else:
+        return None
+
+    end = middle + 1
+    while end < len(words) and words[end] not in _DATE_WORDS and words[end] not in WORDS \
+            and words[end] not in _WEEKDAYS and not words[end][0].isdigit():
+        end += 1
+    source, destination = " ".join(words[start:middle]), " ".join(words[middle + 1:end])
+    if not source or not destination:
+        return None
+    rest = " ".join(words[end:])
+    journey_date = parse_date(rest, today) if rest else today.isoformat()
+    return RouteRequest(source.title(), destination.title(), journey_date)
@@ -0,0 +1,274 @@
+"""
+Fuzzy train-name index: "Karnataka Express" -> 12627.
+
+Built in memory from `train_schedule.train_name`. Every word of every name
+goes into a small vocabulary indexed two ways:
+
+  character trigrams   tolerate transcription slips ("carnataka", "rajdani")
+  phonetic key         consonant skeleton after folding aspirates and common
+                       spelling variants, so "Kanyakumari" finds "Kanniyakumari"
+
+A query is tokenized and each word is matched against the vocabulary: exact
+words directly, others by Dice similarity over trigrams (probing only their
+rarest trigrams) or a phonetic-key hit. A train scores the F-measure of how
+much of its name the caller said and how much of what the caller said its
+name explains, IDF-weighted; a full name said word for word scores 1.
+Generic words such as "express" or "mail" carry little weight and cannot on
+their own pull in candidates, and filler ("what is the schedule of ...") is
+skipped.
+
+The index is rebuilt in a worker thread and swapped in whole; a background
+task re-reads the table every TRAIN_INDEX_REFRESH_INTERVAL seconds and only
+rebuilds when the names changed.
+"""
+import asyncio
+import logging
+import math
+import re
+from collections import defaultdict
+from typing import NamedTuple
+
+from app.core.config import settings
+from app.db import async_db, train_schedule_db
+
+logger = logging.getLogger(__name__)
+
+# A caller word must be at least this similar to a name word to count
+TOKEN_MIN_SIMILARITY = 0.5
+PHONETIC_SIMILARITY = 0.9
+# Words in more than this share of names (e.g. "express") never start a candidate
+COMMON_WORD_SHARE = 0.05
+# Resolve without asking when the best score is this high and this far ahead
+ACCEPT_SCORE = 0.45
+ACCEPT_MARGIN = 0.15
+CANDIDATE_SCORE = 0.3
+
+_WORD_RE = re.compile(r"[a-z]+")
+# Common words in spoken schedule requests, never looked up fuzzily
+FILLER_WORDS = frozenset("""
+    a an the of for to in on at is are was what when where which does do did i me my we want need
+    know tell about please train trains number schedule timing timings time times leave leaves leaving
+    arrive arrives arrival departure depart departs reach reaches running status check can you give
+""".split())
+_FOLD_RE = re.compile(r"ph|gh|kh|bh|dh|th|jh|sh|ch|ck|[qxzvc]")
+_FOLDS = {"ph": "f", "gh": "g", "kh": "k", "bh": "b", "dh": "d", "th": "t", "jh": "j",
+          "sh": "s", "ch": "c", "ck": "k", "q": "k", "x": "ks", "z": "j", "v": "w", "c": "k"}
+_SKIP_RE = re.compile(r"(?<=.)[aeiouyh]")
+_REPEAT_RE = re.compile(r"(.)\1+")
+
+
+def phonetic_key(word: str) -> str:
+    folded = _FOLD_RE.sub(lambda m: _FOLDS[m.group()], word)
+    return _REPEAT_RE.sub(r"\1", _SKIP_RE.sub("", folded))
+
+
+def trigrams(word: str) -> frozenset:
+    padded = f" {word} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+class TrainMatch(NamedTuple):
+    train_number: str
+    train_name: str
+    score: float
+
+
+# ---------------------------------------------------------
+# 1️⃣ Immutable index (rebuilt and swapped in whole)
+# ---------------------------------------------------------
+class _Index:
+    def __init__(self, rows):
+        self.trains = [(number, name or "") for number, name in rows]
+        self.vocab = {}                       # word -> vocab id
+        self.words, self.grams = [], []
+        self.word_trains = []                 # vocab id -> train ids
+        self.by_gram = defaultdict(list)      # trigram -> vocab ids
+        self.by_key = defaultdict(list)       # phonetic key -> vocab ids
+        self.train_words = []                 # train id -> vocab ids
+        self.by_name = {}                     # "karnataka express" -> train id
+
+        for train_id, (_, name) in enumerate(self.trains):
+            words = _WORD_RE.findall(name.lower())
+            self.by_name.setdefault(" ".join(words), train_id)
+            ids = []
+            for word in dict.fromkeys(words):
+                vocab_id = self.vocab.get(word)
+                if vocab_id is None:
+                    vocab_id = self.vocab[word] = len(self.words)
+                    self.words.append(word)
+                    self.grams.append(trigrams(word))
+                    self.word_trains.append([])
+                    for gram in self.grams[vocab_id]:
+                        self.by_gram[gram].append(vocab_id)
+                    key = phonetic_key(word)
+                    if len(key) >= 2:
+                        self.by_key[key].append(vocab_id)
+                self.word_trains[vocab_id].append(train_id)
+                ids.append(vocab_id)
+            self.train_words.append(ids)
+
+        total = max(len(self.trains), 1)
+        self.idf = [math.log(1 + total / len(trains)) for trains in self.word_trains]
+        self.train_weight = [sum(self.idf[v] for v in ids) or 1.0 for ids in self.train_words]
+        self.common_df = max(3, int(COMMON_WORD_SHARE * total))
+        self.longest_name = max((len(name.split()) for name in self.by_name), default=0)
+
+    def _similar_words(self, word: str):
+        """{vocab id: similarity} for name words that a (non-exact) caller word may stand for."""
+        grams = trigrams(word)
+        # Dice >= t needs at least this many shared trigrams with any candidate,
+        # so one of the rarest len - shared + 1 trigrams must be shared: probe only those
+        min_shared = math.ceil(TOKEN_MIN_SIMILARITY * len(grams) / (2 - TOKEN_MIN_SIMILARITY))
+        probes = sorted(grams, key=lambda gram: len(self.by_gram.get(gram, ())))
+        candidates = set()
+        for gram in probes[:len(grams) - min_shared + 1]:
+            candidates.update(self.by_gram.get(gram, ()))
+
+        similar = {}
+        for vocab_id in candidates:
+            other = self.grams[vocab_id]
+            similarity = 2 * len(grams & other) / (len(grams) + len(other))
+            if similarity >= TOKEN_MIN_SIMILARITY:
+                similar[vocab_id] = similarity
+        key = phonetic_key(word)
+        if len(key) >= 2:
+            for vocab_id in self.by_key.get(key, ()):
+                similar[vocab_id] = max(similar.get(vocab_id, 0.0), PHONETIC_SIMILARITY)
+        return similar
+
+    def _match_words(self, words):
+        """Caller words -> [{vocab id: similarity}, ...], one dict per word that matched anything."""
+        matches = []
+        for word in dict.fromkeys(words):
+            if len(word) < 2 or word in FILLER_WORDS:
+                continue
+            vocab_id = self.vocab.get(word)
+            similar = {vocab_id: 1.0} if vocab_id is not None else self._similar_words(word)
+            if similar:
+                matches.append(similar)
+        return matches
+
+    def _exact_names(self, words):
+        """Train ids whose full name appears word for word in the query (longest phrases win)."""
+        found, covered = set(), set()
+        for size in range(min(self.longest_name, len(words)), 0, -1):
+            for i in range(len(words) - size + 1):
+                if covered.issuperset(range(i, i + size)):
+                    continue  # inside a longer name already found ("Rajdhani" in "Mumbai Rajdhani")
+                train_id = self.by_name.get(" ".join(words[i:i + size]))
+                if train_id is not None:
+                    found.add(train_id)
+                    covered.update(range(i, i + size))
+        return found
+
+    def search(self, text: str, limit: int):
+        words = _WORD_RE.findall(text.lower())
+        matches = self._match_words(words)
+
+        # Per train: IDF weight of its name words the caller said (recall) and
+        # of the caller's words its name explains (precision)
+        recall, precision = defaultdict(float), defaultdict(float)
+        query_weight = 0.0
+        # Distinctive words first: only they may introduce a train
+        matches.sort(key=lambda similar: min(len(self.word_trains[v]) for v in similar))
+        for similar in matches:
+            query_weight += max(self.idf[v] * s for v, s in similar.items())
+            best = {}
+            for vocab_id, similarity in similar.items():
+                weight = self.idf[vocab_id] * similarity
+                common = len(self.word_trains[vocab_id]) > self.common_df
+                for train_id in self.word_trains[vocab_id]:
+                    if common and train_id not in recall:
+                        continue
+                    recall[train_id] += weight
+                    best[train_id] = max(best.get(train_id, 0.0), weight)
+            for train_id, weight in best.items():
+                precision[train_id] += weight
+
+        exact = self._exact_names(words)
+        ranked = []
+        for train_id in recall.keys() | exact:
+            if train_id in exact:
+                score = 1.0
+            else:
+                r = min(recall[train_id] / self.train_weight[train_id], 1.0)
+                p = precision[train_id] / query_weight
+                score = 2 * p * r / (p + r) if p + r else 0.0
+            ranked.append((score, len(self.train_words[train_id]), train_id))
+        # Equal scores (e.g. two exact names): the longer, more specific name first
+        ranked.sort(reverse=True)
+        return [TrainMatch(*self.trains[train_id], round(score, 3)) for score, _, train_id in ranked[:limit]]
+
+
+# ---------------------------------------------------------
+# 2️⃣ App-wide index with background refresh
+# ---------------------------------------------------------
+class TrainNameIndex:
+    def __init__(self, refresh_interval: float = None):
+        self.refresh_interval = refresh_interval or settings.TRAIN_INDEX_REFRESH_INTERVAL
+        self._index = _Index([])
+        self._fingerprint = None
+        self._task = None
+        self._stopping = None
+        self.stats = {"builds": 0, "searches": 0}
+
+    def build(self, rows):
+        """Replace the index with one built from (train_number, train_name) rows."""
+        self._index = _Index(rows)
+        self.stats["builds"] += 1
+
+    async def refresh(self) -> bool:
+        """Re-read train names; rebuild (off the event loop) only if they changed."""
+        rows = await async_db.run_read(train_schedule_db.list_train_names, table="train_schedule")
+        fingerprint = hash(tuple(rows))
+        if fingerprint == self._fingerprint:
+            return False
+        index = await asyncio.to_thread(_Index, rows)
+        self._index, self._fingerprint = index, fingerprint
+        self.stats["builds"] += 1
+        return True
+
+    def search(self, text: str, limit: int = 3):
+        """Best-matching trains for a spoken name, highest score first."""
+        self.stats["searches"] += 1
+        return self._index.search(text or "", limit)
+
+    def resolve(self, text: str, limit: int = 3):
+        """(train, candidates): a single confident match, or the plausible ones to offer the caller."""
+        matches = [m for m in self.search(text, limit) if m.score >= CANDIDATE_SCORE]
+        if matches and matches[0].score >= ACCEPT_SCORE and (
+            len(matches) == 1 or matches[0].score - matches[1].score >= ACCEPT_MARGIN
+        ):
+            return matches[0], matches
+        return None, matches
+
+    def start(self):
+        """Start the periodic refresh on the running event loop (app startup)."""
+        if self._task is None:
+            self._stopping = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._stopping.set()
+            await self._task
+            self._task = None
+
+    async def _run(self):
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=self.refresh_interval)
+            except asyncio.TimeoutError:
+                pass
+            else:
+                break
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception("⚠️ Train-name index refresh failed")
+
+    def summary(self):
+        return {**self.stats, "trains": len(self._index.trains), "words": len(self._index.words)}
+
+
+train_name_index = TrainNameIndex()
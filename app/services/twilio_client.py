@@ -0,0 +1,21 @@
+"""
+Shared Twilio REST client, created on first use.
+
+Webhooks only need twilio.twiml; the REST client (and the `requests` stack
+twilio.rest imports) is only used for outbound calls and SMS, so it is not
+imported or built until one of those actually happens. This keeps worker
+start-up and test imports fast and lets the app boot without credentials.
+"""
+from functools import lru_cache
+
+from app.core.config import settings
+
+
+@lru_cache(maxsize=1)
+def get_twilio_client():
+    from twilio.http.http_client import TwilioHttpClient
+    from twilio.rest import Client
+
+    # Without a timeout a hung request blocks its thread indefinitely
+    http_client = TwilioHttpClient(timeout=settings.TWILIO_HTTP_TIMEOUT)
+    return Client(settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN, http_client=http_client)
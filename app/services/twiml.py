@@ -0,0 +1,160 @@
+"""
+Precompiled TwiML rendering.
+
+Twilio's `VoiceResponse` builds an ElementTree and serializes it on every
+call. Most of our responses have a fixed shape with a few spoken values
+dropped in, so we build each shape once, keep the serialized XML, and only
+splice in (escaped) values per request. Output is byte-for-byte what
+`str(VoiceResponse)` would produce for the same values.
+"""
+import inspect
+import re
+
+from fastapi.responses import Response
+
+XML_MEDIA_TYPE = "application/xml"
+
+# Private-use code points: never spoken, and left untouched by XML escaping
+_MARKER = "\ue000{}\ue001"
+_MARKER_RE = re.compile("\ue000(\\w+)\ue001")
+
+# Every template/prompt created in the app, for startup verification and benchmarks
+registry = []
+
+
+# ---------------------------------------------------------
+# 1️⃣ Escaping (same rules as xml.etree.ElementTree)
+# ---------------------------------------------------------
+def escape_text(value: str) -> str:
+    if "&" in value:
+        value = value.replace("&", "&amp;")
+    if "<" in value:
+        value = value.replace("<", "&lt;")
+    if ">" in value:
+        value = value.replace(">", "&gt;")
+    return value
+
+
+def escape_attribute(value: str) -> str:
+    value = escape_text(value)
+    if '"' in value:
+        value = value.replace('"', "&quot;")
+    if "\r" in value:
+        value = value.replace("\r", "&#13;")
+    if "\n" in value:
+        value = value.replace("\n", "&#10;")
+    if "\t" in value:
+        value = value.replace("\t", "&#09;")
+    return value
+
+
+# ---------------------------------------------------------
+# 2️⃣ Static prompts: rendered to bytes once
+# ---------------------------------------------------------
+class StaticTwiML:
+    """A response with no variable parts, serialized once at import time."""
+
+    def __init__(self, build, name: str = None):
+        self.build = build
+        self.name = name or build.__name__
+        self.body = str(build()).encode("utf-8")
+        registry.append(self)
+
+    def render(self) -> bytes:
+        return self.body
+
+    def response(self) -> Response:
+        return Response(content=self.body, media_type=XML_MEDIA_TYPE)
+
+
+# ---------------------------------------------------------
+# 3️⃣ Dynamic responses: precompiled templates
+# ---------------------------------------------------------
+class TwiMLTemplate:
+    """
+    A response shape with named slots.
+
+    `build` is a function whose keyword parameters are the slots and which
+    returns a `VoiceResponse`. It is called once with markers in place of the
+    values; the serialized XML is split around the markers and each slot is
+    tagged as element text or attribute value so it gets the right escaping.
+    Slot values are passed through `str()`, as the f-strings in the builders do.
+    A slot that fills an element's whole text must not be rendered empty
+    (VoiceResponse would emit a self-closing tag instead).
+    """
+
+    def __init__(self, build, name: str = None):
+        self.build = build
+        self.name = name or build.__name__
+        self.fields = list(inspect.signature(build).parameters)
+        xml = str(build(**{name: _MARKER.format(name) for name in self.fields}))
+
+        pieces = _MARKER_RE.split(xml)
+        self._literals = pieces[0::2]
+        self._slots = []
+        inside_tag = False
+        for literal, name in zip(self._literals, pieces[1::2]):
+            # Track whether the slot sits between "<" and ">" (an attribute)
+            last_open, last_close = literal.rfind("<"), literal.rfind(">")
+            if last_open != last_close:
+                inside_tag = last_open > last_close
+            self._slots.append((name, escape_attribute if inside_tag else escape_text))
+
+        missing = set(self.fields) - {name for name, _ in self._slots}
+        if missing:
+            raise ValueError(f"TwiML template {self.name} never emits slot(s): {sorted(missing)}")
+        registry.append(self)
+
+    def render(self, **values) -> bytes:
+        literals = self._literals
+        out = [literals[0]]
+        for index, (name, escape) in enumerate(self._slots, start=1):
+            out.append(escape(str(values[name])))
+            out.append(literals[index])
+        return "".join(out).encode("utf-8")
+
+    def response(self, **values) -> Response:
+        return Response(content=self.render(**values), media_type=XML_MEDIA_TYPE)
+
+    def verify(self, **values) -> bool:
+        """True if render() matches str(VoiceResponse) for these values."""
+        return self.render(**values) == str(self.build(**values)).encode("utf-8")
+
+
+# ---------------------------------------------------------
+# 4️⃣ Fragments: responses whose number of verbs varies
+# ---------------------------------------------------------
+_RESPONSE_OPEN = '<?xml version="1.0" encoding="UTF-8"?><Response>'
+_RESPONSE_CLOSE = "</Response>"
+
+
+class TwiMLFragment(TwiMLTemplate):
+    """
+    A template for a run of verbs inside <Response> (e.g. one <Say> per
+    complaint). Render the pieces and wrap them with `join_fragments()`;
+    ElementTree serializes siblings back to back, so the result is identical
+    to building the whole response with VoiceResponse.
+    """
+
+    def __init__(self, build, name: str = None):
+        super().__init__(build, name)
+        first, last = self._literals[0], self._literals[-1]
+        if not first.startswith(_RESPONSE_OPEN) or not last.endswith(_RESPONSE_CLOSE):
+            raise ValueError(f"TwiML fragment {self.name} must contain at least one verb")
+        self._literals[0] = first[len(_RESPONSE_OPEN):]
+        self._literals[-1] = self._literals[-1][:-len(_RESPONSE_CLOSE)]
+
+    def verify(self, **values) -> bool:
+        return join_fragments(self.render(**values)) == str(self.build(**values)).encode("utf-8")
+
+
+_RESPONSE_OPEN_BYTES = _RESPONSE_OPEN.encode("utf-8")
+_RESPONSE_CLOSE_BYTES = _RESPONSE_CLOSE.encode("utf-8")
+
+
+def join_fragments(*fragments: bytes) -> bytes:
+    return _RESPONSE_OPEN_BYTES + b"".join(fragments) + _RESPONSE_CLOSE_BYTES
+
+
+def fragments_response(*fragments: bytes) -> Response:
+    return Response(content=join_fragments(*fragments), media_type=XML_MEDIA_TYPE)
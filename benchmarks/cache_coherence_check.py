@@ -0,0 +1,129 @@
+"""
+Cross-worker cache coherence check.
+
+Starts N worker processes against a throwaway database. Each process imports
+the app and runs the change feed on its own event loop, exactly like a
+gunicorn worker. Every worker caches the same PNR row. Then the check
+repeats two steps:
+  1. an outside writer (a plain sqlite3 connection, like an admin script or
+     the bulk loader) changes the booking status;
+  2. the check asks every worker for the row until all of them return the
+     new status.
+Reports how long the change took to reach every worker. Exits 1 if any
+worker is still serving the old row after --deadline seconds.
+
+Run from the repo root:
+    python -m benchmarks.cache_coherence_check --workers 4 --rounds 20
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import multiprocessing
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+PNR = "1234567890"
+STATUSES = ("Confirmed", "RAC 12", "Waiting List 4", "Cancelled")
+
+
+def worker_main(pipe, poll_interval):
+    os.environ["CACHE_SYNC_INTERVAL"] = str(poll_interval)
+
+    async def serve():
+        from app.db import async_db
+        from app.services.change_feed import change_feed
+
+        await change_feed.poll()
+        await async_db.get_pnr_details(PNR)  # cached for CACHE_TTL_PNR (minutes)
+        change_feed.start()
+        pipe.send("ready")
+        loop = asyncio.get_running_loop()
+        while True:
+            command = await loop.run_in_executor(None, pipe.recv)
+            if command == "stop":
+                break
+            row = await async_db.get_pnr_details(PNR)
+            pipe.send(row["status"])
+        await change_feed.stop()
+        pipe.send(change_feed.summary())
+
+    asyncio.run(serve())
+
+
+def percentile(sorted_values, pct):
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def main(args):
+    from app.db.database import initialize_all_tables, close_pool, DB_PATH
+
+    with contextlib.redirect_stdout(io.StringIO()):  # table bootstrap chatter
+        initialize_all_tables()
+    close_pool()
+
+    context = multiprocessing.get_context("spawn")
+    pipes, processes = [], []
+    for _ in range(args.workers):
+        parent, child = context.Pipe()
+        process = context.Process(target=worker_main, args=(child, args.poll_interval), daemon=True)
+        process.start()
+        pipes.append(parent)
+        processes.append(process)
+    for pipe in pipes:
+        assert pipe.recv() == "ready"
+    print(f"{args.workers} workers up, each with PNR {PNR} cached; change feed every {args.poll_interval}s\n")
+
+    writer = sqlite3.connect(DB_PATH)
+    latencies, stale = [], 0
+    for round_number in range(args.rounds):
+        status = STATUSES[round_number % len(STATUSES)]
+        writer.execute("UPDATE pnr_details SET status = ? WHERE pnr_number = ?", (status, PNR))
+        writer.commit()
+        written = time.perf_counter()
+        pending = set(range(args.workers))
+        while pending and time.perf_counter() - written < args.deadline:
+            for index in list(pending):
+                pipes[index].send("read")
+                if pipes[index].recv() == status:
+                    pending.discard(index)
+            time.sleep(0.005)
+        if pending:
+            stale += 1
+            print(f"   ❌ round {round_number}: {len(pending)} worker(s) still stale after {args.deadline}s")
+        else:
+            latencies.append(time.perf_counter() - written)
+
+    for pipe in pipes:
+        pipe.send("stop")
+    summaries = [pipe.recv() for pipe in pipes]
+    for process in processes:
+        process.join(timeout=5)
+    writer.close()
+
+    if latencies:
+        latencies.sort()
+        print(f"Write -> every worker coherent over {len(latencies)} round(s): "
+              f"p50 {percentile(latencies, 50) * 1e3:.0f} ms, max {latencies[-1] * 1e3:.0f} ms")
+    print(f"Worker change-feed stats: {summaries[0]}")
+    if stale:
+        print(f"\n❌ {stale} round(s) left stale rows behind")
+        sys.exit(1)
+    print("\n✅ Every worker dropped its cached row after each outside write")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--poll-interval", type=float, default=0.25)
+    parser.add_argument("--deadline", type=float, default=5.0, help="Seconds before a stale worker fails the check")
+    args = parser.parse_args()
+
+    # Settings are read at import time, so configure before importing the app
+    os.environ["DB_PATH"] = os.path.join(tempfile.mkdtemp(prefix="ivr-bench-"), "railway_ivr.db")
+    main(args)
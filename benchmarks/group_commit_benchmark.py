@@ -0,0 +1,90 @@
+"""
+Insert throughput: one commit per complaint vs. the group-commit writer.
+
+Simulates a burst of callers registering complaints at once (e.g. after a
+major delay) against a throwaway database, first through the old path (a
+pooled connection per insert, each followed by its own commit) and then
+through app.db.group_commit. Reports inserts/sec, per-insert latency and
+the group sizes the writer formed.
+
+Run from the repo root:
+    python -m benchmarks.group_commit_benchmark --inserts 5000 --concurrency 200
+    python -m benchmarks.group_commit_benchmark --synchronous FULL   # fsync on every commit
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+
+def percentile(sorted_values, pct):
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+async def burst(insert, inserts, concurrency):
+    """`concurrency` callers share `inserts` complaint registrations; returns (elapsed, latencies)."""
+    latencies = []
+    remaining = [inserts]
+
+    async def caller(n):
+        while remaining[0] > 0:
+            remaining[0] -= 1
+            start = time.perf_counter()
+            await insert(f"Caller {n}", f"{1000000000 + n}", "9876543210", "General", "Coach was not clean")
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(caller(n) for n in range(concurrency)))
+    return time.perf_counter() - start, sorted(latencies)
+
+
+def report(name, inserts, elapsed, latencies):
+    print(f"{name:<22} {inserts / elapsed:>10,.0f} {percentile(latencies, 50) * 1e3:>9.2f} "
+          f"{percentile(latencies, 99) * 1e3:>9.2f} {elapsed:>8.2f}")
+
+
+async def main(args):
+    from app.db import async_db, complaints_db
+    from app.db.database import initialize_all_tables, close_pool
+    from app.db.group_commit import writer, close_writer
+
+    with contextlib.redirect_stdout(io.StringIO()):  # table bootstrap chatter
+        initialize_all_tables()
+
+    async def per_insert_commit(*fields):
+        return await async_db.run_db(complaints_db.register_complaint, *fields)
+
+    async def group_commit(*fields):
+        return await async_db.run_write(complaints_db.register_complaint, *fields)
+
+    print(f"\n{args.inserts} inserts, {args.concurrency} concurrent callers, synchronous={args.synchronous}\n")
+    print(f"{'path':<22} {'inserts/s':>10} {'p50 ms':>9} {'p99 ms':>9} {'total s':>8}")
+    results = {}
+    for name, insert in (("commit per insert", per_insert_commit), ("group commit", group_commit)):
+        await burst(insert, min(200, args.inserts), args.concurrency)  # warm-up
+        elapsed, latencies = await burst(insert, args.inserts, args.concurrency)
+        report(name, args.inserts, elapsed, latencies)
+        results[name] = args.inserts / elapsed
+
+    close_writer()
+    print(f"\nWriter: {writer.stats()}")
+    print(f"Speed-up: {results['group commit'] / results['commit per insert']:.1f}x")
+    async_db.shutdown_executor()
+    close_pool()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--inserts", type=int, default=3000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--synchronous", default="NORMAL", choices=["OFF", "NORMAL", "FULL"])
+    args = parser.parse_args()
+
+    # Settings are read at import time, so configure before importing the app
+    os.environ["DB_PATH"] = os.path.join(tempfile.mkdtemp(prefix="ivr-bench-"), "railway_ivr.db")
+    os.environ["DB_SYNCHRONOUS"] = args.synchronous
+    asyncio.run(main(args))
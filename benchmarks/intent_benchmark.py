@@ -0,0 +1,143 @@
+"""
+Accuracy + throughput benchmark for the IVR intent classifier.
+
+Scores the classifier on a labeled set of caller utterances (label None means
+"should not be routed without asking"), compares it with the old fixed-order
+keyword chain, and measures classifications per second.
+
+Run from the repo root:  python -m benchmarks.intent_benchmark [--iterations N]
+"""
+import argparse
+import sys
+import time
+
+from app.services.intent_classifier import (
+    classify,
+    PNR_STATUS, COMPLAINTS, EMERGENCY, TRAIN_SCHEDULE, SEAT_AVAILABILITY, REFUNDS,
+)
+
+LABELED_UTTERANCES = [
+    # PNR status
+    ("Check PNR status", PNR_STATUS),
+    ("I want to know my P N R status", PNR_STATUS),
+    ("what is the status of my p.n.r.", PNR_STATUS),
+    ("pnr number enquiry", PNR_STATUS),
+    ("is my ticket confirmed", PNR_STATUS),
+    ("booking status please", PNR_STATUS),
+    ("ticket status", PNR_STATUS),
+    ("am I still on the waiting list", PNR_STATUS),
+    ("my ticket is R A C what is the status", PNR_STATUS),
+    ("help me check my pnr", PNR_STATUS),
+    # Complaints
+    ("register a complaint", COMPLAINTS),
+    ("I want to complain about the coach", COMPLAINTS),
+    ("the toilet was dirty", COMPLAINTS),
+    ("the staff was rude to me", COMPLAINTS),
+    ("there is a problem with the food", COMPLAINTS),
+    ("I have an issue with my berth charging point", COMPLAINTS),
+    ("what is my complaint status", COMPLAINTS),
+    ("I want to give feedback", COMPLAINTS),
+    ("complaints department", COMPLAINTS),
+    ("coach was not clean", COMPLAINTS),
+    # Emergency
+    ("emergency help", EMERGENCY),
+    ("there has been an accident", EMERGENCY),
+    ("we need a doctor in coach S4", EMERGENCY),
+    ("fire in the pantry car", EMERGENCY),
+    ("my bag was stolen", EMERGENCY),
+    ("call the police", EMERGENCY),
+    ("a passenger is injured", EMERGENCY),
+    ("medical emergency on train 12627", EMERGENCY),
+    ("there is smoke in the coach", EMERGENCY),
+    ("I need an ambulance at the station", EMERGENCY),
+    # Train schedule
+    ("train schedule", TRAIN_SCHEDULE),
+    ("what is the schedule of Karnataka Express", TRAIN_SCHEDULE),
+    ("train timings", TRAIN_SCHEDULE),
+    ("what time does the train leave", TRAIN_SCHEDULE),
+    ("arrival time of 12627", TRAIN_SCHEDULE),
+    ("departure time of Rajdhani", TRAIN_SCHEDULE),
+    ("when does the Chennai Mail reach", TRAIN_SCHEDULE),
+    ("time table for Shatabdi", TRAIN_SCHEDULE),
+    ("running status of my train", TRAIN_SCHEDULE),
+    ("schedule", TRAIN_SCHEDULE),
+    # Seat availability
+    ("seat availability", SEAT_AVAILABILITY),
+    ("train seat availability", SEAT_AVAILABILITY),
+    ("are seats available on 12627", SEAT_AVAILABILITY),
+    ("check available seats in sleeper", SEAT_AVAILABILITY),
+    ("is there a berth available", SEAT_AVAILABILITY),
+    ("I want to book a ticket", SEAT_AVAILABILITY),
+    ("availability in 3A", SEAT_AVAILABILITY),
+    ("any seats for tomorrow", SEAT_AVAILABILITY),
+    ("seat", SEAT_AVAILABILITY),
+    ("how many seats are left on the train", SEAT_AVAILABILITY),
+    # Refunds
+    ("refund status", REFUNDS),
+    ("check my refund status please", REFUNDS),
+    ("I cancelled my ticket where is my money", REFUNDS),
+    ("cancellation refund", REFUNDS),
+    ("I want my money back", REFUNDS),
+    ("refund", REFUNDS),
+    ("cancelled ticket refund not received", REFUNDS),
+    ("status of my refund", REFUNDS),
+    ("cancel my ticket", REFUNDS),
+    ("refunds department", REFUNDS),
+    ("money", REFUNDS),
+    # Should ask the caller rather than guess
+    ("", None),
+    ("hello", None),
+    ("I don't know", None),
+    ("what time", None),
+    ("booking", None),
+]
+
+
+def legacy_classify(text: str):
+    """The fixed-order `"x" in text` chain this classifier replaced."""
+    text = text.lower()
+    if "pnr" in text or "status" in text:
+        return PNR_STATUS
+    elif "complaint" in text or "issue" in text or "problem" in text:
+        return COMPLAINTS
+    elif "emergency" in text or "help" in text or "accident" in text:
+        return EMERGENCY
+    elif "schedule" in text or "time" in text or "train" in text:
+        return TRAIN_SCHEDULE
+    elif "seat" in text or "availability" in text or "booking" in text:
+        return SEAT_AVAILABILITY
+    elif "refund" in text or "cancel" in text or "money" in text:
+        return REFUNDS
+    return None
+
+
+def evaluate(name, fn):
+    misses = [(text, label, fn(text)) for text, label in LABELED_UTTERANCES if fn(text) != label]
+    correct = len(LABELED_UTTERANCES) - len(misses)
+    print(f"{name}: {correct}/{len(LABELED_UTTERANCES)} correct ({100 * correct / len(LABELED_UTTERANCES):.1f}%)")
+    return misses
+
+
+def throughput(fn, iterations):
+    texts = [text for text, _ in LABELED_UTTERANCES]
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for text in texts:
+            fn(text)
+    elapsed = time.perf_counter() - start
+    return iterations * len(texts) / elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=500)
+    args = parser.parse_args()
+
+    evaluate("legacy keyword chain", legacy_classify)
+    misses = evaluate("intent classifier  ", lambda text: classify(text).department)
+    for text, label, got in misses:
+        print(f"  ✗ {text!r}: expected {label}, got {got} ({classify(text).scores})")
+
+    rate = throughput(classify, args.iterations)
+    print(f"\nThroughput: {rate:,.0f} utterances/sec ({1e6 / rate:.2f} µs each)")
+    sys.exit(1 if misses else 0)
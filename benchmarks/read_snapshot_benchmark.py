@@ -0,0 +1,125 @@
+"""
+Lookup latency: the database file (pooled connection) vs. the in-memory read
+snapshot (DB_READ_SNAPSHOT).
+
+Builds a throwaway database padded with --pad-rows PNRs and seat rows,
+copies the snapshot tables into memory once (reporting how long that takes),
+then runs the same random PNR / train schedule / seat availability lookups
+through `database.db_connection()` and through the snapshot, from one thread
+and from --threads threads at once. The *_db functions are called directly,
+so the lookup cache in front of them plays no part.
+
+Run from the repo root:  python -m benchmarks.read_snapshot_benchmark [--lookups 20000] [--pad-rows 200000]
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+
+
+def percentile(sorted_values, pct):
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def pad_database(db_path, rows):
+    conn = sqlite3.connect(db_path)
+    conn.executemany(
+        "INSERT INTO pnr_details (pnr_number, passenger_name, train_number, train_name, date_of_journey, status)"
+        " VALUES (?, 'Bench', '12627', 'Karnataka Express', '2025-11-05', 'Confirmed')",
+        ((f"{8000000000 + i}",) for i in range(rows)),
+    )
+    conn.executemany(
+        "INSERT INTO seat_availability (train_number, date_of_journey, class_type, total_seats, available_seats)"
+        " VALUES (?, '2025-11-05', 'Sleeper', 72, 40)",
+        ((f"B{i}",) for i in range(rows // 10)),
+    )
+    conn.commit()
+    conn.close()
+
+
+def make_lookups(count, rows):
+    from app.db import pnr_db, seat_db, train_schedule_db
+
+    rng = random.Random(7)
+    lookups = []
+    for _ in range(count):
+        kind = rng.random()
+        if kind < 0.6:
+            lookups.append((pnr_db.get_pnr_details, (f"{8000000000 + rng.randrange(rows)}",)))
+        elif kind < 0.8:
+            lookups.append((train_schedule_db.get_train_schedule, (rng.choice(["12627", "12841", "12951"]),)))
+        else:
+            lookups.append((seat_db.get_seat_availability, (f"B{rng.randrange(rows // 10)}", "2025-11-05", "Sleeper")))
+    return lookups
+
+
+def run(connect, lookups, threads):
+    """Per-lookup latencies (seconds) and wall time, with `lookups` split across `threads`."""
+    latencies = []
+    lock = threading.Lock()
+
+    def worker(part):
+        mine = []
+        for fn, args in part:
+            start = time.perf_counter()
+            with connect() as conn:
+                fn(conn, *args)
+            mine.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(mine)
+
+    parts = [lookups[i::threads] for i in range(threads)]
+    workers = [threading.Thread(target=worker, args=(part,)) for part in parts]
+    start = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    return sorted(latencies), time.perf_counter() - start
+
+
+def report(name, latencies, elapsed):
+    print(f"{name:<22} {len(latencies) / elapsed:>12,.0f} {percentile(latencies, 50) * 1e6:>9.1f} "
+          f"{percentile(latencies, 99) * 1e6:>9.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lookups", type=int, default=20000)
+    parser.add_argument("--pad-rows", type=int, default=200000, help="Filler PNRs (a tenth as many seat rows)")
+    parser.add_argument("--threads", type=int, default=8, help="Concurrent readers in the second run")
+    args = parser.parse_args()
+
+    os.environ["DB_PATH"] = os.path.join(tempfile.mkdtemp(prefix="ivr-snapshot-"), "railway_ivr.db")
+    from app.core.logging_config import setup_logging
+    from app.db import database
+
+    setup_logging(fmt="text", level="WARNING")
+    with contextlib.redirect_stdout(io.StringIO()):
+        database.initialize_all_tables(fast_start=False)
+    pad_database(database.DB_PATH, args.pad_rows)
+
+    snapshot = database.ReadSnapshot(database.DB_PATH)
+    start = time.perf_counter()
+    rows = snapshot.refresh()
+    print(f"\nSnapshot copy: {rows:,} rows in {(time.perf_counter() - start) * 1e3:.1f} ms")
+
+    @contextlib.contextmanager
+    def snapshot_connection():
+        yield snapshot.connection()
+
+    lookups = make_lookups(args.lookups, args.pad_rows)
+    print(f"\n{args.lookups:,} lookups (60% PNR, 20% schedule, 20% seats)\n")
+    print(f"{'source':<22} {'lookups/s':>12} {'p50 µs':>9} {'p99 µs':>9}")
+    for threads in (1, args.threads):
+        report(f"file, {threads} thread(s)", *run(database.db_connection, lookups, threads))
+        report(f"snapshot, {threads} thread(s)", *run(snapshot_connection, lookups, threads))
+
+    snapshot.close()
+    database.close_pool()
@@ -0,0 +1,210 @@
+"""
+Concurrency stress test for the in-memory seat inventory.
+
+Against a throwaway database:
+  1. threads   N threads hammer a handful of train/date/class keys with random
+               hold -> confirm / release / abandon cycles; afterwards every
+               key must satisfy  available + held + booked == starting seats
+               and the bookings the threads saw succeed must add up to what
+               the inventory booked.
+  2. sell-out  thousands of concurrent callers on the event loop race for the
+               last seats of one key; exactly that many may succeed.
+  3. flush     the write-behind must leave seat_availability.available_seats
+               equal to the in-memory count.
+  4. compare   the same hold workload as conditional row UPDATEs on SQLite
+               (the alternative the inventory replaces), for ops/sec.
+
+Exits 1 if any invariant is violated.
+
+Run from the repo root:
+    python -m benchmarks.seat_inventory_stress --threads 16 --ops 20000
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+# Synthetic inventory lines (train, date, class) -> seats, inserted by the benchmark
+INVENTORY = {
+    ("90001", "2026-01-15", "Sleeper"): 400,
+    ("90001", "2026-01-15", "3A"): 144,
+    ("90002", "2026-01-16", "2A"): 48,
+    ("90003", "2026-01-17", "1A"): 22,
+}
+KEYS = list(INVENTORY)
+SELL_OUT_KEY, SELL_OUT_SEATS = ("90004", "2026-01-18", "Chair Car"), 75
+
+
+failures = []
+
+
+def check(condition, message):
+    if not condition:
+        failures.append(message)
+        print(f"   ❌ {message}")
+
+
+def thread_stress(inventory, threads, ops_per_thread):
+    starting = {key: inventory.available(key) for key in KEYS}
+    booked = {key: 0 for key in KEYS}
+    booked_lock = threading.Lock()
+    abandoned = []
+
+    def caller(seed):
+        rng = random.Random(seed)
+        for _ in range(ops_per_thread):
+            key = rng.choice(KEYS)
+            seats = rng.randint(1, 4)
+            hold_id = inventory.try_hold(key, seats, ttl=0.05)
+            if hold_id is None:
+                continue
+            roll = rng.random()
+            if roll < 0.02:
+                if inventory.confirm(hold_id):
+                    with booked_lock:
+                        booked[key] += seats
+            elif roll < 0.99:
+                inventory.release(hold_id)
+            else:
+                abandoned.append(hold_id)  # left to expire
+
+    workers = [threading.Thread(target=caller, args=(n,)) for n in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+
+    time.sleep(0.06)
+    inventory.expire_holds()
+    ops = threads * ops_per_thread
+    print(f"   {ops:,} hold cycles on {threads} threads in {elapsed:.2f}s "
+          f"({ops / elapsed:,.0f} cycles/s), {len(abandoned)} holds left to expire")
+    for key in KEYS:
+        s = inventory.snapshot(key)
+        print(f"   {'/'.join(key):<28} start {starting[key]:>3}  booked {booked[key]:>3}  "
+              f"available {s['available']:>3}  held {s['held']}")
+        check(s["held"] == 0, f"{key}: {s['held']} seats still held after expiry")
+        check(s["available"] >= 0, f"{key}: negative availability")
+        check(s["available"] + s["held"] + s["unflushed"] == starting[key],
+              f"{key}: seats not conserved")
+        check(s["unflushed"] == booked[key], f"{key}: inventory booked {s['unflushed']}, callers saw {booked[key]}")
+    return starting, booked
+
+
+async def sell_out(inventory, callers):
+    key = SELL_OUT_KEY
+    seats_left = SELL_OUT_SEATS  # not loaded yet: the first callers race to load it, too
+    barrier = asyncio.Event()
+
+    async def caller():
+        await barrier.wait()
+        await asyncio.sleep(0)
+        hold_id = await inventory.hold(*key, 1)
+        return hold_id is not None and inventory.confirm(hold_id)
+
+    tasks = [asyncio.create_task(caller()) for _ in range(callers)]
+    await asyncio.sleep(0)
+    barrier.set()
+    won = sum(await asyncio.gather(*tasks))
+    print(f"   {callers} callers raced for {seats_left} seat(s): {won} booked, "
+          f"{inventory.available(key)} left")
+    check(won == seats_left, f"sell-out booked {won} of {seats_left} seats")
+    check(inventory.available(key) == 0, "sell-out left seats behind")
+
+
+def sqlite_hold_rate(db_path, ops):
+    """Holds as `UPDATE ... WHERE available_seats >= ?` + commit, one per operation."""
+    import sqlite3
+    from app.db.database import _configure_connection
+
+    conn = _configure_connection(sqlite3.connect(db_path))
+    rng = random.Random(1)
+    start = time.perf_counter()
+    for _ in range(ops):
+        seats = rng.randint(1, 4)
+        key = rng.choice(KEYS)
+        cursor = conn.execute("""
+            UPDATE seat_availability SET available_seats = available_seats - ?
+            WHERE train_number = ? AND date_of_journey = ? AND class_type = ? AND available_seats >= ?
+        """, (seats, *key, seats))
+        conn.commit()
+        if cursor.rowcount:  # give it back straight away, like a released hold
+            conn.execute("""
+                UPDATE seat_availability SET available_seats = available_seats + ?
+                WHERE train_number = ? AND date_of_journey = ? AND class_type = ?
+            """, (seats, *key))
+            conn.commit()
+    elapsed = time.perf_counter() - start
+    conn.close()
+    return ops / elapsed
+
+
+async def main(args):
+    from app.db import async_db, seat_db
+    from app.db.database import initialize_all_tables, close_pool, DB_PATH
+    from app.db.group_commit import close_writer
+    from app.services.seat_inventory import SeatInventory
+
+    with contextlib.redirect_stdout(io.StringIO()):  # table bootstrap chatter
+        initialize_all_tables()
+
+    def add_inventory(conn):
+        rows = [(*key, seats, seats) for key, seats in [*INVENTORY.items(), (SELL_OUT_KEY, SELL_OUT_SEATS)]]
+        conn.executemany("""
+            INSERT INTO seat_availability (train_number, date_of_journey, class_type, total_seats, available_seats)
+            VALUES (?, ?, ?, ?, ?)
+        """, rows)
+        conn.commit()
+
+    await async_db.run_db(add_inventory)
+    inventory = SeatInventory()
+    for key in KEYS:
+        await inventory.load(*key)
+
+    print("\n1️⃣ Threads: hold / confirm / release / abandon")
+    _, booked = await asyncio.to_thread(thread_stress, inventory, args.threads, args.ops // args.threads)
+
+    print("\n2️⃣ Event loop: sell-out race")
+    await sell_out(inventory, args.callers)
+
+    print("\n3️⃣ Write-behind")
+    written = await inventory.flush()
+    print(f"   {written} booked seat(s) written in {inventory.stats['flushes']} flush(es)")
+    for key in [*KEYS, SELL_OUT_KEY]:
+        row = await async_db.run_db(seat_db.get_seat_availability, *key)
+        check(row["available_seats"] == inventory.available(key),
+              f"{key}: table says {row['available_seats']}, inventory {inventory.available(key)}")
+    print(f"   inventory stats: {inventory.summary()}")
+
+    print("\n4️⃣ Same holds as SQLite row updates")
+    rate = sqlite_hold_rate(DB_PATH, min(args.ops, 5000))
+    print(f"   SQLite conditional UPDATE + commit: {rate:,.0f} hold/release pairs/s (single connection)")
+
+    close_writer()
+    async_db.shutdown_executor()
+    close_pool()
+
+    if failures:
+        print(f"\n❌ {len(failures)} invariant violation(s)")
+        sys.exit(1)
+    print("\n✅ No overbooking: all invariants held")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--ops", type=int, default=20000, help="Hold cycles across all threads")
+    parser.add_argument("--callers", type=int, default=2000, help="Concurrent callers in the sell-out race")
+    args = parser.parse_args()
+
+    # Settings are read at import time, so configure before importing the app
+    os.environ["DB_PATH"] = os.path.join(tempfile.mkdtemp(prefix="ivr-bench-"), "railway_ivr.db")
+    asyncio.run(main(args))
@@ -0,0 +1,92 @@
+"""
+Session store round-trip check: the SQLite backend must give back exactly
+what the memory backend does.
+
+Runs the same sequence of updates (nested nulls, lists, key removal, an
+expired session starting over) through MemorySessionStore and
+SqliteSessionStore on a throwaway database, comparing what `get` returns
+after every step. Then saves, updates and reads back a session through
+sessions_db directly on an in-memory connection, the case gunicorn.conf.py's
+multi-worker SESSION_BACKEND=sqlite default depends on. Exits 1 on the first
+difference.
+
+Run from the repo root:  python -m benchmarks.session_store_check
+"""
+import asyncio
+import contextlib
+import io
+import os
+import sys
+import tempfile
+
+# Caller-ID prefetch stores whole DB rows; NULL columns come back as None
+REFUND_ROW = {"pnr_number": "1234567890", "refund_amount": 1450.0, "remarks": None,
+              "history": [None, {"status": "Initiated", "note": None}]}
+
+STEPS = [
+    {"refund_info": REFUND_ROW, "pnr_number": "1234567890"},
+    {"train_number": "12627", "journey": {"date": "2025-11-05", "class_type": None}},
+    {"pnr_number": None},                            # None removes the key
+    {"refund_info": {**REFUND_ROW, "remarks": "UPI ID not valid"}},
+    {"unknown_key": None},
+    {"odd.key": "dots", "empty": {}, "flags": [True, False, 0, ""]},
+]
+
+
+def check_sessions_db_round_trip():
+    """save_session + get_session on a bare connection keep nested nulls and merge top-level keys."""
+    import sqlite3
+    from app.db import sessions_db
+
+    conn = sqlite3.connect(":memory:")
+    try:
+        sessions_db.create_sessions_table(conn)
+        sessions_db.save_session(conn, "CAcheck", {"refund_info": REFUND_ROW}, 0, 60)
+        sessions_db.save_session(conn, "CAcheck", {"train_number": "12627"}, 1, 60)
+        stored = sessions_db.get_session(conn, "CAcheck", 2)
+    finally:
+        conn.close()
+    if stored != {"refund_info": REFUND_ROW, "train_number": "12627"}:
+        print(f"❌ sessions_db round trip changed the session: {stored!r}")
+        return False
+    print("✅ sessions_db round trip keeps nested nulls")
+    return True
+
+
+async def run_check():
+    from app.services.session_store import MemorySessionStore, SqliteSessionStore
+
+    memory, sqlite = MemorySessionStore(), SqliteSessionStore()
+    call_sid = "CA" + "c" * 32
+    for number, values in enumerate(STEPS, 1):
+        await memory.update(call_sid, **values)
+        await sqlite.update(call_sid, **values)
+        expected, got = await memory.get(call_sid), await sqlite.get(call_sid)
+        if got != expected:
+            print(f"❌ step {number} {values!r}\n   memory: {expected!r}\n   sqlite: {got!r}")
+            return False
+        print(f"✅ step {number}: {len(got)} key(s) match")
+
+    # An expired session starts over instead of merging into the stale row
+    expired = SqliteSessionStore(ttl=-1)
+    await expired.update(call_sid, stale=True)
+    await sqlite.update(call_sid, fresh=True)
+    if await sqlite.get(call_sid) != {"fresh": True}:
+        print(f"❌ expired session was merged into: {await sqlite.get(call_sid)!r}")
+        return False
+    print("✅ expired session starts over")
+    return True
+
+
+if __name__ == "__main__":
+    os.environ["DB_PATH"] = os.path.join(tempfile.mkdtemp(prefix="ivr-sessions-"), "railway_ivr.db")
+    from app.db import database
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        database.initialize_all_tables(fast_start=False)
+    ok = asyncio.run(run_check()) and check_sessions_db_round_trip()
+
+    from app.db.async_db import shutdown_executor
+    shutdown_executor()
+    database.close_pool()
+    sys.exit(0 if ok else 1)
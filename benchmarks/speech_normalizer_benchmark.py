@@ -0,0 +1,249 @@
+"""
+Accuracy + throughput benchmark for the spoken-number / spoken-date normalizer.
+
+The corpus is a hand-written list of tricky transcripts plus generated ones:
+random PNRs, train numbers and journey dates rendered the ways callers (and
+Twilio's transcriber) actually say them: digit words, digits, a mix of both,
+"double"/"triple" runs, two-digit pairs ("twelve thirty four"), spoken years
+and month names. Each case is checked against the normalizer and against
+the old `isdigit()` filter / space-stripping it replaced, then throughput is
+measured over the whole corpus. A short list of "from X to Y on <date>"
+station-pair requests is checked as well.
+
+Run from the repo root:  python -m benchmarks.speech_normalizer_benchmark [--generated N] [--iterations N]
+"""
+import argparse
+import datetime
+import random
+import sys
+import time
+
+from app.services.speech_normalizer import parse_date, parse_route, spoken_digits
+
+TODAY = datetime.date(2025, 10, 20)
+
+# (transcript, expected digits)
+NUMBER_CASES = [
+    ("one two six two seven", "12627"),
+    ("12627", "12627"),
+    ("1 2 6 2 7", "12627"),
+    ("12,627", "12627"),
+    ("twelve six two seven", "12627"),
+    ("twelve six twenty seven", "12627"),
+    ("train number one two six two seven please", "12627"),
+    ("One, two, six, two, seven.", "12627"),
+    ("one 2 six 2 seven", "12627"),
+    ("one two eight four one", "12841"),
+    ("sixteen three eight two", "16382"),
+    ("one six three double eight", "16388"),
+    ("one two double zero nine", "12009"),
+    ("one two oh oh nine", "12009"),
+    ("one two triple five", "12555"),
+    ("one two three four five six seven eight nine zero", "1234567890"),
+    ("my PNR is 1234567890", "1234567890"),
+    ("my p n r number is one two three four five six seven eight nine zero", "1234567890"),
+    ("12 34 56 78 90", "1234567890"),
+    ("twelve thirty four fifty six seventy eight ninety", "1234567890"),
+    ("1234-567-890", "1234567890"),
+    ("double one two two triple three four four four", "1122333444"),
+    ("nine eight seven six five four three two one oh", "9876543210"),
+    ("four two double seven eight eight one zero zero five", "4277881005"),
+    ("forty two seventy seven eighty eight ten oh five", "4277881005"),
+    ("one hundred and five", "105"),
+    ("twelve hundred", "1200"),
+    ("two thousand twenty five", "2025"),
+    ("ninety nine", "99"),
+    ("zero", "0"),
+    ("", ""),
+    ("I don't know", ""),
+]
+
+# (transcript, expected ISO date) relative to TODAY
+DATE_CASES = [
+    ("2025-11-05", "2025-11-05"),
+    ("2025 11 05", "2025-11-05"),
+    ("20251105", "2025-11-05"),
+    ("twenty twenty five dash eleven dash zero five", "2025-11-05"),
+    ("two zero two five dash one one dash zero five", "2025-11-05"),
+    ("two thousand twenty five dash eleven dash five", "2025-11-05"),
+    ("2025 dash 11 dash 05", "2025-11-05"),
+    ("2025/11/5", "2025-11-05"),
+    ("05/11/2025", "2025-11-05"),
+    ("5-11-2025", "2025-11-05"),
+    ("5th November 2025", "2025-11-05"),
+    ("November 5th, 2025", "2025-11-05"),
+    ("fifth of November twenty twenty five", "2025-11-05"),
+    ("the fifth of november", "2025-11-05"),
+    ("November twenty first", "2025-11-21"),
+    ("twenty first of november", "2025-11-21"),
+    ("nov 30", "2025-11-30"),
+    ("third of january", "2026-01-03"),
+    ("first march twenty twenty six", "2026-03-01"),
+    ("tomorrow", "2025-10-21"),
+    ("day after tomorrow", "2025-10-22"),
+    ("today", "2025-10-20"),
+    ("on friday", "2025-10-24"),
+    ("next monday", "2025-10-27"),
+    ("on the third", "2025-11-03"),
+    ("the twenty first", "2025-10-21"),
+    ("2025-02-30", None),
+    ("hello", None),
+    ("", None),
+]
+
+# (transcript, expected (source, destination, ISO date)) relative to TODAY
+ROUTE_CASES = [
+    ("from New Delhi to Bangalore", ("New Delhi", "Bangalore", "2025-10-20")),
+    ("trains from new delhi to bangalore tomorrow", ("New Delhi", "Bangalore", "2025-10-21")),
+    ("between Trivandrum and Mumbai on the fifth of November", ("Trivandrum", "Mumbai", "2025-11-05")),
+    ("from Lucknow to Mumbai CST on 2025-11-05", ("Lucknow", "Mumbai Cst", "2025-11-05")),
+    ("from Hyderabad to Chennai friday", ("Hyderabad", "Chennai", "2025-10-24")),
+    ("from Bhopal to New Delhi on the third", ("Bhopal", "New Delhi", "2025-11-03")),
+    ("from Kolkata to Chennai on something", ("Kolkata", "Chennai", None)),
+    ("from Delhi", None),
+    ("one two six two seven", None),
+]
+
+_UNIT_WORDS = ("zero", "one", "two", "three", "four", "five", "six", "seven", "eight", "nine")
+_TEEN_WORDS = ("ten", "eleven", "twelve", "thirteen", "fourteen", "fifteen", "sixteen",
+               "seventeen", "eighteen", "nineteen")
+_TENS_WORDS = ("", "", "twenty", "thirty", "forty", "fifty", "sixty", "seventy", "eighty", "ninety")
+_ORDINAL_WORDS = ("", "first", "second", "third", "fourth", "fifth", "sixth", "seventh", "eighth",
+                  "ninth", "tenth", "eleventh", "twelfth", "thirteenth", "fourteenth", "fifteenth",
+                  "sixteenth", "seventeenth", "eighteenth", "nineteenth", "twentieth")
+_MONTH_NAMES = ("", "January", "February", "March", "April", "May", "June", "July", "August",
+                "September", "October", "November", "December")
+
+
+# ---------------------------------------------------------
+# 1️⃣ Generated corpus
+# ---------------------------------------------------------
+def say_pair(n: int) -> str:
+    if n < 10:
+        return f"oh {_UNIT_WORDS[n]}"
+    if n < 20:
+        return _TEEN_WORDS[n - 10]
+    return _TENS_WORDS[n // 10] + ("" if n % 10 == 0 else f" {_UNIT_WORDS[n % 10]}")
+
+
+def say_digits(number: str, rng) -> str:
+    style = rng.randrange(5)
+    if style == 0:
+        return " ".join(_UNIT_WORDS[int(d)] for d in number)
+    if style == 1:
+        return " ".join(number)
+    if style == 2:
+        return " ".join(rng.choice((_UNIT_WORDS[int(d)], d)) for d in number)
+    if style == 3:  # "double" / "triple" for runs
+        words, i = [], 0
+        while i < len(number):
+            run = 1
+            while i + run < len(number) and number[i + run] == number[i] and run < 3:
+                run += 1
+            word = _UNIT_WORDS[int(number[i])]
+            words.append(word if run == 1 else f"{('double', 'triple')[run - 2]} {word}")
+            i += run
+        return " ".join(words)
+    # Two-digit pairs, odd digit first. A round ten followed by a single digit
+    # ("forty" + "seven") genuinely sounds like 47, so those are said digit by digit.
+    words = []
+    head = len(number) % 2
+    if head:
+        words.append(_UNIT_WORDS[int(number[0])])
+    for i in range(head, len(number), 2):
+        words.append(say_pair(int(number[i:i + 2])))
+    text = " ".join(words)
+    return text if spoken_digits(text) == number else " ".join(_UNIT_WORDS[int(d)] for d in number)
+
+
+def say_date(date: datetime.date, rng) -> str:
+    year, month, day = date.year, date.month, date.day
+    style = rng.randrange(7)
+    if style == 0:
+        return date.isoformat()
+    if style == 1:
+        return f"{say_pair(year // 100)} {say_pair(year % 100)} dash {say_pair(month)} dash {say_pair(day)}"
+    if style == 2:
+        return " dash ".join(" ".join(_UNIT_WORDS[int(d)] for d in part) for part in date.isoformat().split("-"))
+    if style == 3:
+        return f"{day:02d}/{month:02d}/{year}"
+    if style == 4:
+        suffix = "th" if 10 <= day % 100 <= 20 else {1: "st", 2: "nd", 3: "rd"}.get(day % 10, "th")
+        return f"{day}{suffix} {_MONTH_NAMES[month]} {year}"
+    if style == 5:
+        ordinal = _ORDINAL_WORDS[day] if day <= 20 else (
+            _TENS_WORDS[day // 10] + ("" if day % 10 == 0 else f" {_ORDINAL_WORDS[day % 10]}")
+            if day != 30 else "thirtieth")
+        return f"the {ordinal} of {_MONTH_NAMES[month]} {say_pair(year // 100)} {say_pair(year % 100)}"
+    return date.strftime("%Y %m %d")
+
+
+def generated_cases(count: int, seed: int = 7):
+    rng = random.Random(seed)
+    numbers, dates = [], []
+    for _ in range(count):
+        pnr = "".join(rng.choice("0123456789") for _ in range(10))
+        numbers.append((say_digits(pnr, rng), pnr))
+        train = str(rng.randint(10000, 99999))
+        numbers.append((say_digits(train, rng), train))
+        date = TODAY + datetime.timedelta(days=rng.randrange(1, 700))
+        dates.append((say_date(date, rng), date.isoformat()))
+    return numbers, dates
+
+
+# ---------------------------------------------------------
+# 2️⃣ Old behaviour, for comparison
+# ---------------------------------------------------------
+def legacy_digits(text: str) -> str:
+    return "".join(ch for ch in text if ch.isdigit())
+
+
+def legacy_date(text: str) -> str:
+    return text.strip().replace(" ", "")
+
+
+def evaluate(name, fn, cases):
+    misses = [(text, expected, fn(text)) for text, expected in cases if fn(text) != expected]
+    correct = len(cases) - len(misses)
+    print(f"  {name:<12} {correct:>6}/{len(cases)} correct ({100 * correct / len(cases):.1f}%)")
+    return misses
+
+
+def throughput(fn, texts, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for text in texts:
+            fn(text)
+    return iterations * len(texts) / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--generated", type=int, default=5000, help="Generated PNR/train/date triples")
+    parser.add_argument("--iterations", type=int, default=3)
+    args = parser.parse_args()
+
+    generated_numbers, generated_dates = generated_cases(args.generated)
+    number_cases = NUMBER_CASES + generated_numbers
+    date_cases = DATE_CASES + generated_dates
+    parse = lambda text: parse_date(text, today=TODAY)  # noqa: E731
+
+    print(f"PNR / train numbers ({len(number_cases)} transcripts)")
+    evaluate("legacy", legacy_digits, number_cases)
+    misses = evaluate("normalizer", spoken_digits, number_cases)
+    print(f"Journey dates ({len(date_cases)} transcripts)")
+    evaluate("legacy", legacy_date, date_cases)
+    misses += evaluate("normalizer", parse, date_cases)
+    print(f"Station pairs ({len(ROUTE_CASES)} transcripts)")
+    route = lambda text: parse_route(text, today=TODAY)  # noqa: E731
+    misses += evaluate("normalizer", lambda text: route(text) and tuple(route(text)), ROUTE_CASES)
+    for text, expected, got in misses[:20]:
+        print(f"  ✗ {text!r}: expected {expected!r}, got {got!r}")
+
+    texts = [text for text, _ in number_cases]
+    rate = throughput(spoken_digits, texts, args.iterations)
+    print(f"\nspoken_digits: {rate:,.0f} transcripts/sec ({1e6 / rate:.2f} µs each)")
+    texts = [text for text, _ in date_cases]
+    rate = throughput(parse, texts, args.iterations)
+    print(f"parse_date:    {rate:,.0f} transcripts/sec ({1e6 / rate:.2f} µs each)")
+    sys.exit(1 if misses else 0)
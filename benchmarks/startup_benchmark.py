@@ -0,0 +1,113 @@
+"""
+Worker start-up benchmark: import time and time-to-ready for main:app.
+
+Each run is a fresh interpreter (like a new gunicorn worker) that imports
+`main` and then runs the app's startup handlers. Scenarios:
+  cold        empty database: full table bootstrap + seeding + migrations
+  fast start  existing, current database with DB_FAST_START on (the default)
+  full check  existing database with DB_FAST_START=0
+  old         full check + twilio.rest imported eagerly, as before fast start
+
+The existing database is padded with --pad-rows complaint/PNR rows so the
+bootstrap's COUNT(*) probes cost what they would on a production-sized file.
+
+Run from the repo root:  python -m benchmarks.startup_benchmark [--runs 7] [--pad-rows 200000]
+"""
+import argparse
+import json
+import os
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+
+# Runs in the child interpreter; prints {"import_ms", "startup_ms", "twilio_rest_loaded"}
+CHILD = r"""
+import asyncio, contextlib, io, json, os, sys, time
+t0 = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+    if os.environ.get("BENCH_EAGER_TWILIO"):
+        import twilio.rest  # what the route modules used to do at import time
+    import main
+    t1 = time.perf_counter()
+
+    async def boot():
+        async with main.app.router.lifespan_context(main.app):
+            ready = time.perf_counter()
+        return ready
+
+    t2 = asyncio.run(boot())
+print(json.dumps({
+    "import_ms": (t1 - t0) * 1e3,
+    "startup_ms": (t2 - t1) * 1e3,
+    "twilio_rest_loaded": "twilio.rest" in sys.modules,
+}))
+"""
+
+
+def run_child(db_path, fast_start, eager_twilio=False):
+    env = dict(os.environ, DB_PATH=db_path, DB_FAST_START="1" if fast_start else "0")
+    if eager_twilio:
+        env["BENCH_EAGER_TWILIO"] = "1"
+    out = subprocess.run(
+        [sys.executable, "-c", CHILD], env=env, capture_output=True, text=True, check=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def pad_database(db_path, rows):
+    conn = sqlite3.connect(db_path)
+    conn.executemany(
+        "INSERT INTO complaints (passenger_name, pnr_number, contact_number, category, description, complaint_date, status)"
+        " VALUES ('Bench', ?, '9876543210', 'General', 'Startup benchmark filler', '2025-11-01', 'Pending')",
+        ((f"{9000000000 + i}",) for i in range(rows)),
+    )
+    conn.executemany(
+        "INSERT INTO pnr_details (pnr_number, passenger_name, train_number, train_name, date_of_journey, status)"
+        " VALUES (?, 'Bench', '12627', 'Karnataka Express', '2025-11-05', 'Confirmed')",
+        ((f"{8000000000 + i}",) for i in range(rows)),
+    )
+    conn.commit()
+    conn.close()
+
+
+def summarize(name, samples):
+    imports = statistics.median(s["import_ms"] for s in samples)
+    startups = statistics.median(s["startup_ms"] for s in samples)
+    print(f"{name:<12} {imports:>10.1f} {startups:>11.1f} {imports + startups:>9.1f}   "
+          f"{'yes' if any(s['twilio_rest_loaded'] for s in samples) else 'no'}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=7, help="Fresh interpreters per scenario (median reported)")
+    parser.add_argument("--pad-rows", type=int, default=200000, help="Filler rows added to the existing database")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="ivr-startup-")
+    try:
+        db_path = os.path.join(workdir, "railway_ivr.db")
+
+        cold = []
+        for _ in range(args.runs):
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(db_path + suffix):
+                    os.remove(db_path + suffix)
+            cold.append(run_child(db_path, fast_start=True))
+
+        pad_database(db_path, args.pad_rows)
+        fast = [run_child(db_path, fast_start=True) for _ in range(args.runs)]
+        full = [run_child(db_path, fast_start=False) for _ in range(args.runs)]
+        old = [run_child(db_path, fast_start=False, eager_twilio=True) for _ in range(args.runs)]
+
+        print(f"\nMedian of {args.runs} fresh interpreters per scenario\n")
+        print(f"{'scenario':<12} {'import ms':>10} {'startup ms':>11} {'ready ms':>9}   twilio.rest imported")
+        summarize("cold", cold)
+        summarize("fast start", fast)
+        summarize("full check", full)
+        summarize("old", old)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
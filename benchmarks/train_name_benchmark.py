@@ -0,0 +1,126 @@
+"""
+Accuracy + latency benchmark for the fuzzy train-name index.
+
+Builds the index over the sample schedule plus a generated timetable of
+realistic-looking names (place names + "Express" / "Mail" / "Rajdhani" ...),
+then looks up spoken-style queries: exact names, names wrapped in filler
+("what is the schedule of ..."), transcription slips (a dropped, doubled or
+swapped letter) and spelling variants ("dh" -> "d", "v" -> "w", doubled
+consonants). Reports build time, how often the right train ranks first /
+is resolved without asking / is among the offered candidates, and per-query
+latency.
+
+Run from the repo root:
+    python -m benchmarks.train_name_benchmark --trains 12000 --queries 3000
+"""
+import argparse
+import random
+import sys
+import time
+
+from app.services.train_name_index import TrainNameIndex
+
+SAMPLE_TRAINS = [
+    ("12627", "Karnataka Express"), ("12841", "Coromandel Express"), ("12951", "Mumbai Rajdhani"),
+    ("12723", "Andhra Express"), ("12659", "Chennai Mail"), ("12760", "Charminar Express"),
+    ("12009", "Shatabdi Express"), ("16382", "Kanniyakumari Express"), ("12533", "Pushpak Express"),
+    ("12615", "Grand Trunk Express"),
+]
+
+_ONSETS = ("k", "g", "ch", "j", "t", "d", "n", "p", "b", "m", "r", "l", "v", "sh", "s", "h",
+           "bh", "dh", "kh", "th", "pr", "kr", "shr", "tr")
+_VOWELS = ("a", "aa", "i", "u", "e", "o", "ai")
+_CODAS = ("", "", "", "n", "r", "m", "l", "th", "nd", "sh")
+_SUFFIXES = ("Express", "Express", "Express", "Mail", "Superfast Express", "Rajdhani", "Shatabdi",
+             "Duronto", "Jan Shatabdi", "Intercity Express", "Passenger", "Sampark Kranti")
+FILLERS = ("{}", "{}", "{} please", "what is the schedule of {}", "when does the {} leave",
+           "timings for {}", "I want to know about {} train")
+
+
+def place_name(rng) -> str:
+    syllables = rng.randint(2, 4)
+    word = "".join(rng.choice(_ONSETS) + rng.choice(_VOWELS) for _ in range(syllables))
+    return (word + rng.choice(_CODAS)).capitalize()
+
+
+def generate_trains(count: int, rng):
+    trains = list(SAMPLE_TRAINS)
+    names = {name for _, name in trains}
+    numbers = {number for number, _ in trains}
+    while len(trains) < count:
+        words = [place_name(rng) for _ in range(rng.choice((1, 1, 2)))]
+        name = " ".join(words + [rng.choice(_SUFFIXES)])
+        number = str(rng.randint(10000, 99999))
+        if name in names or number in numbers:
+            continue
+        names.add(name)
+        numbers.add(number)
+        trains.append((number, name))
+    return trains
+
+
+def misspell(name: str, rng) -> str:
+    """One spoken-style slip in the first word: drop/double/swap a letter or a spelling variant."""
+    words = name.split()
+    word = words[0].lower()
+    kind = rng.randrange(4)
+    if kind == 0 and len(word) > 5:
+        i = rng.randrange(1, len(word) - 1)
+        word = word[:i] + word[i + 1:]
+    elif kind == 1:
+        i = rng.randrange(1, len(word))
+        word = word[:i] + word[i] + word[i:]
+    elif kind == 2 and len(word) > 4:
+        i = rng.randrange(1, len(word) - 2)
+        word = word[:i] + word[i + 1] + word[i] + word[i + 2:]
+    else:
+        for a, b in (("dh", "d"), ("bh", "b"), ("th", "t"), ("v", "w"), ("ee", "i"), ("aa", "a"), ("sh", "s")):
+            if a in word:
+                word = word.replace(a, b, 1)
+                break
+    return " ".join([word] + words[1:])
+
+
+def percentile(sorted_values, pct):
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--trains", type=int, default=12000)
+    parser.add_argument("--queries", type=int, default=3000)
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    trains = generate_trains(args.trains, rng)
+    index = TrainNameIndex()
+    start = time.perf_counter()
+    index.build(trains)
+    print(f"Built index over {len(trains):,} trains in {(time.perf_counter() - start) * 1e3:.0f} ms "
+          f"({index.summary()['words']:,} distinct words)\n")
+
+    print(f"{'query style':<12} {'top-1':>7} {'resolved':>9} {'offered':>8} {'p50 ms':>8} {'p99 ms':>8}")
+    failed = False
+    for style in ("exact", "filler", "misspelled"):
+        top1 = resolved = offered = 0
+        latencies = []
+        for _ in range(args.queries):
+            number, name = rng.choice(trains)
+            query = name if style == "exact" else misspell(name, rng) if style == "misspelled" else name
+            query = rng.choice(FILLERS).format(query) if style != "exact" else query
+            t0 = time.perf_counter()
+            train, candidates = index.resolve(query)
+            latencies.append(time.perf_counter() - t0)
+            ranked = index.search(query, limit=1)
+            top1 += bool(ranked) and ranked[0].train_number == number
+            resolved += train is not None and train.train_number == number
+            offered += any(m.train_number == number for m in candidates)
+        latencies.sort()
+        n = args.queries
+        print(f"{style:<12} {100 * top1 / n:>6.1f}% {100 * resolved / n:>8.1f}% {100 * offered / n:>7.1f}% "
+              f"{percentile(latencies, 50) * 1e3:>8.3f} {percentile(latencies, 99) * 1e3:>8.3f}")
+        failed |= style == "exact" and top1 < n
+
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,285 @@
+"""
+Local Twilio call simulator: plays a caller through the IVR end to end.
+
+Starts a call at /voice/incoming and then does what Twilio would do with
+each TwiML response: <Say> text is "heard", <Redirect> is followed, and a
+<Gather> or <Record> takes the caller's next scripted answer and posts it to
+the action URL:
+  say:TEXT    speech -> SpeechResult + Confidence (or TranscriptionText for a <Record>).
+              If the Gather has a partialResultCallback, the interim
+              transcripts are posted to it word by word first.
+  press:KEYS  keypad -> Digits (only where the Gather accepts dtmf, cut at numDigits)
+  silence     nothing -> falls through the Gather (the action only with actionOnEmptyResult)
+When the call hangs up, /voice/status gets the "completed" callback.
+
+With no arguments every built-in scenario runs and must end with its
+expected phrase spoken. The script exits 1 if any scenario fails, a webhook
+errors, or a call loops. By default the app runs in-process against a
+throwaway database (--sessions picks the session store) with FIXTURES
+applied. Pass --url to call a running server instead; scenarios that need
+the fixtures are skipped then.
+
+Run from the repo root:
+    python -m benchmarks.twilio_simulator                          # all scenarios
+    python -m benchmarks.twilio_simulator --scenario seat_keypad -v
+    python -m benchmarks.twilio_simulator --sessions sqlite
+    python -m benchmarks.twilio_simulator -v --answer "say:check my p n r" --answer "press:1234567890"
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+import uuid
+import xml.etree.ElementTree as ET
+from urllib.parse import urlsplit
+
+import httpx
+
+MAX_WEBHOOKS = 25  # per call; more means the flow is looping
+
+# ---------------------------------------------------------
+# 1️⃣ Scripted callers: answers, and a phrase the call must end up saying
+# ---------------------------------------------------------
+SCENARIOS = {
+    "pnr_speech": (["say:check my p n r status", "say:1 2 3 4 5 6 7 8 9 0."], "belongs to passenger Rahul Sharma"),
+    "pnr_keypad": (["say:p n r status", "press:2345678901"], "belongs to passenger Priya Singh"),
+    "pnr_retry": (["say:p n r status", "say:I don't have it with me", "press:3456789012"],
+                  "belongs to passenger Amit Kumar"),
+    "pnr_unknown": (["say:p n r status", "say:one one one one one one one one one one", "silence"],
+                    "no details found for P N R number 1111111111"),
+    "refund_speech": (["say:what is my refund status", "say:one two three four five six seven eight nine zero"],
+                      "Refund credited to bank"),
+    "refund_keypad": (["say:refund status", "press:4567890123"], "UPI ID not valid"),
+    "train_number": (["say:train schedule", "say:one two six two seven"], "Karnataka Express, runs from"),
+    "train_keypad": (["say:train timings", "press:12841"], "Coromandel Express, runs from"),
+    "train_name": (["say:train schedule", "say:Karnataka Express"], "Karnataka Express, runs from"),
+    "train_route": (["say:train schedule", "say:from Hyderabad to Chennai on Monday"],
+                    "I found 1 train from Hyderabad to Chennai"),
+    "train_route_busy": (["say:train schedule", "say:from Bhopal to New Delhi on Monday"],
+                         "I found more than 5 trains from Bhopal to New Delhi"),
+    "seat_speech": (["say:seat availability", "say:12627", "say:the fifth of November 2025", "say:Sleeper."],
+                    "seats available out of"),
+    "seat_retry": (["say:seat availability", "say:the Karnataka one", "say:one two six two seven", "press:20251105",
+                    "say:sleeper"], "class Sleeper, on 2025-11-05"),
+    "seat_keypad": (["say:check seat availability", "press:12627", "press:20251105", "say:three A"],
+                    "class 3A, on 2025-11-05"),
+    "complaint": (["say:I want to register a complaint",
+                   "say:My name is Rahul Sharma, P N R 1234567890, the coach was not clean"], "complaint"),
+    "choice_timeout": (["say:my pnr refund", "silence", "say:p n r status", "press:1234567890"],
+                       "belongs to passenger Rahul Sharma"),
+    "not_understood": (["say:what is the weather like"], "could not understand your request"),
+    "silent_caller": (["say:p n r status", "silence"], "Please say your ten digit P N R number"),
+    "known_refund_null": (["say:refund status", "press:1"], "Refund amount of 1340.0 rupees"),
+}
+
+# Scenarios that call from a number with complaints on record (caller-ID prefetch)
+CALLER_IDS = {
+    "known_refund_null": "+919876534567",
+}
+
+# Applied to the throwaway database before startup: prefetched rows with NULL
+# columns, and a route with more daily trains than are read out
+FIXTURES = [
+    "UPDATE refunds SET remarks = NULL WHERE pnr_number = '5678901234'",
+    "INSERT INTO train_schedule SELECT '9900' || n.value, train_name, source, destination, departure_time,"
+    " arrival_time, travel_duration, days_of_operation, source_key, destination_key, days_mask"
+    " FROM train_schedule, (SELECT 1 AS value UNION SELECT 2 UNION SELECT 3 UNION SELECT 4"
+    " UNION SELECT 5 UNION SELECT 6 UNION SELECT 7) AS n WHERE train_number = '12009'",
+]
+NEEDS_FIXTURES = {"known_refund_null", "train_route_busy"}
+
+
+def parse_answer(answer: str):
+    kind, _, value = answer.partition(":")
+    if kind not in ("say", "press", "silence"):
+        raise argparse.ArgumentTypeError(f"answer must be say:TEXT, press:KEYS or silence, not {answer!r}")
+    return kind, value
+
+
+def answer_arg(answer: str) -> str:
+    parse_answer(answer)
+    return answer
+
+
+# ---------------------------------------------------------
+# 2️⃣ One simulated call
+# ---------------------------------------------------------
+class Call:
+    def __init__(self, client, answers, verbose=False, caller=None):
+        self.client = client
+        self.answers = [parse_answer(a) for a in answers]
+        self.verbose = verbose
+        self.call_sid = "CA" + uuid.uuid4().hex
+        self.caller = caller or "+15005550006"  # no complaints on record: no caller-ID shortcuts
+        self.heard = []
+        self.errors = []
+        self.webhooks = 0
+        self.webhook_time = 0.0
+
+    def log(self, line):
+        if self.verbose:
+            print(f"   {line}")
+
+    async def post(self, url, params=None):
+        parts = urlsplit(url)  # absolute PUBLIC_BASE_URL actions are served locally
+        path = parts.path + (f"?{parts.query}" if parts.query else "")
+        form = {"CallSid": self.call_sid, "From": self.caller, "To": "+15005550001",
+                "AccountSid": "AC" + "0" * 32, "CallStatus": "in-progress", **(params or {})}
+        self.webhooks += 1
+        start = time.perf_counter()
+        response = await self.client.post(path, data=form)
+        self.webhook_time += time.perf_counter() - start
+        if response.status_code >= 300:
+            self.errors.append(f"{path} -> HTTP {response.status_code}")
+        return response
+
+    def next_answer(self):
+        return self.answers.pop(0) if self.answers else ("silence", "")
+
+    async def speak_partials(self, callback, text):
+        """Interim results as Twilio sends them: the last word still unstable."""
+        words = text.split()
+        for count in range(1, len(words) + 1):
+            await self.post(callback, {
+                "StableSpeechResult": " ".join(words[:count - 1]),
+                "UnstableSpeechResult": words[count - 1],
+                "SequenceNumber": str(count),
+            })
+
+    async def gather(self, verb):
+        """The webhook (url, params) a <Gather> leads to, or None to fall through."""
+        for say in verb.iter("Say"):
+            self.heard.append(say.text or "")
+            self.log(f"🔊 {say.text}")
+        accepts = (verb.get("input") or "dtmf").split()
+        kind, value = self.next_answer()
+        action = verb.get("action")
+        if kind == "say" and "speech" in accepts:
+            self.log(f"🗣️  {value}")
+            if verb.get("partialResultCallback"):
+                await self.speak_partials(verb.get("partialResultCallback"), value)
+            return action, {"SpeechResult": value, "Confidence": "0.92"}
+        if kind == "press" and "dtmf" in accepts:
+            keys = value[:int(verb.get("numDigits"))] if verb.get("numDigits") else value
+            self.log(f"☎️  {keys}")
+            return action, {"Digits": keys}
+        self.log("🤐 (no input)")
+        return (action, {}) if verb.get("actionOnEmptyResult") == "true" else None
+
+    def record(self, verb):
+        # Twilio would transcribe afterwards; the app reads TranscriptionText at the action URL
+        kind, value = self.next_answer()
+        self.log(f"🎙️  {value or '(silence)'}")
+        params = {"RecordingUrl": f"https://api.twilio.com/recordings/RE{uuid.uuid4().hex}"}
+        if kind == "say":
+            params["TranscriptionText"] = value
+        return verb.get("action"), params
+
+    async def run(self):
+        next_step = ("/voice/incoming", {})
+        while next_step:
+            if self.webhooks >= MAX_WEBHOOKS:
+                self.errors.append(f"still going after {MAX_WEBHOOKS} webhooks (loop?)")
+                break
+            response = await self.post(*next_step)
+            if response.status_code != 200:
+                break
+            next_step = None
+            for verb in ET.fromstring(response.content):
+                if verb.tag == "Say":
+                    self.heard.append(verb.text or "")
+                    self.log(f"🔊 {verb.text}")
+                elif verb.tag == "Redirect":
+                    next_step = (verb.text, {})
+                elif verb.tag == "Gather":
+                    next_step = await self.gather(verb)
+                elif verb.tag == "Record":
+                    next_step = self.record(verb)
+                elif verb.tag == "Hangup":
+                    break
+                if next_step:
+                    break
+        self.log("📴 hang up")
+        await self.post("/voice/status", {"CallStatus": "completed", "CallDuration": "42"})
+        return self
+
+
+# ---------------------------------------------------------
+# 3️⃣ Run scenarios (in-process or over HTTP)
+# ---------------------------------------------------------
+async def run_scenarios(client, scenarios, verbose):
+    failures = 0
+    for name, (answers, expected) in scenarios.items():
+        if verbose:
+            print(f"\n📞 {name}")
+        call = await Call(client, answers, verbose, CALLER_IDS.get(name)).run()
+        spoken = " ".join(call.heard)
+        if expected and expected not in spoken:
+            call.errors.append(f"never heard {expected!r}")
+        if call.answers:
+            call.errors.append(f"{len(call.answers)} answer(s) never asked for")
+        status = "✅" if not call.errors else "❌"
+        print(f"{status} {name:<16} {call.webhooks:>3} webhooks  {call.webhook_time * 1e3:>8.1f} ms"
+              + ("" if not call.errors else "   " + "; ".join(call.errors)))
+        failures += bool(call.errors)
+    return failures
+
+
+async def main_async(args, scenarios):
+    if args.url:
+        async with httpx.AsyncClient(base_url=args.url, timeout=30, follow_redirects=True) as client:
+            return await run_scenarios(client, scenarios, args.verbose)
+
+    import main
+    from app.db import database
+    with contextlib.redirect_stdout(io.StringIO()):
+        database.initialize_all_tables(fast_start=False)
+    with database.db_connection() as conn:
+        for statement in FIXTURES:
+            conn.execute(statement)
+        conn.commit()
+
+    quiet = contextlib.redirect_stdout(io.StringIO()) if not args.verbose else contextlib.nullcontext()
+    with quiet:
+        async with main.app.router.lifespan_context(main.app):
+            transport = httpx.ASGITransport(app=main.app, raise_app_exceptions=False)  # a 500, like Twilio sees
+            async with httpx.AsyncClient(transport=transport, base_url="http://ivr.test", timeout=30,
+                                         follow_redirects=True) as client:
+                with contextlib.redirect_stdout(sys.__stdout__):
+                    return await run_scenarios(client, scenarios, args.verbose)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Base URL of a running server (default: drive main:app in-process)")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="Run only these scenarios")
+    parser.add_argument("--answer", action="append", type=answer_arg, help="Script your own call: say:TEXT, press:KEYS or silence")
+    parser.add_argument("--sessions", choices=("memory", "sqlite"), help="In-process session backend (SESSION_BACKEND)")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Print each call's conversation")
+    args = parser.parse_args()
+
+    if args.answer:
+        scenarios = {"custom": (args.answer, None)}
+    else:
+        scenarios = {name: SCENARIOS[name] for name in (args.scenario or SCENARIOS)}
+    if args.url:
+        for name in NEEDS_FIXTURES & scenarios.keys():
+            print(f"⏭️  {name:<16} skipped (needs the in-process database fixtures)")
+            del scenarios[name]
+
+    if not args.url and "DB_PATH" not in os.environ:
+        # Never simulate against the checked-in database file
+        os.environ["DB_PATH"] = os.path.join(tempfile.mkdtemp(prefix="ivr-sim-"), "railway_ivr.db")
+    if not args.url:
+        # Emergency alerts go to the log-only sender, never to real phones
+        os.environ["ALERT_SENDER"] = "stub"
+        os.environ.setdefault("LOG_LEVEL", "WARNING")
+        if args.sessions:
+            os.environ["SESSION_BACKEND"] = args.sessions
+
+    failures = asyncio.run(main_async(args, scenarios))
+    sys.exit(1 if failures else 0)
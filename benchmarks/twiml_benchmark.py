@@ -0,0 +1,81 @@
+"""
+Benchmark + equivalence check for the precompiled TwiML renderer.
+
+For every prompt/template registered by the routers, checks that the
+precompiled output is byte-identical to `str(VoiceResponse)` (including
+values that need XML escaping) and compares per-response render time.
+
+Run from the repo root:  python -m benchmarks.twiml_benchmark [--iterations N]
+"""
+import argparse
+import sys
+import timeit
+
+import main  # noqa: F401  (imports every router, which registers its TwiML)
+from app.services.twiml import registry, StaticTwiML, TwiMLFragment, join_fragments
+
+# Values that exercise text + attribute escaping and non-ASCII output
+TRICKY_VALUES = ['12627', 'Rahul & Sons <VIP>', 'say "hello"\nnext\tline\r', 'Chennai – सेंट्रल', '850.0']
+
+
+def _label(template):
+    return f"{template.build.__module__.rsplit('.', 1)[-1]}.{template.name}"
+
+
+def _sample_values(template, value):
+    return {name: value for name in template.fields}
+
+
+def check_equivalence():
+    failures = []
+    for template in registry:
+        if isinstance(template, StaticTwiML):
+            if template.render() != str(template.build()).encode("utf-8"):
+                failures.append(_label(template))
+            continue
+        for value in TRICKY_VALUES:
+            if not template.verify(**_sample_values(template, value)):
+                failures.append(f"{_label(template)} with {value!r}")
+    return failures
+
+
+def run_benchmark(iterations: int):
+    rows = []
+    for template in registry:
+        name = _label(template)
+        if isinstance(template, StaticTwiML):
+            values = {}
+            precompiled = template.render
+        else:
+            values = _sample_values(template, TRICKY_VALUES[1])
+            if isinstance(template, TwiMLFragment):
+                precompiled = lambda t=template, v=values: join_fragments(t.render(**v))
+            else:
+                precompiled = lambda t=template, v=values: t.render(**v)
+        builder = lambda t=template, v=values: str(t.build(**v)).encode("utf-8")
+
+        t_builder = timeit.timeit(builder, number=iterations) / iterations
+        t_precompiled = timeit.timeit(precompiled, number=iterations) / iterations
+        rows.append((name, t_builder * 1e6, t_precompiled * 1e6))
+
+    print(f"{'template':<48} {'VoiceResponse µs':>17} {'precompiled µs':>15} {'speedup':>8}")
+    for name, slow, fast in rows:
+        print(f"{name:<48} {slow:>17.2f} {fast:>15.2f} {slow / fast:>7.1f}x")
+    total_slow = sum(r[1] for r in rows)
+    total_fast = sum(r[2] for r in rows)
+    print(f"{'TOTAL':<48} {total_slow:>17.2f} {total_fast:>15.2f} {total_slow / total_fast:>7.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    failures = check_equivalence()
+    if failures:
+        print("❌ Precompiled output differs from VoiceResponse for:")
+        for failure in failures:
+            print(f"  - {failure}")
+        sys.exit(1)
+    print(f"✅ {len(registry)} prompts/templates are byte-equivalent to VoiceResponse.\n")
+    run_benchmark(args.iterations)
@@ -0,0 +1,232 @@
+"""
+Twilio webhook load generator + latency benchmark.
+
+Simulates concurrent callers walking through complete IVR call flows
+(incoming -> recording_complete -> department -> process step(s)) by posting
+Twilio-style form data: CallSid and From, then SpeechResult / Digits from the
+Gather prompts (TranscriptionText + RecordingUrl for the complaint and
+emergency recordings).
+Reports p50/p95/p99 latency and throughput per route.
+
+By default the FastAPI app is driven in-process (no network, no Twilio
+account) against a throwaway copy of the database. Pass --url to load a
+running server instead, e.g. one `uvicorn main:app` worker.
+
+Run from the repo root:
+    python -m benchmarks.webhook_load --calls 500 --concurrency 50
+    python -m benchmarks.webhook_load --url http://127.0.0.1:8000 --duration 30
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from collections import defaultdict
+
+import httpx
+
+# ---------------------------------------------------------
+# 1️⃣ Synthetic call flows
+# ---------------------------------------------------------
+KNOWN_PNRS = ["1234567890", "2345678901", "3456789012", "4567890123", "5678901234",
+              "6789012345", "7890123456", "8901234567", "9012345678", "1122334455"]
+UNKNOWN_PNRS = ["1111111111", "9999999999"]
+TRAINS = ["12627", "12841", "12951", "12723", "12659", "12760", "12009", "16382", "12533", "12615"]
+SEAT_QUERIES = [("12627", "2025-11-05", "Sleeper"), ("12627", "2025-11-05", "3A"),
+                ("12841", "2025-11-06", "2A"), ("12951", "2025-11-07", "1A"),
+                ("12760", "2025-11-10", "Sleeper"), ("12533", "2025-11-13", "2A")]
+
+
+def _pnr():
+    return random.choice(KNOWN_PNRS) if random.random() < 0.9 else random.choice(UNKNOWN_PNRS)
+
+
+def _answer(number):
+    """A Gather answer: mostly spoken, sometimes keyed in."""
+    if random.random() < 0.2:
+        return {"Digits": number}
+    return {"SpeechResult": " ".join(number) + ".", "Confidence": "0.9"}
+
+
+def pnr_status_flow():
+    return "check my p n r status", [("/pnr_status/", {}), ("/pnr_status/process_pnr", _answer(_pnr()))]
+
+
+def refunds_flow():
+    return "refund status", [("/refunds/", {}), ("/refunds/process_refund_status", _answer(_pnr()))]
+
+
+def train_schedule_flow():
+    return "train schedule", [
+        ("/train_schedule/", {}),
+        ("/train_schedule/process_train_number", _answer(random.choice(TRAINS))),
+    ]
+
+
+def seat_availability_flow():
+    train, date, class_type = random.choice(SEAT_QUERIES)
+    return "seat availability", [
+        ("/seat_availability/", {}),
+        ("/seat_availability/get_date", _answer(train)),
+        ("/seat_availability/get_class", _answer(date.replace("-", ""))),
+        ("/seat_availability/check_availability", {"SpeechResult": class_type, "Confidence": "0.9"}),
+    ]
+
+
+def complaints_flow():
+    pnr = random.choice(KNOWN_PNRS)
+    return "register a complaint", [
+        ("/complaints/", {}),
+        ("/complaints/record_complete",
+         {"TranscriptionText": f"My name is Load Tester, P N R {pnr}, the coach was not clean"}),
+    ]
+
+
+def emergency_flow():
+    return "emergency help", [
+        ("/emergency/", {}),
+        ("/emergency/process_emergency", {"TranscriptionText": f"Medical emergency in coach S{random.randint(1, 9)}"}),
+    ]
+
+
+# (flow, relative weight) — roughly the department mix of a normal day
+FLOWS = {
+    "pnr_status": (pnr_status_flow, 40),
+    "train_schedule": (train_schedule_flow, 20),
+    "seat_availability": (seat_availability_flow, 15),
+    "refunds": (refunds_flow, 15),
+    "complaints": (complaints_flow, 10),
+    "emergency": (emergency_flow, 2),
+}
+
+
+# ---------------------------------------------------------
+# 2️⃣ Virtual callers
+# ---------------------------------------------------------
+class Stats:
+    def __init__(self):
+        self.latencies = defaultdict(list)   # route -> [seconds]
+        self.errors = defaultdict(int)       # route -> count
+        self.calls = 0
+
+
+async def _post(client, stats, path, call_sid, caller, data):
+    form = {"CallSid": call_sid, "From": caller, "AccountSid": "AC" + "0" * 32, **data}
+    if "TranscriptionText" in data:
+        form["RecordingUrl"] = f"https://api.twilio.com/recordings/RE{uuid.uuid4().hex}"
+    route = path.split("?", 1)[0]
+    start = time.perf_counter()
+    try:
+        response = await client.post(path, data=form)
+        ok = response.status_code == 200
+    except httpx.HTTPError:
+        ok = False
+    stats.latencies[route].append(time.perf_counter() - start)
+    if not ok:
+        stats.errors[route] += 1
+
+
+async def run_call(client, stats, flow_name):
+    call_sid = "CA" + uuid.uuid4().hex
+    caller = f"+9198{random.randint(10000000, 99999999)}"
+    utterance, steps = FLOWS[flow_name][0]()
+
+    await _post(client, stats, "/voice/incoming", call_sid, caller, {})
+    await _post(client, stats, "/voice/recording_complete", call_sid, caller, {"SpeechResult": utterance, "Confidence": "0.9"})
+    for path, data in steps:
+        await _post(client, stats, path, call_sid, caller, data)
+    stats.calls += 1
+
+
+async def caller_loop(client, stats, deadline, remaining):
+    names = list(FLOWS)
+    weights = [FLOWS[n][1] for n in names]
+    while time.perf_counter() < deadline:
+        if remaining is not None:
+            if remaining[0] <= 0:
+                return
+            remaining[0] -= 1
+        await run_call(client, stats, random.choices(names, weights)[0])
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def report(stats, elapsed):
+    print(f"\n{'route':<42} {'count':>7} {'err':>5} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    total = 0
+    for route in sorted(stats.latencies):
+        values = sorted(stats.latencies[route])
+        total += len(values)
+        print(f"{route:<42} {len(values):>7} {stats.errors[route]:>5} {len(values) / elapsed:>8.1f} "
+              f"{percentile(values, 50) * 1e3:>8.2f} {percentile(values, 95) * 1e3:>8.2f} "
+              f"{percentile(values, 99) * 1e3:>8.2f} {values[-1] * 1e3:>8.2f}")
+    every = sorted(v for values in stats.latencies.values() for v in values)
+    print(f"{'ALL':<42} {total:>7} {sum(stats.errors.values()):>5} {total / elapsed:>8.1f} "
+          f"{percentile(every, 50) * 1e3:>8.2f} {percentile(every, 95) * 1e3:>8.2f} "
+          f"{percentile(every, 99) * 1e3:>8.2f} {every[-1] * 1e3 if every else 0:>8.2f}")
+    print(f"\n{stats.calls} calls in {elapsed:.2f}s -> {stats.calls / elapsed:.1f} calls/s, {total / elapsed:.1f} requests/s")
+
+
+# ---------------------------------------------------------
+# 3️⃣ Drive the app (in-process or over HTTP)
+# ---------------------------------------------------------
+async def run(args):
+    stats = Stats()
+    deadline = time.perf_counter() + (args.duration if args.duration else float("inf"))
+    remaining = None if args.duration else [args.calls]
+
+    async def drive(client):
+        # Warm-up pass so first-request costs don't skew the percentiles
+        for name in FLOWS:
+            await run_call(client, Stats(), name)
+        start = time.perf_counter()
+        await asyncio.gather(*(caller_loop(client, stats, deadline, remaining) for _ in range(args.concurrency)))
+        return time.perf_counter() - start
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    if args.url:
+        async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=30) as client:
+            elapsed = await drive(client)
+    else:
+        import main
+        transport = httpx.ASGITransport(app=main.app)
+        quiet = contextlib.redirect_stdout(io.StringIO()) if not args.verbose else contextlib.nullcontext()
+        with quiet:
+            async with main.app.router.lifespan_context(main.app):
+                async with httpx.AsyncClient(transport=transport, base_url="http://ivr.test", timeout=30) as client:
+                    elapsed = await drive(client)
+
+    report(stats, elapsed)
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Base URL of a running server (default: drive main:app in-process)")
+    parser.add_argument("--calls", type=int, default=300, help="Number of complete calls to simulate")
+    parser.add_argument("--duration", type=float, help="Run for this many seconds instead of a fixed call count")
+    parser.add_argument("--concurrency", type=int, default=25, help="Concurrent simulated callers")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--verbose", action="store_true", help="Show the app's own console output")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    if not args.url and "DB_PATH" not in os.environ:
+        # Never load-test against the checked-in database file
+        os.environ["DB_PATH"] = os.path.join(tempfile.mkdtemp(prefix="ivr-bench-"), "railway_ivr.db")
+    if not args.url:
+        # Emergency alerts go to the log-only sender, never to real phones
+        os.environ["ALERT_SENDER"] = "stub"
+
+    stats = asyncio.run(run(args))
+    sys.exit(1 if sum(stats.errors.values()) else 0)
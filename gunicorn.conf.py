@@ -0,0 +1,76 @@
+"""
+Production profile: gunicorn managing uvicorn workers.
+
+    gunicorn main:app -c gunicorn.conf.py        (or ./run.sh prod)
+
+The app is imported once in the master (preload_app) and forked, so workers
+share its code pages and start quickly. Nothing at import time opens a
+database connection or starts a thread; each worker does its own warmup in
+main.py's startup hook:
+- open its connection pool;
+- cache the train schedules and build the train-name index;
+- start following the change log, so writes from other workers invalidate
+  its caches.
+
+The schema is brought up to date once here in the master before forking. The
+workers then hit the fast-start path instead of racing for the migration lock.
+
+Every setting can be overridden from the environment (WEB_CONCURRENCY, BIND,
+...) or with gunicorn's own flags.
+"""
+import multiprocessing
+import os
+
+# ---------------------------------------------------------
+# 1️⃣ Workers
+# ---------------------------------------------------------
+# Async workers each serve many calls at once. The work is SQLite reads
+# (one writer at a time), so about one process per core is enough.
+# More processes mostly add write-lock contention.
+workers = int(os.getenv("WEB_CONCURRENCY", max(2, multiprocessing.cpu_count())))
+try:
+    import uvicorn_worker  # noqa: F401  (the maintained home of the worker class)
+    worker_class = "uvicorn_worker.UvicornWorker"
+except ImportError:
+    worker_class = "uvicorn.workers.UvicornWorker"
+
+bind = os.getenv("BIND", f"0.0.0.0:{os.getenv('PORT', '8000')}")
+preload_app = True
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "30"))
+# Shutdown flushes booked seats and drains queued alerts; give it time
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = 5
+# Off by default: a recycled worker drops its in-memory seat holds
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "0"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "0"))
+
+accesslog = os.getenv("GUNICORN_ACCESS_LOG", "-")
+errorlog = "-"
+loglevel = os.getenv("GUNICORN_LOG_LEVEL", "info")
+
+# Call sessions must be visible to whichever worker gets the next webhook.
+# This file runs before the app is imported, so the default takes effect.
+if workers > 1:
+    os.environ.setdefault("SESSION_BACKEND", "sqlite")
+
+
+# ---------------------------------------------------------
+# 2️⃣ Hooks
+# ---------------------------------------------------------
+def on_starting(server):
+    """Master, before forking: create / migrate the schema once."""
+    from app.core.logging_config import setup_logging, stop_logging
+    from app.db import migrations
+    from app.db.database import create_all_tables, get_connection
+
+    # A standalone connection and logging thread, both gone again before fork():
+    # SQLite handles must not cross it, and a forked worker would inherit a
+    # queue with no listener behind it
+    setup_logging()
+    conn = get_connection()
+    try:
+        if not migrations.schema_is_current(conn):
+            create_all_tables(conn)
+    finally:
+        conn.close()
+        stop_logging()
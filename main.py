@@ -1,6 +1,23 @@
+import logging
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.db.database import initialize_all_tables
+from app.core.config import settings
+from app.core.logging_config import setup_logging, stop_logging, logging_stats
+from app.db.database import SNAPSHOT_TABLES, initialize_all_tables, pool, close_pool
+from app.db.async_db import shutdown_executor, warm_schedule_cache
+from app.db.group_commit import writer, close_writer
+from app.db.cache import cache_stats
+from app.services.notifications import alert_queue
+from app.services.seat_inventory import seat_inventory
+from app.services.caller_prefetch import caller_prefetch
+from app.services.change_feed import change_feed
+from app.services.interaction_log import interaction_log
+from app.services.read_snapshot import read_snapshot
+from app.services.train_name_index import train_name_index
+from app.api.middleware.integration_layer import MetricsMiddleware, router as metrics_router
+from app.api.middleware.log_context import LogContextMiddleware
+from app.api.middleware.interaction_steps import InteractionStepMiddleware
 from app.api.routes.voice.twilio_voice_routes import router as twilio_router
 from app.api.routes.pnr_status.pnr_status import router as pnr_router
 from app.api.routes.complaints.complaints import router as complaints_router
@@ -8,6 +25,9 @@ from app.api.routes.emergency.emergency import router as emergency_router
 from app.api.routes.train_schedule.train_schedule import router as train_schedule_router
 from app.api.routes.seat_availability.seat_availability import router as seat_router
 from app.api.routes.refunds.refunds import router as refunds_router
+from app.api.routes.partner.partner import router as partner_router
+
+logger = logging.getLogger("main")
 
 # -----------------------------------------------------------
 # 1️⃣ Initialize FastAPI app
@@ -29,14 +49,65 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-route latency / error metrics, scraped from /metrics
+app.add_middleware(MetricsMiddleware)
+# One interaction event per webhook a call hits (needs the CallSid read below)
+app.add_middleware(InteractionStepMiddleware)
+# CallSid + route on every log line written while handling a request
+app.add_middleware(LogContextMiddleware)
+
 # -----------------------------------------------------------
-# 3️⃣ Initialize database tables on startup
+# 3️⃣ Initialize database tables on startup / close pool on shutdown
 # -----------------------------------------------------------
 @app.on_event("startup")
-def startup_event():
-    print("🚂 Initializing all database tables...")
+async def startup_event():
+    setup_logging()  # per process: the listener thread must not be started before gunicorn forks
+    logger.info("🚂 Initializing all database tables...")
     initialize_all_tables()
-    print("✅ All database tables are ready.")
+    pool.prefill()
+    logger.info("✅ All database tables are ready.")
+    await change_feed.poll()  # note the change-log position before anything is cached
+    if settings.DB_READ_SNAPSHOT:
+        logger.info("🧊 Copied %s row(s) into the in-memory read snapshot.", await read_snapshot.refresh())
+        read_snapshot.start()
+        # Before the other subscribers, so they re-read from the new copy
+        for table in SNAPSHOT_TABLES:
+            change_feed.subscribe(table, lambda keys, table=table: read_snapshot.on_change(table, keys))
+    logger.info("🔥 Warmed %s train schedule(s) into the lookup cache.", await warm_schedule_cache())
+    await train_name_index.refresh()
+    train_name_index.start()  # picks up renamed / added trains
+    alert_queue.start()  # background senders for queued emergency alerts
+    seat_inventory.start()  # hold expiry + write-behind of confirmed bookings
+    interaction_log.start()  # batched writes of call interaction events
+    # Writes from other workers / the bulk loader: drop stale cache entries, re-read derived state
+    change_feed.subscribe("train_schedule", lambda keys: train_name_index.refresh())
+    change_feed.subscribe("seat_availability", seat_inventory.reconcile)
+    change_feed.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await change_feed.stop()
+    logger.info("🔁 Change feed stats", extra={"stats": change_feed.summary()})
+    await alert_queue.stop()
+    logger.info("📨 Alert queue stats", extra={"stats": alert_queue.stats})
+    await train_name_index.stop()
+    await caller_prefetch.stop()
+    logger.info("📇 Caller prefetch stats", extra={"stats": caller_prefetch.summary()})
+    await seat_inventory.stop()  # before the writer closes: flushes confirmed bookings
+    logger.info("💺 Seat inventory stats", extra={"stats": seat_inventory.summary()})
+    await interaction_log.stop()  # same: writes out buffered events
+    logger.info("📈 Interaction log stats", extra={"stats": interaction_log.summary()})
+    logger.info("📊 Lookup cache stats", extra={"stats": cache_stats()})
+    await read_snapshot.stop()
+    logger.info("🧊 Read snapshot stats", extra={"stats": read_snapshot.summary()})
+    close_writer()
+    logger.info("✍️ Group-commit writer stats", extra={"stats": writer.stats()})
+    logger.info("🛑 Closing database connections... pool stats", extra={"stats": pool.stats()})
+    shutdown_executor()
+    close_pool()
+    logger.info("🧾 Logging stats", extra={"stats": logging_stats()})
+    stop_logging()
 
 # -----------------------------------------------------------
 # 4️⃣ Include all route modules
@@ -48,6 +119,8 @@ app.include_router(emergency_router)       # Emergency helpdesk
 app.include_router(train_schedule_router)  # Train schedule info
 app.include_router(seat_router)            # Seat availability
 app.include_router(refunds_router)         # Refund status tracking
+app.include_router(partner_router)         # Batch PNR / refund status (JSON, for partner systems)
+app.include_router(metrics_router)         # Prometheus metrics
 
 # -----------------------------------------------------------
 # 5️⃣ Root endpoint for testing
@@ -58,6 +131,7 @@ def root():
 
 # -----------------------------------------------------------
 # 6️⃣ Run using: uvicorn main:app --reload
+#    (production, several workers: gunicorn main:app -c gunicorn.conf.py)
 # -----------------------------------------------------------
 # Once running, connect ngrok to this port (default 8000)
 # Example: ngrok http 8000
@@ -0,0 +1,12 @@
+#!/usr/bin/env sh
+# Development: one process with auto-reload
+#   ./run.sh
+# Production: gunicorn + uvicorn workers, sized from the CPU count (see gunicorn.conf.py)
+#   ./run.sh prod
+set -e
+cd "$(dirname "$0")"
+
+if [ "$1" = "prod" ]; then
+    exec gunicorn main:app -c gunicorn.conf.py
+fi
+exec uvicorn main:app --reload